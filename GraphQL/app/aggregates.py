@@ -0,0 +1,382 @@
+"""Agregados de ventas y producción, en una pasada o materializados por día.
+
+Un *resumen* es un dict con contadores escalares y mapas ``{clave: número}``.
+Los resúmenes se combinan sumando campo a campo, así que el resumen de un
+rango de fechas es la suma de los resúmenes de cada día, y actualizar un
+pedido es restar su aporte anterior y sumar el nuevo.
+"""
+import asyncio
+import bisect
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.topk import TopK
+
+
+ESTADOS_PEDIDO_COMPLETADO = ('completado', 'entregado', 'pagado')
+ESTADOS_PEDIDO_PENDIENTE = ('pendiente', 'nuevo', 'en_proceso')
+ESTADOS_ORDEN_COMPLETADA = ('completada', 'completado', 'finalizada')
+ESTADOS_ORDEN_PENDIENTE = ('pendiente', 'nuevo')
+ESTADOS_ORDEN_EN_PROCESO = ('en_proceso', 'en proceso', 'procesando')
+
+SIN_FECHA = 'sin_fecha'
+
+
+def dia(fecha: Optional[str]) -> str:
+    return fecha[:10] if fecha else SIN_FECHA
+
+
+def resumen_ventas_vacio() -> Dict[str, Any]:
+    return {
+        'totalVentas': 0.0,
+        'totalPedidos': 0,
+        'pedidosCompletados': 0,
+        'pedidosPendientes': 0,
+        'cantidades': {},     # productoId -> unidades vendidas
+        'totales': {},        # productoId -> importe vendido
+        'totalDiario': {},    # fecha -> importe
+        'pedidosDiarios': {}, # fecha -> nº de pedidos
+    }
+
+
+def resumen_produccion_vacio() -> Dict[str, Any]:
+    return {
+        'totalOrdenesProduccion': 0,
+        'ordenesCompletadas': 0,
+        'ordenesPendientes': 0,
+        'ordenesEnProceso': 0,
+        'produccion': {},       # productoId -> cantidad producida
+        'insumos': {},          # insumoId -> cantidad utilizada
+        'ordenesDiarias': {},   # fecha -> nº de órdenes
+    }
+
+
+def acumular_pedido(resumen: Dict[str, Any], pedido: Dict[str, Any]) -> Dict[str, Any]:
+    total = float(pedido.get('total', 0))
+    estado = (pedido.get('estado') or '').lower()
+    fecha = dia(pedido.get('fecha'))
+
+    resumen['totalVentas'] += total
+    resumen['totalPedidos'] += 1
+    if estado in ESTADOS_PEDIDO_COMPLETADO:
+        resumen['pedidosCompletados'] += 1
+    elif estado in ESTADOS_PEDIDO_PENDIENTE:
+        resumen['pedidosPendientes'] += 1
+    resumen['totalDiario'][fecha] = resumen['totalDiario'].get(fecha, 0) + total
+    resumen['pedidosDiarios'][fecha] = resumen['pedidosDiarios'].get(fecha, 0) + 1
+
+    cantidades, totales = resumen['cantidades'], resumen['totales']
+    for detalle in pedido.get('detalles', []):
+        prod_id = detalle.get('productoId')
+        if prod_id:
+            cantidades[prod_id] = cantidades.get(prod_id, 0) + int(detalle.get('cantidad_solicitada', 0))
+            totales[prod_id] = totales.get(prod_id, 0) + float(detalle.get('subtotal', 0))
+    return resumen
+
+
+def acumular_orden(resumen: Dict[str, Any], orden: Dict[str, Any]) -> Dict[str, Any]:
+    estado = (orden.get('estado') or '').lower()
+    fecha = dia(orden.get('fecha_inicio'))
+
+    resumen['totalOrdenesProduccion'] += 1
+    if estado in ESTADOS_ORDEN_COMPLETADA:
+        resumen['ordenesCompletadas'] += 1
+    elif estado in ESTADOS_ORDEN_PENDIENTE:
+        resumen['ordenesPendientes'] += 1
+    elif estado in ESTADOS_ORDEN_EN_PROCESO:
+        resumen['ordenesEnProceso'] += 1
+    resumen['ordenesDiarias'][fecha] = resumen['ordenesDiarias'].get(fecha, 0) + 1
+
+    prod_id = orden.get('productoId')
+    if prod_id:
+        produccion = resumen['produccion']
+        produccion[prod_id] = produccion.get(prod_id, 0) + int(orden.get('cantidad_producir', 0))
+
+    insumos = resumen['insumos']
+    for detalle in orden.get('detalles', []):
+        insumo_id = detalle.get('insumoId')
+        if insumo_id:
+            insumos[insumo_id] = insumos.get(insumo_id, 0) + float(detalle.get('cantidad_utilizada', 0))
+    return resumen
+
+
+def agregar_ventas(pedidos: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    resumen = resumen_ventas_vacio()
+    for pedido in pedidos:
+        acumular_pedido(resumen, pedido)
+    return resumen
+
+
+def agregar_produccion(ordenes: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    resumen = resumen_produccion_vacio()
+    for orden in ordenes:
+        acumular_orden(resumen, orden)
+    return resumen
+
+
+# Mapas del resumen indexados por id (en JSON las claves llegan como texto)
+MAPAS_POR_ID = ('cantidades', 'totales', 'produccion', 'insumos')
+
+
+def _id(clave: Any) -> Any:
+    return int(clave) if isinstance(clave, str) and clave.isdigit() else clave
+
+
+def resumen_desde_json(tipo: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumen ``ventas``/``produccion`` calculado por el API REST -> la forma local.
+
+    Lanza KeyError/TypeError/ValueError si ``data`` no tiene todos los campos.
+    """
+    resumen = {'ventas': resumen_ventas_vacio, 'produccion': resumen_produccion_vacio}[tipo]()
+    for campo, vacio in resumen.items():
+        valor = data[campo]
+        if isinstance(vacio, dict):
+            clave = _id if campo in MAPAS_POR_ID else str
+            resumen[campo] = {clave(k): v + 0 for k, v in valor.items()}
+        else:
+            resumen[campo] = valor + 0
+    return resumen
+
+
+def combinar(destino: Dict[str, Any], origen: Dict[str, Any], signo: int = 1) -> Dict[str, Any]:
+    """Suma (o resta, con ``signo=-1``) un resumen sobre otro, campo a campo."""
+    for campo, valor in origen.items():
+        if isinstance(valor, dict):
+            mapa = destino.setdefault(campo, {})
+            for clave, numero in valor.items():
+                nuevo = mapa.get(clave, 0) + signo * numero
+                if signo < 0 and abs(nuevo) < 1e-9:
+                    mapa.pop(clave, None)
+                else:
+                    mapa[clave] = nuevo
+        else:
+            destino[campo] = destino.get(campo, 0) + signo * valor
+    return destino
+
+
+class DailyBuckets:
+    """Resúmenes materializados por día, actualizables registro a registro.
+
+    Guarda el aporte de cada registro (pedido u orden) para poder retirarlo
+    cuando el registro cambia o desaparece. Un rango de fechas se resuelve
+    sumando solo los días del rango (búsqueda binaria sobre los días ordenados).
+
+    ``rankings`` (opcional, ``{campo: TopK}``) mantiene el top de un mapa del
+    resumen sobre todo el histórico con los mismos aportes.
+    """
+
+    def __init__(self, vacio: Callable[[], Dict[str, Any]], acumular: Callable, campo_fecha: str,
+                 rankings: Optional[Dict[str, TopK]] = None):
+        self._vacio = vacio
+        self._acumular = acumular
+        self._campo_fecha = campo_fecha
+        self.rankings = rankings or {}
+        self._dias: Dict[str, Dict[str, Any]] = {}
+        self._fechas: List[str] = []  # días ordenados, sin SIN_FECHA
+        self._aportes: Dict[Any, Tuple[str, Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._aportes)
+
+    def ids(self) -> List[Any]:
+        return list(self._aportes)
+
+    def aporte(self, registro_id: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """``(día, aporte)`` actual del registro, o None si no está."""
+        return self._aportes.get(registro_id)
+
+    def apply(self, registro: Dict[str, Any]) -> bool:
+        """Inserta o actualiza un registro; devuelve False si su aporte no cambió."""
+        fecha = dia(registro.get(self._campo_fecha))
+        aporte = self._acumular(self._vacio(), registro)
+        anterior = self._aportes.get(registro['id'])
+        if anterior == (fecha, aporte):
+            return False
+        if anterior is not None:
+            self._retirar(*anterior)
+        self._aportes[registro['id']] = (fecha, aporte)
+        if fecha not in self._dias:
+            self._dias[fecha] = self._vacio()
+            if fecha != SIN_FECHA:
+                bisect.insort(self._fechas, fecha)
+        combinar(self._dias[fecha], aporte)
+        self._rankear(aporte, 1)
+        return True
+
+    def remove(self, registro_id: Any) -> bool:
+        anterior = self._aportes.pop(registro_id, None)
+        if anterior is None:
+            return False
+        self._retirar(*anterior)
+        return True
+
+    def _rankear(self, aporte: Dict[str, Any], signo: int) -> None:
+        for campo, ranking in self.rankings.items():
+            ranking.update(aporte[campo], signo)
+
+    def _retirar(self, fecha: str, aporte: Dict[str, Any]) -> None:
+        self._rankear(aporte, -1)
+        bucket = combinar(self._dias[fecha], aporte, signo=-1)
+        if all(not valor if isinstance(valor, dict) else abs(valor) < 1e-9 for valor in bucket.values()):
+            del self._dias[fecha]
+            if fecha != SIN_FECHA:
+                self._fechas.pop(bisect.bisect_left(self._fechas, fecha))
+
+    def resumen(self, fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None) -> Dict[str, Any]:
+        """Resumen de los días entre ``fecha_inicio`` y ``fecha_fin`` (ambos incluidos)."""
+        desde = bisect.bisect_left(self._fechas, fecha_inicio[:10]) if fecha_inicio else 0
+        hasta = bisect.bisect_right(self._fechas, fecha_fin[:10]) if fecha_fin else len(self._fechas)
+        resumen = self._vacio()
+        for fecha in self._fechas[desde:hasta]:
+            combinar(resumen, self._dias[fecha])
+        # Los registros sin fecha solo cuentan cuando no se filtra por fechas
+        if not fecha_inicio and not fecha_fin and SIN_FECHA in self._dias:
+            combinar(resumen, self._dias[SIN_FECHA])
+        return resumen
+
+
+class AggregateStore:
+    """Agregados materializados de ventas y producción para todo el histórico.
+
+    Se construye una vez con ``/pedidos`` y ``/ordenes-produccion`` y después se
+    mantiene con los eventos ``order.*`` / ``production.*`` del hub y con una
+    sincronización periódica. El API REST no ofrece un filtro de "cambiados
+    desde", así que ``sync`` vuelve a leer los listados pero solo toca los
+    buckets de los registros cuyo aporte cambió (y retira los borrados).
+    """
+
+    def __init__(self, rest, sync_interval: float = 300.0, top_capacity: int = 50):
+        # rest is an instance of infrastructure.http_client.RESTClient
+        self.rest = rest
+        self.sync_interval = sync_interval
+        # Rankings del histórico completo (productos más vendidos, insumos más usados)
+        self.ventas = DailyBuckets(resumen_ventas_vacio, acumular_pedido, 'fecha',
+                                   rankings={'cantidades': TopK(top_capacity)})
+        self.produccion = DailyBuckets(resumen_produccion_vacio, acumular_orden, 'fecha_inicio',
+                                       rankings={'insumos': TopK(top_capacity)})
+        self.ready = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Eventos recibidos mientras se sincroniza: se reaplican sobre los listados leídos
+        self._durante_sync: List[Tuple[DailyBuckets, Dict[str, Any]]] = []
+        # listener(tipo, anterior, actual) tras cada cambio aplicado por evento; tras una
+        # sincronización completa se llama con anterior=actual=None (hay que recalcular todo)
+        self._listeners: List[Callable[[str, Optional[tuple], Optional[tuple]], Awaitable[None]]] = []
+
+    def add_listener(self, listener: Callable[[str, Optional[tuple], Optional[tuple]], Awaitable[None]]) -> None:
+        self._listeners.append(listener)
+
+    async def _notify(self, tipo: str, anterior: Optional[tuple], actual: Optional[tuple]) -> None:
+        for listener in self._listeners:
+            try:
+                await listener(tipo, anterior, actual)
+            except Exception as e:
+                print(f"⚠️ Error notificando cambio de {tipo}: {e}")
+
+    @classmethod
+    def from_env(cls, rest) -> Optional['AggregateStore']:
+        if os.getenv('AGGREGATES_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(rest, sync_interval=float(os.getenv('AGGREGATES_SYNC_INTERVAL', '300')),
+                   top_capacity=int(os.getenv('AGGREGATES_TOP_CAPACITY', '50')))
+
+    async def ensure_ready(self) -> None:
+        if self.ready:
+            return
+        async with self._lock:
+            if not self.ready:
+                await self._sync()
+
+    async def sync(self) -> None:
+        async with self._lock:
+            await self._sync()
+
+    async def _sync(self) -> None:
+        self._durante_sync = []
+        pedidos, ordenes = await asyncio.gather(
+            self.rest.get('/pedidos'),
+            self.rest.get('/ordenes-produccion'),
+        )
+        cambios = {
+            'ventas': self._sync_buckets(self.ventas, pedidos),
+            'produccion': self._sync_buckets(self.produccion, ordenes),
+        }
+        for buckets, registro in self._durante_sync:
+            cambios['ventas' if buckets is self.ventas else 'produccion'] |= buckets.apply(registro)
+        self._durante_sync = []
+        self.ready = True
+        for tipo, cambio in cambios.items():
+            if cambio:
+                await self._notify(tipo, None, None)
+
+    @staticmethod
+    def _sync_buckets(buckets: DailyBuckets, registros: List[Dict[str, Any]]) -> bool:
+        """Aplica el listado completo; devuelve True si cambió algún aporte."""
+        vistos = set()
+        cambio = False
+        for registro in registros:
+            vistos.add(registro['id'])
+            cambio |= buckets.apply(registro)
+        for registro_id in buckets.ids():
+            if registro_id not in vistos:
+                cambio |= buckets.remove(registro_id)
+        return cambio
+
+    async def handle_event(self, event: Dict[str, Any]) -> None:
+        domain = event.get('type', '').split('.', 1)[0]
+        tipo = {'order': 'ventas', 'production': 'produccion'}.get(domain)
+        if tipo is None:
+            return
+        buckets = getattr(self, tipo)
+        payload = event.get('payload')
+        # Sin detalles el aporte quedaría incompleto: mejor releer en la próxima sincronización
+        if not (isinstance(payload, dict) and 'id' in payload and 'detalles' in payload):
+            self.ready = False
+            return
+        if self._lock.locked():
+            self._durante_sync.append((buckets, payload))
+        if self.ready:
+            anterior = buckets.aporte(payload['id'])
+            if buckets.apply(payload):
+                await self._notify(tipo, anterior, buckets.aporte(payload['id']))
+
+    async def reset(self) -> None:
+        """Tras una reconexión al hub pueden faltar eventos: se relee todo en el próximo reporte."""
+        self.ready = False
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ No se pudieron sincronizar los agregados de reportes: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def resumen_ventas(self, fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None) -> Dict[str, Any]:
+        await self.ensure_ready()
+        return self.ventas.resumen(fecha_inicio, fecha_fin)
+
+    async def resumen_produccion(self, fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None) -> Dict[str, Any]:
+        await self.ensure_ready()
+        return self.produccion.resumen(fecha_inicio, fecha_fin)
+
+    async def top(self, tipo: str, campo: str, k: int) -> List[Tuple[Any, float]]:
+        """Top ``k`` de ``campo`` (p. ej. ``('ventas', 'cantidades')``) sobre todo el histórico."""
+        await self.ensure_ready()
+        return getattr(self, tipo).rankings[campo].top(k)
@@ -0,0 +1,246 @@
+"""Motor columnar (NumPy) para los resúmenes de ventas y producción.
+
+Aplana pedidos/órdenes y sus detalles en columnas (índice de día,
+productoId, cantidad, subtotal) y agrupa con ``np.bincount``
+en lugar de recorrer fila a fila con dicts. Devuelve exactamente el mismo
+formato de resumen que ``app.aggregates``; los mapas conservan el orden de
+primera aparición para que los empates se ordenen igual en los reportes.
+
+NumPy es opcional: sin él, o con pocos registros, se usa el camino en
+Python puro de ``app.aggregates``.
+"""
+import os
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List
+
+from app import aggregates
+from app.aggregates import (  # mismos criterios de estado que el camino en Python
+    ESTADOS_ORDEN_COMPLETADA,
+    ESTADOS_ORDEN_EN_PROCESO,
+    ESTADOS_ORDEN_PENDIENTE,
+    ESTADOS_PEDIDO_COMPLETADO,
+    ESTADOS_PEDIDO_PENDIENTE,
+    dia,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy es opcional
+    np = None
+
+
+# 'auto' usa columnas a partir de REPORT_COLUMNAR_MIN_ROWS registros; 'python' lo desactiva
+REPORT_ENGINE = os.getenv('REPORT_ENGINE', 'auto').lower()
+REPORT_COLUMNAR_MIN_ROWS = int(os.getenv('REPORT_COLUMNAR_MIN_ROWS', '2000'))
+# Registros por lote al agregar un listado en streaming
+REPORT_STREAM_BATCH = int(os.getenv('REPORT_STREAM_BATCH', '5000'))
+
+
+class _NoColumnar(Exception):
+    """Los datos no admiten columnas numéricas (p.ej. ids no enteros)."""
+
+
+def disponible() -> bool:
+    return np is not None
+
+
+def _usar_columnas(n: int) -> bool:
+    if np is None or REPORT_ENGINE == 'python':
+        return False
+    return REPORT_ENGINE == 'columnar' or n >= REPORT_COLUMNAR_MIN_ROWS
+
+
+def agregar_ventas(pedidos: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    pedidos = pedidos if isinstance(pedidos, list) else list(pedidos)
+    if _usar_columnas(len(pedidos)):
+        try:
+            return agregar_ventas_columnar(pedidos)
+        except _NoColumnar:
+            pass
+    return aggregates.agregar_ventas(pedidos)
+
+
+def agregar_produccion(ordenes: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    ordenes = ordenes if isinstance(ordenes, list) else list(ordenes)
+    if _usar_columnas(len(ordenes)):
+        try:
+            return agregar_produccion_columnar(ordenes)
+        except _NoColumnar:
+            pass
+    return aggregates.agregar_produccion(ordenes)
+
+
+async def _agregar_por_lotes(registros: AsyncIterable[Dict[str, Any]], agregar: Callable,
+                            vacio: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Agrega un flujo de registros en lotes de ``REPORT_STREAM_BATCH``.
+
+    La memoria queda acotada por el tamaño del lote y no por el del listado;
+    cada lote se resume (en columnas si toca) y se suma al total con ``combinar``.
+    """
+    resumen = vacio()
+    lote: List[Dict[str, Any]] = []
+    async for registro in registros:
+        lote.append(registro)
+        if len(lote) >= REPORT_STREAM_BATCH:
+            aggregates.combinar(resumen, agregar(lote))
+            lote = []
+    if lote:
+        aggregates.combinar(resumen, agregar(lote))
+    return resumen
+
+
+async def agregar_ventas_stream(pedidos: AsyncIterable[Dict[str, Any]]) -> Dict[str, Any]:
+    return await _agregar_por_lotes(pedidos, agregar_ventas, aggregates.resumen_ventas_vacio)
+
+
+async def agregar_produccion_stream(ordenes: AsyncIterable[Dict[str, Any]]) -> Dict[str, Any]:
+    return await _agregar_por_lotes(ordenes, agregar_produccion, aggregates.resumen_produccion_vacio)
+
+
+# ---------------------------------------------------------------------------
+# Columnas y group-by
+# ---------------------------------------------------------------------------
+# Las columnas se extraen con map(itemgetter) (en C); si falta algún campo o
+# trae None se repite la extracción con .get() y los mismos valores por
+# defecto que el camino en Python.
+
+def _valores(registros: List[Dict[str, Any]], campo: str, defecto: Any) -> List[Any]:
+    try:
+        return list(map(itemgetter(campo), registros))
+    except KeyError:
+        return [r.get(campo, defecto) for r in registros]
+
+
+def _detalles(registros: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return list(chain.from_iterable(_valores(registros, 'detalles', [])))
+
+
+def _numeros(registros: List[Dict[str, Any]], campo: str):
+    try:
+        return np.fromiter(map(itemgetter(campo), registros), dtype=np.float64, count=len(registros))
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return np.asarray([r.get(campo, 0) for r in registros], dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise _NoColumnar(f'{campo}: {e}')
+
+
+def _ids(registros: List[Dict[str, Any]], campo: str):
+    """(lista, columna) de ids enteros; 0 marca los registros sin id (se descartan)."""
+    valores = _valores(registros, campo, 0)
+    ids = np.asarray(valores)
+    if ids.dtype == object:
+        # Algún id es None: igual que ``if prod_id:`` en Python, cuenta como sin id
+        valores = [v or 0 for v in valores]
+        ids = np.asarray(valores)
+    if ids.size and ids.dtype.kind not in 'iu':
+        raise _NoColumnar(f'{campo}: ids no enteros ({ids.dtype})')
+    return valores, ids.astype(np.int64, copy=False)
+
+
+def _dias(registros: List[Dict[str, Any]], campo: str):
+    """(días únicos en orden de aparición, índice de día por registro)."""
+    fechas = _valores(registros, campo, None)
+    if None in fechas or '' in fechas:
+        fechas = [dia(f) for f in fechas]
+    else:
+        # Recortar a 'YYYY-MM-DD' en C (igual que dia())
+        fechas = np.asarray(fechas, dtype='U10').tolist()
+    dias = list(dict.fromkeys(fechas))
+    codigo = {d: i for i, d in enumerate(dias)}
+    return dias, np.fromiter(map(codigo.__getitem__, fechas), dtype=np.intp, count=len(fechas))
+
+
+def _sumar(claves: List[Any], columna, *pesos):
+    """Group-by vectorizado: claves únicas en orden de aparición y una suma por columna de pesos."""
+    orden = [c for c in dict.fromkeys(claves) if c]
+    if not orden:
+        return [], [np.zeros(0) for _ in pesos]
+    maximo = int(columna.max())
+    if columna.min() >= 0 and maximo <= 4 * columna.size + 1024:
+        # ids densos: bincount directo sobre el id
+        grupos, n, posiciones = columna, maximo + 1, np.asarray(orden, dtype=np.int64)
+    else:
+        unicas, grupos = np.unique(columna, return_inverse=True)
+        grupos, n = grupos.ravel(), unicas.size
+        posiciones = np.searchsorted(unicas, np.asarray(orden, dtype=np.int64))
+    return orden, [np.bincount(grupos, weights=p, minlength=n)[posiciones] for p in pesos]
+
+
+def _mapa(claves: List[Any], sumas, entero: bool = False) -> Dict[Any, Any]:
+    if not claves:
+        return {}
+    if entero:
+        sumas = np.rint(sumas).astype(np.int64)
+    return dict(zip(claves, sumas.tolist()))
+
+
+def _contar_estados(registros: List[Dict[str, Any]], *grupos) -> List[int]:
+    cuenta = Counter()
+    for estado, n in Counter(_valores(registros, 'estado', None)).items():
+        cuenta[(estado or '').lower()] += n
+    return [sum(n for estado, n in cuenta.items() if estado in grupo) for grupo in grupos]
+
+
+def agregar_ventas_columnar(pedidos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    resumen = aggregates.resumen_ventas_vacio()
+    if not pedidos:
+        return resumen
+
+    # Columnas por pedido
+    dias, dia_idx = _dias(pedidos, 'fecha')
+    totales = _numeros(pedidos, 'total')
+
+    # Columnas por detalle
+    detalles = _detalles(pedidos)
+    prod_lista, prod_ids = _ids(detalles, 'productoId')
+    cantidades = np.trunc(_numeros(detalles, 'cantidad_solicitada'))
+    subtotales = _numeros(detalles, 'subtotal')
+
+    completados, pendientes = _contar_estados(pedidos, ESTADOS_PEDIDO_COMPLETADO, ESTADOS_PEDIDO_PENDIENTE)
+    resumen['totalVentas'] = float(totales.sum())
+    resumen['totalPedidos'] = len(pedidos)
+    resumen['pedidosCompletados'] = completados
+    resumen['pedidosPendientes'] = pendientes
+
+    resumen['totalDiario'] = _mapa(dias, np.bincount(dia_idx, weights=totales, minlength=len(dias)))
+    resumen['pedidosDiarios'] = _mapa(dias, np.bincount(dia_idx, minlength=len(dias)))
+
+    productos, (cantidad, importe) = _sumar(prod_lista, prod_ids, cantidades, subtotales)
+    resumen['cantidades'] = _mapa(productos, cantidad, entero=True)
+    resumen['totales'] = _mapa(productos, importe)
+    return resumen
+
+
+def agregar_produccion_columnar(ordenes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    resumen = aggregates.resumen_produccion_vacio()
+    if not ordenes:
+        return resumen
+
+    dias, dia_idx = _dias(ordenes, 'fecha_inicio')
+    prod_lista, prod_ids = _ids(ordenes, 'productoId')
+    producir = np.trunc(_numeros(ordenes, 'cantidad_producir'))
+
+    detalles = _detalles(ordenes)
+    insumo_lista, insumo_ids = _ids(detalles, 'insumoId')
+    utilizado = _numeros(detalles, 'cantidad_utilizada')
+
+    completadas, pendientes, en_proceso = _contar_estados(
+        ordenes, ESTADOS_ORDEN_COMPLETADA, ESTADOS_ORDEN_PENDIENTE, ESTADOS_ORDEN_EN_PROCESO,
+    )
+    resumen['totalOrdenesProduccion'] = len(ordenes)
+    resumen['ordenesCompletadas'] = completadas
+    resumen['ordenesPendientes'] = pendientes
+    resumen['ordenesEnProceso'] = en_proceso
+
+    resumen['ordenesDiarias'] = _mapa(dias, np.bincount(dia_idx, minlength=len(dias)))
+
+    productos, (cantidad,) = _sumar(prod_lista, prod_ids, producir)
+    resumen['produccion'] = _mapa(productos, cantidad, entero=True)
+
+    insumos, (cantidad,) = _sumar(insumo_lista, insumo_ids, utilizado)
+    resumen['insumos'] = _mapa(insumos, cantidad)
+    return resumen
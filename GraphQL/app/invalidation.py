@@ -0,0 +1,54 @@
+from typing import Any, Dict, Optional
+
+from infrastructure.cache import CatalogCache, ReportCache
+
+
+# Reportes cuyo resultado cambia con cada tipo de evento del API REST
+REPORTES_AFECTADOS = {
+    'order': ('reporteVentas', 'productosMasVendidos'),
+    'production': ('reporteProduccion', 'consumoInsumos', 'reporteInventario'),
+    'supply': ('reporteInventario', 'reporteProduccion', 'consumoInsumos'),
+    'product': ('reporteInventario', 'reporteVentas', 'reporteProduccion', 'productosMasVendidos'),
+}
+
+
+class CacheInvalidator:
+    """Traduce los eventos del API REST en invalidaciones de caché.
+
+    Solo se descartan las entradas afectadas por cada evento:
+    ``product.*`` -> el producto, ``supply.*`` -> el insumo y ``recipe.*`` ->
+    la receta del producto (o todas si el evento no trae ``productoId``).
+    En la caché de reportes se descartan los reportes de ``REPORTES_AFECTADOS``.
+    """
+
+    def __init__(self, catalog_cache: CatalogCache, report_cache: Optional[ReportCache] = None):
+        self.catalog_cache = catalog_cache
+        self.report_cache = report_cache
+
+    async def handle(self, event: Dict[str, Any]) -> None:
+        event_type = event.get('type', '')
+        payload = event.get('payload') or {}
+        if not isinstance(payload, dict):
+            payload = {}
+        domain = event_type.split('.', 1)[0]
+
+        if domain == 'product':
+            await self._invalidate('productos', payload.get('id'))
+        elif domain == 'supply':
+            await self._invalidate('insumos', payload.get('id'))
+        elif domain == 'recipe':
+            await self._invalidate('recetas', payload.get('productoId'))
+
+        if self.report_cache is not None:
+            for report in REPORTES_AFECTADOS.get(domain, ()):
+                await self.report_cache.invalidate(report)
+
+    async def reset(self) -> None:
+        """Vacía las cachés: tras una reconexión no se sabe qué eventos se perdieron."""
+        await self.catalog_cache.clear()
+        if self.report_cache is not None:
+            await self.report_cache.clear()
+
+    async def _invalidate(self, kind: str, entity_id: Any) -> None:
+        # Sin id no hay forma de saber qué entrada cambió: se descarta todo el tipo
+        await self.catalog_cache.invalidate(kind, entity_id)
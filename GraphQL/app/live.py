@@ -0,0 +1,172 @@
+"""Actualizaciones en vivo de los reportes para las suscripciones GraphQL.
+
+``LiveReports`` recibe los cambios de ``AggregateStore`` (cada pedido
+aplicado, con su aporte anterior y el nuevo) y los eventos de insumos del
+hub, calcula **una vez por cambio** el delta y lo difunde a todas las
+suscripciones. Las de ventas se agrupan por rango de fechas: con N
+dashboards sobre el mismo rango, un pedido nuevo cuesta un cálculo y no N
+recálculos del reporte completo por intervalo de polling.
+
+Deltas de ventas: totales del rango y solo los días y productos que
+cambiaron (valores absolutos, así reaplicar un delta es idempotente).
+Deltas de inventario: la lista completa de ``insumosStockBajo`` cuando cambia.
+Un delta con ``tipo='resync'`` pide al cliente volver a consultar el reporte
+(tras una resincronización de los agregados o si se quedó atrás).
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Set, Tuple
+
+from app.aggregates import AggregateStore
+from app.usecases import insumo_inventario, stock_bajo
+from infrastructure.loaders import CatalogLoaders
+
+
+RESYNC = {'tipo': 'resync'}
+
+
+def _en_rango(fecha: str, rango: Tuple[Optional[str], Optional[str]]) -> bool:
+    inicio, fin = rango
+    return (not inicio or fecha >= inicio[:10]) and (not fin or fecha <= fin[:10])
+
+
+class LiveReports:
+    """Difusión de deltas de reportes a las suscripciones abiertas."""
+
+    def __init__(self, aggregates: AggregateStore, rest, catalog_cache=None, queue_size: int = 100):
+        # rest is an instance of infrastructure.http_client.RESTClient (token de servicio)
+        self.aggregates = aggregates
+        self.rest = rest
+        self.catalog_cache = catalog_cache
+        self.queue_size = queue_size
+        # tema -> clave (rango de fechas) -> colas de los suscriptores
+        self._subs: Dict[str, Dict[Hashable, Set[asyncio.Queue]]] = {'ventas': {}, 'inventario': {}}
+        # Insumos por id, para recalcular el stock bajo sin releer /insumos en cada evento
+        self._insumos: Optional[Dict[Any, Dict[str, Any]]] = None
+        self._stock_bajo: Optional[List[Dict[str, Any]]] = None
+        self.computations = 0
+        self.published = 0
+        self.dropped = 0
+        aggregates.add_listener(self._on_aggregates)
+
+    @classmethod
+    def from_env(cls, aggregates: AggregateStore, rest, catalog_cache=None) -> 'LiveReports':
+        return cls(aggregates, rest, catalog_cache, queue_size=int(os.getenv('LIVE_REPORTS_QUEUE_SIZE', '100')))
+
+    # --- suscripciones -------------------------------------------------
+
+    async def subscribe(self, tema: str, clave: Hashable = None) -> AsyncIterator[Dict[str, Any]]:
+        """Deltas del tema para un suscriptor, hasta que se cierre la suscripción."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        suscriptores = self._subs[tema].setdefault(clave, set())
+        suscriptores.add(queue)
+        try:
+            if tema == 'ventas':
+                await self.aggregates.ensure_ready()
+            while True:
+                yield await queue.get()
+        finally:
+            suscriptores.discard(queue)
+            if not suscriptores:
+                self._subs[tema].pop(clave, None)
+
+    def subscribers(self, tema: Optional[str] = None) -> int:
+        temas = [tema] if tema else list(self._subs)
+        return sum(len(colas) for t in temas for colas in self._subs[t].values())
+
+    def _publish(self, tema: str, clave: Hashable, delta: Dict[str, Any]) -> None:
+        for queue in self._subs[tema].get(clave, ()):
+            if queue.full():
+                # Cliente lento: se descartan sus deltas pendientes y se le pide recargar
+                self.dropped += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+            else:
+                queue.put_nowait(delta)
+            self.published += 1
+
+    # --- ventas ---------------------------------------------------------
+
+    async def _on_aggregates(self, tipo: str, anterior: Optional[tuple], actual: Optional[tuple]) -> None:
+        if tipo != 'ventas' or not self._subs['ventas']:
+            return
+        if anterior is None and actual is None:
+            for rango in list(self._subs['ventas']):
+                self._publish('ventas', rango, RESYNC)
+            return
+
+        aportes = [a for a in (anterior, actual) if a is not None]
+        fechas = sorted({fecha for fecha, _ in aportes})
+        productos = list(dict.fromkeys(pid for _, aporte in aportes for pid in aporte['cantidades']))
+        nombres = await self._nombres(productos)
+        for rango in list(self._subs['ventas']):
+            if any(_en_rango(fecha, rango) for fecha in fechas):
+                self._publish('ventas', rango, self._delta_ventas(rango, fechas, productos, nombres))
+
+    def _delta_ventas(self, rango: Tuple[Optional[str], Optional[str]], fechas: List[str],
+                      productos: List[Any], nombres: Dict[Any, Optional[str]]) -> Dict[str, Any]:
+        self.computations += 1
+        ventas = self.aggregates.ventas
+        resumen = ventas.resumen(*rango)
+        dias = []
+        for fecha in fechas:
+            if _en_rango(fecha, rango):
+                bucket = ventas.resumen(fecha, fecha)
+                dias.append({'fecha': fecha, 'total': bucket['totalDiario'].get(fecha, 0),
+                             'cantidad': bucket['pedidosDiarios'].get(fecha, 0)})
+        return {
+            'tipo': 'delta',
+            'totalVentas': resumen['totalVentas'],
+            'totalPedidos': resumen['totalPedidos'],
+            'pedidosCompletados': resumen['pedidosCompletados'],
+            'pedidosPendientes': resumen['pedidosPendientes'],
+            'ventasPorDia': dias,
+            'ventasPorProducto': [{
+                'productoId': pid,
+                'productoNombre': nombres.get(pid),
+                'cantidadVendida': resumen['cantidades'].get(pid, 0),
+                'totalVendido': resumen['totales'].get(pid, 0),
+            } for pid in productos],
+        }
+
+    async def _nombres(self, productos: List[Any]) -> Dict[Any, Optional[str]]:
+        loaders = CatalogLoaders(self.rest, cache=self.catalog_cache)
+        cargados = await asyncio.gather(*(loaders.productos.load(pid) for pid in productos), return_exceptions=True)
+        return {pid: p.get('nombre') if isinstance(p, dict) else None for pid, p in zip(productos, cargados)}
+
+    # --- inventario -----------------------------------------------------
+
+    async def handle_event(self, event: Dict[str, Any]) -> None:
+        """Eventos del hub que no pasan por los agregados (stock de insumos)."""
+        domain = event.get('type', '').split('.', 1)[0]
+        if domain == 'order' and not self.aggregates.ready and self._subs['ventas']:
+            # El evento no se pudo aplicar: se resincroniza ya (y se avisa con un resync)
+            await self.aggregates.ensure_ready()
+        elif domain in ('supply', 'production'):
+            if not self._subs['inventario']:
+                self._insumos = self._stock_bajo = None   # sin suscriptores la copia quedaría desfasada
+                return
+            payload = event.get('payload')
+            await self._actualizar_insumos(payload if domain == 'supply' and isinstance(payload, dict) else None)
+
+    async def _actualizar_insumos(self, insumo: Optional[Dict[str, Any]] = None) -> None:
+        if insumo is not None and self._insumos is not None and 'id' in insumo and 'stock' in insumo:
+            # El evento trae el insumo: se actualiza sin releer el listado
+            self._insumos[insumo['id']] = insumo_inventario({**self._insumos.get(insumo['id'], {}), **insumo})
+        else:
+            insumos = await self.rest.get('/insumos')
+            self._insumos = {i.get('id'): insumo_inventario(i) for i in insumos}
+        self.computations += 1
+        bajos = [i for i in self._insumos.values() if stock_bajo(i)]
+        if bajos != self._stock_bajo:
+            self._stock_bajo = bajos
+            self._publish('inventario', None, {'tipo': 'delta', 'insumosStockBajo': bajos})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'subscribers': self.subscribers(),
+            'computations': self.computations,
+            'published': self.published,
+            'dropped': self.dropped,
+        }
@@ -1,8 +1,7 @@
 from fastapi import FastAPI, Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
-from strawberry.fastapi import GraphQLRouter
 import os
 from dotenv import load_dotenv
 
@@ -12,6 +11,18 @@ dotenv_path = os.path.join(root, '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
 from infrastructure.http_client import RESTClient, AuthClient
+from infrastructure.cache import CatalogCache, ReportCache, SharedStore
+from infrastructure.events import EventSubscriber
+from infrastructure.aggregation import AggregationClient
+from infrastructure.tokens import TokenManager
+from infrastructure.jwt_auth import JWTVerifier
+from infrastructure.metrics import registry as metrics
+from app.invalidation import CacheInvalidator
+from app.aggregates import AggregateStore
+from app.live import LiveReports
+from app.snapshot import SnapshotStore
+from interface.graphql.cost import CostBudget
+from interface.graphql.persisted import DocumentCache, PersistedQueryRouter
 from interface.graphql.schema import schema, get_context
 
 
@@ -53,6 +64,17 @@ class BlockRemotePostMiddleware(BaseHTTPMiddleware):
 def create_app() -> FastAPI:
     app = FastAPI(title="GraphQL Reporting Service")
 
+    # Almacén compartido entre workers (CACHE_BACKEND=redis); None -> cachés en memoria del proceso
+    app.state.shared_cache = SharedStore.from_env()
+    # Caché de catálogo compartida por todos los requests (y workers, con almacén compartido)
+    app.state.catalog_cache = CatalogCache.from_env(app.state.shared_cache)
+    # Caché de resultados de reportes (por argumentos y usuario)
+    app.state.report_cache = ReportCache.from_env(app.state.shared_cache)
+    # Presupuesto de coste de consultas por usuario (QUERY_COST_RATE, opcional)
+    app.state.cost_budget = CostBudget.from_env()
+    # Verificación local de los tokens de usuario (JWT_SECRET, opcional)
+    app.state.jwt_verifier = JWTVerifier.from_env()
+
     # Attach REST client in app.state on startup
     @app.on_event("startup")
     async def _startup():
@@ -63,6 +85,43 @@ def create_app() -> FastAPI:
         # Crear cliente REST (sin token inicialmente)
         app.state.rest = RESTClient(base_url=api_url)
         app.state.auth = AuthClient(base_url=auth_url)
+        metrics.register_collector('upstream_resilience', app.state.rest.resilience.stats)
+        # Agregados materializados de ventas/producción (opcional, AGGREGATES_ENABLED)
+        app.state.aggregates = AggregateStore.from_env(app.state.rest)
+        # Resúmenes sumados por el API REST cuando ofrece el endpoint (REPORT_PUSHDOWN)
+        app.state.aggregation = AggregationClient.from_env()
+        if app.state.aggregation is not None:
+            metrics.register_collector('report_pushdown', app.state.aggregation.stats)
+        # Réplica local en SQLite para los reportes (opcional, SNAPSHOT_ENABLED)
+        app.state.snapshot = SnapshotStore.from_env(
+            app.state.rest, os.getenv('REPORT_PUSHDOWN_PATH', '/reportes/agregados'))
+        if app.state.snapshot is not None:
+            metrics.register_collector('snapshot', app.state.snapshot.stats)
+
+        # Invalidación de cachés a partir de los eventos del hub WebSocket
+        events_url = os.getenv("WS_EVENTS_URL")
+        if events_url:
+            invalidator = CacheInvalidator(app.state.catalog_cache, app.state.report_cache)
+            handlers = [invalidator.handle]
+            resets = [invalidator.reset]
+            if app.state.aggregates is not None:
+                handlers.insert(0, app.state.aggregates.handle_event)
+                resets.insert(0, app.state.aggregates.reset)
+                # Suscripciones GraphQL: deltas de ventas/inventario calculados una vez por evento
+                app.state.live = LiveReports.from_env(app.state.aggregates, app.state.rest, app.state.catalog_cache)
+                handlers.append(app.state.live.handle_event)
+                metrics.register_collector('live_reports', app.state.live.stats)
+
+            async def _on_event(event):
+                for handler in handlers:
+                    await handler(event)
+
+            async def _on_connect():
+                for reset in resets:
+                    await reset()
+
+            app.state.events = EventSubscriber(events_url, _on_event, on_connect=_on_connect)
+            app.state.events.start()
         
         # Intentar obtener token
         api_token = os.getenv("API_TOKEN")
@@ -72,46 +131,65 @@ def create_app() -> FastAPI:
             app.state.rest.set_token(api_token)
             print(f"✅ GraphQL Service usando token configurado en API_TOKEN")
         else:
-            # Auto-login con Auth-Service
-            try:
-                login_email = os.getenv("API_LOGIN_EMAIL", "admin@chifles.com")
-                login_password = os.getenv("API_LOGIN_PASSWORD", "Admin123!")
-                
-                result = await app.state.auth.login(login_email, login_password)
-                
-                # Extraer el access token de la respuesta del Auth-Service
-                access_token = result.get('tokens', {}).get('accessToken')
-                
-                if access_token:
-                    app.state.rest.set_token(access_token)
-                    # Guardar refresh token para renovación futura
-                    app.state.refresh_token = result.get('tokens', {}).get('refreshToken')
-                    print(f"✅ GraphQL Service autenticado con Auth-Service ({login_email})")
-                else:
-                    print("⚠️ Login exitoso pero no se recibió accessToken")
-                    
-            except Exception as e:
-                print(f"⚠️ No se pudo autenticar con Auth-Service: {e}")
+            # Auto-login con Auth-Service y renovación del token antes de que caduque
+            app.state.tokens = TokenManager.from_env(app.state.auth, app.state.rest)
+            await app.state.tokens.start()
+            metrics.register_collector('service_token', app.state.tokens.stats)
+            if app.state.tokens.access_token is None:
                 print("   Configura API_TOKEN en .env o verifica que Auth-Service esté corriendo en", auth_url)
 
+        # Construir los agregados ya con el token de servicio configurado
+        if app.state.aggregates is not None:
+            app.state.aggregates.start()
+        if app.state.snapshot is not None:
+            app.state.snapshot.start()
+
     @app.on_event("shutdown")
     async def _shutdown():
+        tokens = getattr(app.state, "tokens", None)
+        if tokens is not None:
+            await tokens.stop()
+        events = getattr(app.state, "events", None)
+        if events is not None:
+            await events.stop()
+        aggregates = getattr(app.state, "aggregates", None)
+        if aggregates is not None:
+            await aggregates.stop()
+        snapshot = getattr(app.state, "snapshot", None)
+        if snapshot is not None:
+            await snapshot.stop()
         rest = getattr(app.state, "rest", None)
         auth = getattr(app.state, "auth", None)
         if rest is not None:
             await rest.close()
         if auth is not None:
             await auth.close()
+        shared_cache = getattr(app.state, "shared_cache", None)
+        if shared_cache is not None:
+            await shared_cache.close()
 
-    # Mount GraphQL router
-    graphql_router = GraphQLRouter(schema=schema, context_getter=get_context, graphiql=True)
+    # Mount GraphQL router (con persisted queries automáticas)
+    graphql_router = PersistedQueryRouter(schema=schema, context_getter=get_context, graphiql=True)
     app.include_router(graphql_router, prefix="/graphql")
 
+    # Tasas de acierto y tamaño de las cachés, leídas en cada scrape de /metrics
+    metrics.register_collector('catalog_cache', app.state.catalog_cache.stats)
+    metrics.register_collector('report_cache', app.state.report_cache.stats)
+    metrics.register_collector('document_cache', DocumentCache.documents.stats)
+    metrics.register_collector('persisted_queries', graphql_router.store.stats)
+    if app.state.jwt_verifier is not None:
+        metrics.register_collector('jwt_verifier', app.state.jwt_verifier.stats)
+
     # Health endpoint
     @app.get("/health")
     async def _health():
         return {"status": "ok"}
 
+    # Métricas en formato de exposición de Prometheus
+    @app.get("/metrics")
+    async def _metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
     # Add middleware to restrict POST to localhost (se añade ANTES de CORS)
     # En Starlette, el último middleware añadido se ejecuta primero
     app.add_middleware(BlockRemotePostMiddleware)
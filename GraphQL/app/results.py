@@ -0,0 +1,122 @@
+"""Resultados tipados de los reportes, servidos tal cual por los tipos GraphQL.
+
+Son dataclasses con ``__slots__`` (sin ``__dict__`` por instancia) cuyos
+atributos se llaman igual que los campos de ``interface/graphql/types.py``:
+strawberry los lee con ``getattr`` sin copiarlos a otros objetos. Los
+valores se convierten a ``int``/``float`` una sola vez, al construirlos.
+
+Los alias (``ProductoVendidoReporte.idProducto``/``nombre``,
+``cantidadPedidos``) son propiedades sobre la misma fila, así
+``ventasPorProducto`` y ``productosMasVendidos`` comparten la lista.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class VentaProductoFila:
+    productoId: int
+    productoNombre: Optional[str]
+    cantidadVendida: int
+    totalVendido: float
+
+    # Alias para ProductoVendidoReporte
+    @property
+    def idProducto(self) -> int:
+        return self.productoId
+
+    @property
+    def nombre(self) -> str:
+        return self.productoNombre or ''
+
+
+@dataclass(slots=True)
+class VentaDiariaFila:
+    fecha: str
+    total: float
+    cantidad: int
+
+
+@dataclass(slots=True)
+class ResultadoVentas:
+    totalVentas: float
+    totalPedidos: int
+    pedidosCompletados: int
+    pedidosPendientes: int
+    ventasPorProducto: List[VentaProductoFila] = field(default_factory=list)
+    ventasPorDia: List[VentaDiariaFila] = field(default_factory=list)
+    enriquecimientosOmitidos: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def cantidadPedidos(self) -> int:
+        return self.totalPedidos
+
+    @property
+    def productosMasVendidos(self) -> List[VentaProductoFila]:
+        return self.ventasPorProducto
+
+
+@dataclass(slots=True)
+class ProduccionProductoFila:
+    productoId: int
+    productoNombre: Optional[str]
+    cantidadProducida: int
+
+
+@dataclass(slots=True)
+class InsumoUtilizadoFila:
+    idInsumo: int
+    nombre: str
+    cantidadUtilizada: float
+
+
+@dataclass(slots=True)
+class ProduccionDiariaFila:
+    fecha: str
+    cantidadOrdenes: int
+
+
+@dataclass(slots=True)
+class ResultadoProduccion:
+    totalOrdenesProduccion: int
+    ordenesCompletadas: int
+    ordenesPendientes: int
+    ordenesEnProceso: int
+    produccionPorProducto: List[ProduccionProductoFila] = field(default_factory=list)
+    insumosMasUtilizados: List[InsumoUtilizadoFila] = field(default_factory=list)
+    produccionPorDia: List[ProduccionDiariaFila] = field(default_factory=list)
+    enriquecimientosOmitidos: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ProductoInventarioFila:
+    id: int
+    nombre: str
+    stock: float
+    precioVenta: float
+
+
+@dataclass(slots=True)
+class InsumoInventarioFila:
+    id: int
+    nombre: str
+    stock: float
+    unidadMedida: Optional[str]
+    stockMinimo: float
+    precioUnitario: float
+
+    @classmethod
+    def desde_dict(cls, i: Dict[str, Any]) -> 'InsumoInventarioFila':
+        # i es una fila de app.usecases.insumo_inventario
+        return cls(int(i['id']), i['nombre'], i['stock'], i['unidadMedida'], i['stockMinimo'], i['precio_unitario'])
+
+
+@dataclass(slots=True)
+class ResultadoInventario:
+    totalProductos: int
+    totalInsumos: int
+    valorInventario: float
+    productos: List[ProductoInventarioFila] = field(default_factory=list)
+    insumos: List[InsumoInventarioFila] = field(default_factory=list)
+    insumosStockBajo: List[InsumoInventarioFila] = field(default_factory=list)
+    enriquecimientosOmitidos: List[Dict[str, Any]] = field(default_factory=list)
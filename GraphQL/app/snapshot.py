@@ -0,0 +1,383 @@
+"""Réplica local (SQLite) del API REST para servir los reportes sin red.
+
+``SnapshotStore`` copia periódicamente pedidos (con sus detalles), órdenes
+de producción (con sus detalles), productos, insumos y recetas
+(``domain/models.py``) a un fichero SQLite con índices por día, cliente,
+producto e insumo. ``SnapshotStore.view(rest)`` envuelve el ``RESTClient``
+del request: mientras la copia tenga menos de ``max_staleness`` segundos,
+los GET que conoce se responden desde SQLite, incluido el endpoint de
+agregación de ``infrastructure.aggregation`` (``GROUP BY`` sobre el rango de
+días con los índices); el resto, o con la copia vieja, van al API REST.
+
+Con ``offline`` (por defecto) una copia vieja sigue sirviendo si el API REST
+no responde (error de red o circuito abierto), en vez de fallar el reporte.
+
+El API no tiene un filtro de "cambiados desde": cada sincronización relee los
+listados y reemplaza las tablas en una transacción (los lectores ven la copia
+anterior hasta el commit, modo WAL). Con varios workers (``WEB_CONCURRENCY``)
+todos comparten el fichero y solo sincroniza quien encuentre la copia vieja.
+Los datos se leen con el token de servicio: la copia es la misma para todos
+los usuarios.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from infrastructure.aggregation import UNSUPPORTED_STATUS, AggregationUnavailable
+from app.aggregates import (
+    ESTADOS_ORDEN_COMPLETADA,
+    ESTADOS_ORDEN_EN_PROCESO,
+    ESTADOS_ORDEN_PENDIENTE,
+    ESTADOS_PEDIDO_COMPLETADO,
+    ESTADOS_PEDIDO_PENDIENTE,
+    SIN_FECHA,
+    dia,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pedidos (
+    id INTEGER PRIMARY KEY, clienteId INTEGER, dia TEXT NOT NULL, total REAL NOT NULL,
+    estado TEXT NOT NULL, json TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS pedidos_dia ON pedidos (dia);
+CREATE INDEX IF NOT EXISTS pedidos_cliente ON pedidos (clienteId, dia);
+CREATE TABLE IF NOT EXISTS detalles_pedido (
+    pedidoId INTEGER NOT NULL, productoId INTEGER NOT NULL, cantidad INTEGER NOT NULL, subtotal REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS detalles_pedido_pedido ON detalles_pedido (pedidoId);
+CREATE INDEX IF NOT EXISTS detalles_pedido_producto ON detalles_pedido (productoId);
+CREATE TABLE IF NOT EXISTS ordenes (
+    id INTEGER PRIMARY KEY, productoId INTEGER, dia TEXT NOT NULL, estado TEXT NOT NULL,
+    cantidad INTEGER NOT NULL, json TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS ordenes_dia ON ordenes (dia);
+CREATE INDEX IF NOT EXISTS ordenes_producto ON ordenes (productoId);
+CREATE TABLE IF NOT EXISTS detalles_orden (
+    ordenId INTEGER NOT NULL, insumoId INTEGER NOT NULL, cantidad REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS detalles_orden_orden ON detalles_orden (ordenId);
+CREATE INDEX IF NOT EXISTS detalles_orden_insumo ON detalles_orden (insumoId);
+CREATE TABLE IF NOT EXISTS productos (id INTEGER PRIMARY KEY, json TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS insumos (id INTEGER PRIMARY KEY, json TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS recetas (productoId INTEGER, json TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS recetas_producto ON recetas (productoId);
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor REAL NOT NULL);
+"""
+
+TABLAS = ('pedidos', 'detalles_pedido', 'ordenes', 'detalles_orden', 'productos', 'insumos', 'recetas')
+
+# Listados de entidades servidos tal cual (ruta -> tabla)
+LISTADOS = {'/productos': 'productos', '/insumos': 'insumos', '/ordenes-produccion': 'ordenes'}
+POR_ID = {'/pedidos': 'pedidos', '/productos': 'productos', '/insumos': 'insumos', '/ordenes-produccion': 'ordenes'}
+
+
+def _en(estados: Tuple[str, ...]) -> str:
+    return 'estado IN (%s)' % ', '.join(f"'{e}'" for e in estados)
+
+
+def _rango(params: Dict[str, Any]) -> Tuple[str, list]:
+    """Condición sobre ``dia`` para fechaInicio/fechaFin (ambos incluidos)."""
+    condiciones, args = [], []
+    if params.get('fechaInicio') or params.get('fechaFin'):
+        # Los registros sin fecha solo cuentan cuando no se filtra (como en app.aggregates)
+        condiciones.append('dia != ?')
+        args.append(SIN_FECHA)
+    if params.get('fechaInicio'):
+        condiciones.append('dia >= ?')
+        args.append(str(params['fechaInicio'])[:10])
+    if params.get('fechaFin'):
+        condiciones.append('dia <= ?')
+        args.append(str(params['fechaFin'])[:10])
+    return ' AND '.join(condiciones) or '1', args
+
+
+class SnapshotStore:
+    def __init__(self, rest, path: str, sync_interval: float = 60.0, max_staleness: float = 300.0,
+                 offline: bool = True, aggregation_path: str = '/reportes/agregados',
+                 clock: Callable[[], float] = time.time):
+        # rest es el RESTClient con el token de servicio (el de app.state)
+        self.rest = rest
+        self.path = path
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self.offline = offline
+        self.aggregation_path = aggregation_path
+        self._clock = clock
+        # Epoch del último sync completo de cualquier worker (tabla meta)
+        self.synced_at: Optional[float] = None
+        self._local = threading.local()
+        self._conexiones: List[sqlite3.Connection] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.syncs = 0
+        self.local_reads = 0
+        self.live_reads = 0
+        self.stale_reads = 0
+        with self._conexion() as conn:
+            conn.executescript(SCHEMA)
+        self.synced_at = self._leer_synced_at()
+
+    @classmethod
+    def from_env(cls, rest, aggregation_path: str = '/reportes/agregados') -> Optional['SnapshotStore']:
+        if os.getenv('SNAPSHOT_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            rest,
+            path=os.getenv('SNAPSHOT_PATH') or os.path.join(tempfile.gettempdir(), 'chifles-snapshot.db'),
+            sync_interval=float(os.getenv('SNAPSHOT_SYNC_INTERVAL', '60')),
+            max_staleness=float(os.getenv('SNAPSHOT_MAX_STALENESS', '300')),
+            offline=os.getenv('SNAPSHOT_OFFLINE', 'true').lower() in ('1', 'true', 'yes'),
+            aggregation_path=aggregation_path,
+        )
+
+    # --- SQLite (síncrono, siempre desde asyncio.to_thread salvo al arrancar) ---
+
+    def _conexion(self) -> sqlite3.Connection:
+        # Una conexión por hilo del pool de to_thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._conexiones.append(conn)
+        return conn
+
+    def _leer_synced_at(self) -> Optional[float]:
+        row = self._conexion().execute("SELECT valor FROM meta WHERE clave = 'synced_at'").fetchone()
+        return row[0] if row else None
+
+    def _escribir(self, pedidos: list, ordenes: list, productos: list, insumos: list, recetas: list,
+                  synced_at: float) -> None:
+        conn = self._conexion()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for tabla in TABLAS:
+                conn.execute(f'DELETE FROM {tabla}')
+            conn.executemany('INSERT INTO pedidos VALUES (?, ?, ?, ?, ?, ?)', [
+                (p['id'], p.get('clienteId'), dia(p.get('fecha')), float(p.get('total', 0)),
+                 (p.get('estado') or '').lower(), json.dumps(p))
+                for p in pedidos
+            ])
+            conn.executemany('INSERT INTO detalles_pedido VALUES (?, ?, ?, ?)', [
+                (p['id'], d['productoId'], int(d.get('cantidad_solicitada', 0)), float(d.get('subtotal', 0)))
+                for p in pedidos for d in p.get('detalles', []) if d.get('productoId')
+            ])
+            conn.executemany('INSERT INTO ordenes VALUES (?, ?, ?, ?, ?, ?)', [
+                (o['id'], o.get('productoId') or None, dia(o.get('fecha_inicio')), (o.get('estado') or '').lower(),
+                 int(o.get('cantidad_producir', 0)), json.dumps(o))
+                for o in ordenes
+            ])
+            conn.executemany('INSERT INTO detalles_orden VALUES (?, ?, ?)', [
+                (o['id'], d['insumoId'], float(d.get('cantidad_utilizada', 0)))
+                for o in ordenes for d in o.get('detalles', []) if d.get('insumoId')
+            ])
+            conn.executemany('INSERT INTO productos VALUES (?, ?)', [(p['id'], json.dumps(p)) for p in productos])
+            conn.executemany('INSERT INTO insumos VALUES (?, ?)', [(i['id'], json.dumps(i)) for i in insumos])
+            conn.executemany('INSERT INTO recetas VALUES (?, ?)',
+                             [(r.get('productoId'), json.dumps(r)) for r in recetas])
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('synced_at', ?)", (synced_at,))
+
+    def _filas_json(self, sql: str, args: tuple = ()) -> List[Any]:
+        return [json.loads(row[0]) for row in self._conexion().execute(sql, args)]
+
+    def _query(self, path: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Respuesta local para ``GET path``; None si el snapshot no la tiene."""
+        if path == self.aggregation_path:
+            return self._resumen(params.get('tipo'), params)
+        if path == '/pedidos':
+            condicion, args = _rango(params)
+            if params.get('clienteId') is not None:
+                condicion += ' AND clienteId = ?'
+                args.append(int(params['clienteId']))
+            return self._filas_json(f'SELECT json FROM pedidos WHERE {condicion} ORDER BY id', tuple(args))
+        if path in LISTADOS:
+            return self._filas_json(f'SELECT json FROM {LISTADOS[path]} ORDER BY id')
+        if path == '/productos-insumos':
+            if params.get('productoId') is None:
+                return self._filas_json('SELECT json FROM recetas')
+            return self._filas_json('SELECT json FROM recetas WHERE productoId = ?', (int(params['productoId']),))
+        recurso, _, entity_id = path.rpartition('/')
+        if recurso in POR_ID and entity_id.isdigit():
+            filas = self._filas_json(f'SELECT json FROM {POR_ID[recurso]} WHERE id = ?', (int(entity_id),))
+            # Un id que no está puede ser posterior a la copia: lo resuelve el API REST
+            return filas[0] if filas else None
+        return None
+
+    def _resumen(self, tipo: Optional[str], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """El resumen de ``app.aggregates`` calculado con GROUP BY sobre el rango de días."""
+        conn = self._conexion()
+        condicion, args = _rango(params)
+        donde = f'WHERE {condicion}'
+        if tipo == 'ventas':
+            total, pedidos, completados, pendientes = conn.execute(
+                f'SELECT COALESCE(SUM(total), 0.0), COUNT(*), COALESCE(SUM({_en(ESTADOS_PEDIDO_COMPLETADO)}), 0), '
+                f'COALESCE(SUM({_en(ESTADOS_PEDIDO_PENDIENTE)}), 0) FROM pedidos {donde}', args).fetchone()
+            por_producto = conn.execute(
+                'SELECT productoId, SUM(cantidad), SUM(subtotal) FROM detalles_pedido '
+                f'WHERE pedidoId IN (SELECT id FROM pedidos {donde}) GROUP BY productoId', args).fetchall()
+            por_dia = conn.execute(f'SELECT dia, SUM(total), COUNT(*) FROM pedidos {donde} GROUP BY dia',
+                                   args).fetchall()
+            return {
+                'totalVentas': total, 'totalPedidos': pedidos,
+                'pedidosCompletados': completados, 'pedidosPendientes': pendientes,
+                'cantidades': {pid: cantidad for pid, cantidad, _ in por_producto},
+                'totales': {pid: subtotal for pid, _, subtotal in por_producto},
+                'totalDiario': {fecha: total for fecha, total, _ in por_dia},
+                'pedidosDiarios': {fecha: n for fecha, _, n in por_dia},
+            }
+        if tipo == 'produccion':
+            ordenes, completadas, pendientes, en_proceso = conn.execute(
+                f'SELECT COUNT(*), COALESCE(SUM({_en(ESTADOS_ORDEN_COMPLETADA)}), 0), '
+                f'COALESCE(SUM({_en(ESTADOS_ORDEN_PENDIENTE)}), 0), '
+                f'COALESCE(SUM({_en(ESTADOS_ORDEN_EN_PROCESO)}), 0) FROM ordenes {donde}', args).fetchone()
+            produccion = conn.execute(
+                f'SELECT productoId, SUM(cantidad) FROM ordenes {donde} AND productoId IS NOT NULL '
+                'GROUP BY productoId', args).fetchall()
+            insumos = conn.execute(
+                'SELECT insumoId, SUM(cantidad) FROM detalles_orden '
+                f'WHERE ordenId IN (SELECT id FROM ordenes {donde}) GROUP BY insumoId', args).fetchall()
+            return {
+                'totalOrdenesProduccion': ordenes, 'ordenesCompletadas': completadas,
+                'ordenesPendientes': pendientes, 'ordenesEnProceso': en_proceso,
+                'produccion': dict(produccion),
+                'insumos': dict(insumos),
+                'ordenesDiarias': dict(conn.execute(f'SELECT dia, COUNT(*) FROM ordenes {donde} GROUP BY dia',
+                                                    args).fetchall()),
+            }
+        return None
+
+    # --- API asíncrona ---
+
+    def fresh(self) -> bool:
+        return self.synced_at is not None and self._clock() - self.synced_at <= self.max_staleness
+
+    async def query(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        return await asyncio.to_thread(self._query, path, dict(params or {}))
+
+    async def sync(self, force: bool = False) -> bool:
+        """Relee los listados y reemplaza la copia; False si otro worker la renovó hace poco."""
+        async with self._lock:
+            self.synced_at = await asyncio.to_thread(self._leer_synced_at)
+            if not force and self.synced_at is not None and self._clock() - self.synced_at < self.sync_interval / 2:
+                return False
+            inicio = self._clock()
+            listados = await asyncio.gather(
+                self.rest.get('/pedidos'),
+                self.rest.get('/ordenes-produccion'),
+                self.rest.get('/productos'),
+                self.rest.get('/insumos'),
+                self.rest.get('/productos-insumos'),
+            )
+            # La copia vale desde que se empezó a leer
+            await asyncio.to_thread(self._escribir, *listados, inicio)
+            self.synced_at = inicio
+            self.syncs += 1
+            return True
+
+    def view(self, rest) -> 'SnapshotView':
+        return SnapshotView(self, rest)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for conn in self._conexiones:
+            conn.close()
+        self._conexiones = []
+        self._local = threading.local()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.sync():
+                    print(f"✅ Snapshot de reportes sincronizado en {self.path}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ No se pudo sincronizar el snapshot de reportes: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'fresh': self.fresh(),
+            'ageSeconds': round(self._clock() - self.synced_at, 1) if self.synced_at is not None else None,
+            'syncs': self.syncs,
+            'localReads': self.local_reads,
+            'liveReads': self.live_reads,
+            'staleReads': self.stale_reads,
+        }
+
+
+class SnapshotView:
+    """``RESTClient`` de un request que lee del snapshot cuando está al día.
+
+    Lo demás (``post``, ``set_token``, ...) se delega en el cliente envuelto.
+    """
+
+    def __init__(self, store: SnapshotStore, rest):
+        self.store = store
+        self.rest = rest
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.rest, name)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        store = self.store
+        if store.fresh():
+            data = await store.query(path, params)
+            if data is not None:
+                store.local_reads += 1
+                return data
+        try:
+            data = await self.rest.get(path, params=params)
+        except httpx.HTTPStatusError as e:
+            # El API no agrega pero el snapshot sí en cuanto esté al día: no desactivar el pushdown
+            if path == store.aggregation_path and e.response.status_code in UNSUPPORTED_STATUS:
+                raise AggregationUnavailable('snapshot sin sincronizar') from e
+            raise
+        except httpx.TransportError:
+            # Sin API REST (red o circuito abierto): mejor la copia vieja que un error
+            if not store.offline or store.synced_at is None:
+                raise
+            data = await store.query(path, params)
+            if data is None:
+                raise
+            store.stale_reads += 1
+            return data
+        store.live_reads += 1
+        return data
+
+    async def iter_items(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        if self.store.fresh() or not hasattr(self.rest, 'iter_items'):
+            for item in await self.get(path, params):
+                yield item
+            return
+        leidos = 0
+        try:
+            async for item in self.rest.iter_items(path, params=params):
+                leidos += 1
+                yield item
+        except httpx.TransportError:
+            # Solo se puede cambiar a la copia si no se entregó nada todavía
+            if leidos or not self.store.offline or self.store.synced_at is None:
+                raise
+            data = await self.store.query(path, params)
+            if data is None:
+                raise
+            self.store.stale_reads += 1
+            for item in data:
+                yield item
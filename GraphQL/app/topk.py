@@ -0,0 +1,82 @@
+"""Selección de los K mayores de un mapa ``{clave: número}`` sin ordenarlo entero.
+
+``top_k`` usa un heap de tamaño K (O(n log K)) y ``TopK`` mantiene el ranking
+de forma incremental según llegan los aportes de pedidos/órdenes, así leer el
+top cuesta O(K) y no depende del tamaño del catálogo.
+
+Empates: a igual valor gana la clave menor, siempre en el mismo orden.
+"""
+import heapq
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+def _orden(item: Tuple[Hashable, float]) -> tuple:
+    clave, valor = item
+    return -valor, clave
+
+
+def top_k(valores: Dict[Hashable, float], k: int) -> List[Tuple[Hashable, float]]:
+    """Los ``k`` pares ``(clave, valor)`` de mayor valor, de mayor a menor."""
+    if k <= 0:
+        return []
+    return heapq.nsmallest(k, valores.items(), key=_orden)
+
+
+class TopK:
+    """Ranking incremental de los ``capacidad`` mayores valores.
+
+    ``add`` aplica un delta a una clave. Si la clave está en el top o lo
+    supera, el top se corrige en O(K); si un miembro del top baja, alguien de
+    fuera podría adelantarlo y el top se recalcula con ``top_k`` en la
+    siguiente lectura (los pedidos casi siempre suman, así que es raro).
+    """
+
+    def __init__(self, capacidad: int = 50):
+        self.capacidad = capacidad
+        self.valores: Dict[Hashable, float] = {}
+        self._top: List[Tuple[Hashable, float]] = []
+        self._sucio = False
+        self.recalculos = 0
+
+    def add(self, clave: Hashable, delta: float) -> None:
+        valor = self.valores.get(clave, 0) + delta
+        if abs(valor) < 1e-9:
+            self.valores.pop(clave, None)
+        else:
+            self.valores[clave] = valor
+        if self._sucio or not delta:
+            return
+
+        posicion = next((i for i, (c, _) in enumerate(self._top) if c == clave), None)
+        if posicion is not None:
+            if delta < 0:
+                self._sucio = True
+                return
+            self._top[posicion] = (clave, valor)
+        elif delta < 0:
+            return
+        elif len(self._top) < self.capacidad:
+            # Con hueco libre el top contiene todas las claves: entra sin comparar
+            self._top.append((clave, valor))
+        elif _orden((clave, valor)) < _orden(self._top[-1]):
+            self._top[-1] = (clave, valor)
+        else:
+            return
+        self._top.sort(key=_orden)
+
+    def update(self, valores: Dict[Hashable, float], signo: int = 1) -> None:
+        for clave, valor in valores.items():
+            self.add(clave, signo * valor)
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        k = self.capacidad if k is None else k
+        if k > self.capacidad:
+            return top_k(self.valores, k)
+        if self._sucio:
+            self._top = top_k(self.valores, self.capacidad)
+            self._sucio = False
+            self.recalculos += 1
+        return self._top[:k]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'claves': len(self.valores), 'capacidad': self.capacidad, 'recalculos': self.recalculos}
@@ -1,11 +1,133 @@
-from typing import List, Dict, Any
+import asyncio
+import os
+from typing import AbstractSet, List, Dict, Any, Iterable, Optional
 from domain.models import Pedido, Cliente, Producto, ProductoInsumo, Insumo, OrdenProduccion
+from infrastructure.loaders import CatalogLoaders
+from infrastructure.aggregation import AggregationClient
+from app.aggregates import AggregateStore, resumen_desde_json
+from app.topk import top_k
+from app.columnar import agregar_produccion, agregar_produccion_stream, agregar_ventas, agregar_ventas_stream
+from app.results import (
+    InsumoInventarioFila,
+    InsumoUtilizadoFila,
+    ProduccionDiariaFila,
+    ProduccionProductoFila,
+    ProductoInventarioFila,
+    ResultadoInventario,
+    ResultadoProduccion,
+    ResultadoVentas,
+    VentaDiariaFila,
+    VentaProductoFila,
+)
+
+
+# Los listados grandes (/pedidos, /ordenes-produccion) se agregan según llegan (en streaming o por páginas)
+REPORT_STREAMING = os.getenv('REPORT_STREAMING', 'true').lower() in ('1', 'true', 'yes')
+
+
+def insumo_inventario(i: Dict[str, Any]) -> Dict[str, Any]:
+    """Fila de inventario de un insumo del API REST."""
+    return {
+        'id': i.get('id'),
+        'nombre': i.get('nombre', ''),
+        'stock': float(i.get('stock', 0)),
+        'unidadMedida': i.get('unidad_medida', i.get('unidadMedida')),
+        'stockMinimo': float(i.get('stock_minimo', i.get('stockMinimo', 10))),
+        'precio_unitario': float(i.get('precio_unitario', 0))
+    }
+
+
+def stock_bajo(insumo: Dict[str, Any]) -> bool:
+    return insumo['stock'] <= insumo['stockMinimo']
+
+
+def _pide(partes: Optional[AbstractSet[str]], parte: str) -> bool:
+    # partes=None: reporte completo (llamadas directas, tests, benchmarks)
+    return partes is None or parte in partes
 
 
 class ReportService:
-    def __init__(self, rest):
+    def __init__(self, rest, loaders: Optional[CatalogLoaders] = None, aggregates: Optional[AggregateStore] = None,
+                 deadline: Optional[float] = None, aggregation: Optional[AggregationClient] = None):
         # rest is an instance of infrastructure.http_client.RESTClient
         self.rest = rest
+        # loaders agrupa y deduplica las búsquedas de productos/insumos del request
+        self.loaders = loaders or CatalogLoaders(rest)
+        # aggregates (opcional) sirve ventas/producción desde buckets diarios en memoria
+        self.aggregates = aggregates
+        # aggregation (opcional) pide los resúmenes ya sumados al API REST, si lo soporta
+        self.aggregation = aggregation
+        # deadline (loop.time() absoluto, opcional): los nombres que no lleguen a tiempo se omiten
+        self.deadline = deadline
+        self.omitidos: List[Dict[str, Any]] = []
+
+    async def _load_or_none(self, loader, ids: Iterable[Any], tipo: str = None) -> List[Optional[Dict[str, Any]]]:
+        """Carga varias entidades en un solo lote; las que fallan o no llegan antes del deadline quedan en None."""
+        ids = list(ids)
+        if self.deadline is None:
+            results = await asyncio.gather(*(loader.load(i) for i in ids), return_exceptions=True)
+            return [None if isinstance(r, Exception) else r for r in results]
+
+        futures = [asyncio.ensure_future(loader.load(i)) for i in ids]
+        if futures:
+            await asyncio.wait(futures, timeout=max(0.0, self.deadline - asyncio.get_running_loop().time()))
+        for f in futures:
+            # Las cargas pendientes siguen y llenan la caché del catálogo para los próximos requests
+            f.add_done_callback(lambda f: f.cancelled() or f.exception())
+        # Un lote espera a su clave más lenta: lo que ya llegó se usa aunque el lote no haya terminado
+        pendientes = [i for i, f in zip(ids, futures) if not f.done()]
+        listos = self.loaders.ready(tipo, pendientes) if pendientes and tipo else {}
+        pendientes = [i for i in pendientes if i not in listos]
+        if pendientes:
+            self.omitidos.append({'tipo': tipo, 'ids': pendientes})
+
+        def valor(i, f):
+            if not f.done():
+                return listos.get(i)
+            return None if f.cancelled() or f.exception() is not None else f.result()
+        return [valor(i, f) for i, f in zip(ids, futures)]
+
+    @staticmethod
+    def _params_fechas(fechaInicio: str = None, fechaFin: str = None) -> Dict[str, Any]:
+        params = {}
+        if fechaInicio:
+            params['fechaInicio'] = fechaInicio
+        if fechaFin:
+            params['fechaFin'] = fechaFin
+        return params
+
+    async def _pushdown(self, tipo: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # None: sin cliente de agregación o el API no lo soporta -> se agrega en local
+        if self.aggregation is None:
+            return None
+        return await self.aggregation.fetch(self.rest, tipo, params, lambda data: resumen_desde_json(tipo, data))
+
+    def _streaming(self) -> bool:
+        return REPORT_STREAMING and hasattr(self.rest, 'iter_items')
+
+    async def _resumen_ventas(self, fechaInicio: str = None, fechaFin: str = None) -> Dict[str, Any]:
+        if self.aggregates is not None:
+            return await self.aggregates.resumen_ventas(fechaInicio, fechaFin)
+        params = self._params_fechas(fechaInicio, fechaFin)
+        resumen = await self._pushdown('ventas', params)
+        if resumen is not None:
+            return resumen
+        if self._streaming():
+            return await agregar_ventas_stream(self.rest.iter_items('/pedidos', params=params))
+        pedidos = await self.rest.get('/pedidos', params=params)
+        return agregar_ventas(pedidos)
+
+    async def _resumen_produccion(self, fechaInicio: str = None, fechaFin: str = None) -> Dict[str, Any]:
+        if self.aggregates is not None:
+            return await self.aggregates.resumen_produccion(fechaInicio, fechaFin)
+        params = self._params_fechas(fechaInicio, fechaFin)
+        resumen = await self._pushdown('produccion', params)
+        if resumen is not None:
+            return resumen
+        if self._streaming():
+            return await agregar_produccion_stream(self.rest.iter_items('/ordenes-produccion', params=params))
+        ordenes = await self.rest.get('/ordenes-produccion', params=params)
+        return agregar_produccion(ordenes)
 
     async def pedidos_por_cliente(self, clienteId: int, fechaInicio: str = None, fechaFin: str = None) -> List[Dict[str, Any]]:
         params = {}
@@ -15,154 +137,129 @@ class ReportService:
         return data
 
     async def consumo_insumos(self, fechaInicio: str = None, fechaFin: str = None) -> List[Dict[str, Any]]:
-        # Strategy: fetch ordenes-produccion and aggregate detalle ordenes
-        params = {}
-        if fechaInicio: params['fechaInicio'] = fechaInicio
-        if fechaFin: params['fechaFin'] = fechaFin
-        ordenes = await self.rest.get('/ordenes-produccion', params=params)
-        usage = {}
-        for orden in ordenes:
-            detalles = orden.get('detalles', [])
-            for d in detalles:
-                insumoId = d['insumoId']
-                cantidad = float(d.get('cantidad_utilizada', 0))
-                if insumoId not in usage:
-                    usage[insumoId] = {'insumoId': insumoId, 'cantidadTotal': 0}
-                usage[insumoId]['cantidadTotal'] += cantidad
-        # Enriquecer con nombre y unidad
+        # Strategy: aggregate detalle ordenes from ordenes-produccion
+        resumen = await self._resumen_produccion(fechaInicio, fechaFin)
+        usage = resumen['insumos']
+        # Enriquecer con nombre y unidad (un insumo que falla queda sin nombre, no tumba el reporte)
         results = []
-        for insumoId, item in usage.items():
-            ins = await self.rest.get(f'/insumos/{insumoId}')
-            item['insumoNombre'] = ins.get('nombre')
-            item['unidad'] = ins.get('unidad_medida')
-            results.append(item)
+        insumos = await self._load_or_none(self.loaders.insumos, usage, 'insumos')
+        for (insumoId, cantidad), ins in zip(usage.items(), insumos):
+            ins = ins or {}
+            results.append({
+                'insumoId': insumoId,
+                'cantidadTotal': cantidad,
+                'insumoNombre': ins.get('nombre'),
+                'unidad': ins.get('unidad_medida'),
+            })
         return results
 
-    async def productos_mas_vendidos(self, limite: int = 10) -> List[Dict[str, Any]]:
+    async def productos_mas_vendidos(self, limite: int = 10, fechaInicio: str = None,
+                                     fechaFin: str = None) -> List[Dict[str, Any]]:
         # Strategy: aggregate from pedidos -> detalles
-        pedidos = await self.rest.get('/pedidos')
-        counts = {}
-        for p in pedidos:
-            for d in p.get('detalles', []):
-                pid = d['productoId']
-                counts.setdefault(pid, 0)
-                counts[pid] += int(d.get('cantidad_solicitada', 0))
-        items = sorted(counts.items(), key=lambda x: x[1], reverse=True)[:limite]
+        if self.aggregates is not None and not (fechaInicio or fechaFin):
+            # Ranking incremental: no hace falta sumar los días ni recorrer el catálogo
+            items = await self.aggregates.top('ventas', 'cantidades', limite)
+        else:
+            items = top_k((await self._resumen_ventas(fechaInicio, fechaFin))['cantidades'], limite)
+        # Solo se enriquecen los ganadores
         results = []
-        for pid, qty in items:
-            prod = await self.rest.get(f'/productos/{pid}')
-            results.append({'productId': pid, 'productName': prod.get('nombre'), 'totalSold': qty})
+        productos = await self._load_or_none(self.loaders.productos, [pid for pid, _ in items], 'productos')
+        for (pid, qty), prod in zip(items, productos):
+            results.append({'productId': pid, 'productName': prod.get('nombre') if prod else None, 'totalSold': qty})
         return results
 
     async def trazabilidad_pedido(self, pedidoId: int) -> Dict[str, Any]:
+        # Tres oleadas como máximo, sin importar el tamaño del pedido:
+        # pedido -> (productos + recetas en paralelo) -> insumos distintos en paralelo
         pedido = await self.rest.get(f'/pedidos/{pedidoId}')
+        detalles = pedido.get('detalles', [])
+        producto_ids = [det['productoId'] for det in detalles]
+        productos, recetas = await asyncio.gather(
+            self._load_or_none(self.loaders.productos, producto_ids, 'productos'),
+            self.loaders.recetas.load_many(producto_ids),
+        )
+        insumo_ids = list(dict.fromkeys(ri['insumoId'] for receta in recetas for ri in receta))
+        # Los productos e insumos que fallan (o con el circuito abierto) quedan sin nombre ni unidad
+        insumos = dict(zip(insumo_ids, await self._load_or_none(self.loaders.insumos, insumo_ids, 'insumos')))
+
         trace = []
-        for det in pedido.get('detalles', []):
-            producto = await self.rest.get(f"/productos/{det['productoId']}")
-            # obtener receta
-            productos_insumo = await self.rest.get(f"/productos-insumos", params={'productoId': det['productoId']})
+        for det, producto, productos_insumo in zip(detalles, productos, recetas):
             receta = []
             for ri in productos_insumo:
-                ins = await self.rest.get(f"/insumos/{ri['insumoId']}")
+                ins = insumos[ri['insumoId']] or {}
                 receta.append({
                     'insumoId': ri['insumoId'],
                     'insumoNombre': ins.get('nombre'),
                     'cantidadNecesaria': float(ri.get('cantidad_necesaria', 0)),
                     'unidadMedida': ins.get('unidad_medida')
                 })
+            producto = producto or {}
             trace.append({
-                'productoId': producto.get('id'),
+                'productoId': producto.get('id', det['productoId']),
                 'nombre': producto.get('nombre'),
                 'cantidadSolicitada': det.get('cantidad_solicitada'),
                 'receta': receta
             })
         return {'pedidoId': pedidoId, 'productos': trace}
 
-    async def reporte_produccion(self, fechaInicio: str = None, fechaFin: str = None) -> Dict[str, Any]:
-        """Genera reporte de producción con estadísticas de órdenes."""
-        params = {}
-        if fechaInicio:
-            params['fechaInicio'] = fechaInicio
-        if fechaFin:
-            params['fechaFin'] = fechaFin
-        
-        ordenes = await self.rest.get('/ordenes-produccion', params=params)
-        
-        # Contar estados
-        completadas = sum(1 for o in ordenes if o.get('estado', '').lower() in ['completada', 'completado', 'finalizada'])
-        pendientes = sum(1 for o in ordenes if o.get('estado', '').lower() in ['pendiente', 'nuevo'])
-        en_proceso = sum(1 for o in ordenes if o.get('estado', '').lower() in ['en_proceso', 'en proceso', 'procesando'])
-        
-        # Agregar producción por producto
-        produccion = {}
-        insumos_utilizados = {}
-        produccion_diaria = {}
-        
-        for orden in ordenes:
-            # Producción por día
-            fecha = orden.get('fecha_inicio', '')[:10] if orden.get('fecha_inicio') else 'sin_fecha'
-            if fecha not in produccion_diaria:
-                produccion_diaria[fecha] = 0
-            produccion_diaria[fecha] += 1
-            
-            # Producción por producto
-            prod_id = orden.get('productoId')
-            if prod_id:
-                if prod_id not in produccion:
-                    produccion[prod_id] = {'productoId': prod_id, 'cantidadProducida': 0}
-                produccion[prod_id]['cantidadProducida'] += int(orden.get('cantidad_producir', 0))
-            
-            # Insumos utilizados
-            for detalle in orden.get('detalles', []):
-                insumo_id = detalle.get('insumoId')
-                if insumo_id:
-                    if insumo_id not in insumos_utilizados:
-                        insumos_utilizados[insumo_id] = {'id_insumo': insumo_id, 'cantidad_utilizada': 0}
-                    insumos_utilizados[insumo_id]['cantidad_utilizada'] += float(detalle.get('cantidad_utilizada', 0))
-        
-        # Enriquecer con nombres de productos
-        produccion_lista = []
-        for prod_id, item in produccion.items():
-            try:
-                prod = await self.rest.get(f'/productos/{prod_id}')
-                item['productoNombre'] = prod.get('nombre')
-            except:
-                item['productoNombre'] = None
-            produccion_lista.append(item)
-        
-        # Enriquecer insumos con nombres
-        insumos_lista = []
-        for insumo_id, item in insumos_utilizados.items():
-            try:
-                insumo = await self.rest.get(f'/insumos/{insumo_id}')
-                item['nombre'] = insumo.get('nombre', '')
-            except:
-                item['nombre'] = ''
-            insumos_lista.append(item)
-        
-        # Ordenar insumos por cantidad utilizada
-        insumos_lista.sort(key=lambda x: x['cantidad_utilizada'], reverse=True)
+    async def _nombres(self, loader, ids: List[Any], tipo: str, enriquecer: bool) -> List[Optional[Dict[str, Any]]]:
+        # Sin el nombre en la selección no se carga el catálogo
+        if not enriquecer:
+            return [None] * len(ids)
+        return await self._load_or_none(loader, ids, tipo)
+
+    async def reporte_produccion(self, fechaInicio: str = None, fechaFin: str = None,
+                                 partes: Optional[AbstractSet[str]] = None) -> ResultadoProduccion:
+        """Genera reporte de producción con estadísticas de órdenes.
+
+        ``partes`` limita lo que se calcula a lo pedido: ``produccionPorProducto``,
+        ``nombresProductos``, ``insumosMasUtilizados``, ``nombresInsumos`` y
+        ``produccionPorDia`` (los contadores siempre). None -> todo.
+        """
+        resumen = await self._resumen_produccion(fechaInicio, fechaFin)
+        produccion = resumen['produccion'] if _pide(partes, 'produccionPorProducto') else {}
+        # Top 10 antes de enriquecer: solo se buscan los nombres que se devuelven
+        insumos_top = (top_k(resumen['insumos'], 10)
+                       if _pide(partes, 'insumosMasUtilizados') else [])
         
-        # Formatear producción por día
-        produccion_por_dia = [
-            {'fecha': fecha, 'cantidad_ordenes': cantidad}
-            for fecha, cantidad in sorted(produccion_diaria.items())
-        ]
+        # Enriquecer con nombres de productos e insumos
+        productos, insumos = await asyncio.gather(
+            self._nombres(self.loaders.productos, list(produccion), 'productos', _pide(partes, 'nombresProductos')),
+            self._nombres(self.loaders.insumos, [i for i, _ in insumos_top], 'insumos', _pide(partes, 'nombresInsumos')),
+        )
         
-        return {
-            'totalOrdenesProduccion': len(ordenes),
-            'ordenesCompletadas': completadas,
-            'ordenesPendientes': pendientes,
-            'ordenesEnProceso': en_proceso,
-            'produccionPorProducto': produccion_lista,
-            'insumosMasUtilizados': insumos_lista[:10],
-            'produccionPorDia': produccion_por_dia
-        }
+        return ResultadoProduccion(
+            totalOrdenesProduccion=int(resumen['totalOrdenesProduccion']),
+            ordenesCompletadas=int(resumen['ordenesCompletadas']),
+            ordenesPendientes=int(resumen['ordenesPendientes']),
+            ordenesEnProceso=int(resumen['ordenesEnProceso']),
+            produccionPorProducto=[
+                ProduccionProductoFila(int(prod_id), prod.get('nombre') if prod else None, int(cantidad))
+                for (prod_id, cantidad), prod in zip(produccion.items(), productos)
+            ],
+            insumosMasUtilizados=[
+                InsumoUtilizadoFila(int(insumo_id), insumo.get('nombre', '') if insumo else '', float(cantidad))
+                for (insumo_id, cantidad), insumo in zip(insumos_top, insumos)
+            ],
+            produccionPorDia=[
+                ProduccionDiariaFila(fecha, int(cantidad))
+                for fecha, cantidad in sorted(resumen['ordenesDiarias'].items())
+            ] if _pide(partes, 'produccionPorDia') else [],
+            # Solo tiene elementos si el deadline dejó enriquecimientos sin hacer
+            enriquecimientosOmitidos=self.omitidos,
+        )
+
+    async def reporte_inventario(self, partes: Optional[AbstractSet[str]] = None) -> ResultadoInventario:
+        """Genera reporte de inventario de productos e insumos.
 
-    async def reporte_inventario(self) -> Dict[str, Any]:
-        """Genera reporte de inventario de productos e insumos."""
-        productos = await self.rest.get('/productos')
-        insumos = await self.rest.get('/insumos')
+        ``partes``: ``productos`` (totalProductos, productos, valorInventario)
+        y/o ``insumos`` (totalInsumos, insumos, insumosStockBajo); solo se
+        piden al API REST los listados necesarios. None -> ambos.
+        """
+        async def listado(path: str, parte: str) -> List[Dict[str, Any]]:
+            return await self.rest.get(path) if _pide(partes, parte) else []
+
+        productos, insumos = await asyncio.gather(listado('/productos', 'productos'), listado('/insumos', 'insumos'))
         
         valor_inventario = 0.0
         productos_lista = []
@@ -170,103 +267,55 @@ class ReportService:
             precio = float(p.get('precio', p.get('precio_venta', p.get('precioVenta', 0))))
             stock = float(p.get('stock', 0))
             valor_inventario += precio * stock
-            productos_lista.append({
-                'id': p.get('id'),
-                'nombre': p.get('nombre', ''),
-                'stock': stock,
-                'precioVenta': precio
-            })
+            productos_lista.append(ProductoInventarioFila(int(p['id']), p.get('nombre', ''), stock, precio))
         
-        insumos_lista = []
-        insumos_stock_bajo = []
-        for i in insumos:
-            stock = float(i.get('stock', 0))
-            stock_minimo = float(i.get('stock_minimo', i.get('stockMinimo', 10)))
-            insumo_data = {
-                'id': i.get('id'),
-                'nombre': i.get('nombre', ''),
-                'stock': stock,
-                'unidadMedida': i.get('unidad_medida', i.get('unidadMedida')),
-                'stockMinimo': stock_minimo,
-                'precio_unitario': float(i.get('precio_unitario', 0))
-            }
-            insumos_lista.append(insumo_data)
-            
-            # Detectar stock bajo
-            if stock <= stock_minimo:
-                insumos_stock_bajo.append(insumo_data)
+        insumos_lista = [InsumoInventarioFila.desde_dict(insumo_inventario(i)) for i in insumos]
         
-        return {
-            'totalProductos': len(productos),
-            'totalInsumos': len(insumos),
-            'productos': productos_lista,
-            'insumos': insumos_lista,
-            'insumosStockBajo': insumos_stock_bajo,
-            'valorInventario': valor_inventario
-        }
+        return ResultadoInventario(
+            totalProductos=len(productos),
+            totalInsumos=len(insumos),
+            valorInventario=valor_inventario,
+            productos=productos_lista,
+            insumos=insumos_lista,
+            # Las mismas filas que en insumos, con el criterio de stock_bajo
+            insumosStockBajo=[i for i in insumos_lista if i.stock <= i.stockMinimo],
+        )
 
-    async def reporte_ventas(self, fechaInicio: str = None, fechaFin: str = None) -> Dict[str, Any]:
-        """Genera reporte de ventas con estadísticas de pedidos."""
-        params = {}
-        if fechaInicio:
-            params['fechaInicio'] = fechaInicio
-        if fechaFin:
-            params['fechaFin'] = fechaFin
-        
-        pedidos = await self.rest.get('/pedidos', params=params)
-        
-        # Calcular totales
-        total_ventas = sum(float(p.get('total', 0)) for p in pedidos)
-        completados = sum(1 for p in pedidos if p.get('estado', '').lower() in ['completado', 'entregado', 'pagado'])
-        pendientes = sum(1 for p in pedidos if p.get('estado', '').lower() in ['pendiente', 'nuevo', 'en_proceso'])
-        
-        # Agregar ventas por producto y por día
-        ventas = {}
-        ventas_diarias = {}
-        
-        for pedido in pedidos:
-            # Ventas por día
-            fecha = pedido.get('fecha', '')[:10] if pedido.get('fecha') else 'sin_fecha'
-            if fecha not in ventas_diarias:
-                ventas_diarias[fecha] = {'total': 0, 'cantidad': 0}
-            ventas_diarias[fecha]['total'] += float(pedido.get('total', 0))
-            ventas_diarias[fecha]['cantidad'] += 1
-            
-            # Ventas por producto
-            for detalle in pedido.get('detalles', []):
-                prod_id = detalle.get('productoId')
-                if prod_id:
-                    cantidad = int(detalle.get('cantidad_solicitada', 0))
-                    subtotal = float(detalle.get('subtotal', 0))
-                    if prod_id not in ventas:
-                        ventas[prod_id] = {'productoId': prod_id, 'cantidadVendida': 0, 'totalVendido': 0}
-                    ventas[prod_id]['cantidadVendida'] += cantidad
-                    ventas[prod_id]['totalVendido'] += subtotal
+    async def reporte_ventas(self, fechaInicio: str = None, fechaFin: str = None,
+                             partes: Optional[AbstractSet[str]] = None) -> ResultadoVentas:
+        """Genera reporte de ventas con estadísticas de pedidos.
+
+        ``partes``: ``ventasPorProducto``, ``nombres`` (productoNombre) y
+        ``ventasPorDia``; los totales siempre. None -> todo.
+        """
+        resumen = await self._resumen_ventas(fechaInicio, fechaFin)
+        cantidades, totales = resumen['cantidades'], resumen['totales']
         
         # Enriquecer con nombres de productos
-        ventas_lista = []
-        for prod_id, item in ventas.items():
-            try:
-                prod = await self.rest.get(f'/productos/{prod_id}')
-                item['productoNombre'] = prod.get('nombre')
-            except:
-                item['productoNombre'] = None
-            ventas_lista.append(item)
+        prod_ids = list(dict.fromkeys([*cantidades, *totales])) if _pide(partes, 'ventasPorProducto') else []
+        productos = await self._nombres(self.loaders.productos, prod_ids, 'productos', _pide(partes, 'nombres'))
+        ventas_lista = [
+            VentaProductoFila(int(prod_id), prod.get('nombre') if prod else None,
+                              int(cantidades.get(prod_id, 0)), float(totales.get(prod_id, 0)))
+            for prod_id, prod in zip(prod_ids, productos)
+        ]
         
         # Ordenar por cantidad vendida
-        ventas_lista.sort(key=lambda x: x['cantidadVendida'], reverse=True)
+        ventas_lista.sort(key=lambda x: x.cantidadVendida, reverse=True)
         
         # Formatear ventas por día
+        total_diario, pedidos_diarios = resumen['totalDiario'], resumen['pedidosDiarios']
         ventas_por_dia = [
-            {'fecha': fecha, 'total': data['total'], 'cantidad': data['cantidad']}
-            for fecha, data in sorted(ventas_diarias.items())
-        ]
+            VentaDiariaFila(fecha, float(total_diario.get(fecha, 0)), int(pedidos_diarios.get(fecha, 0)))
+            for fecha in sorted({*total_diario, *pedidos_diarios})
+        ] if _pide(partes, 'ventasPorDia') else []
         
-        return {
-            'totalVentas': total_ventas,
-            'totalPedidos': len(pedidos),
-            'pedidosCompletados': completados,
-            'pedidosPendientes': pendientes,
-            'ventasPorProducto': ventas_lista,
-            'ventasPorDia': ventas_por_dia
-        }
+        return ResultadoVentas(
+            totalVentas=float(resumen['totalVentas']),
+            totalPedidos=int(resumen['totalPedidos']),
+            pedidosCompletados=int(resumen['pedidosCompletados']),
+            pedidosPendientes=int(resumen['pedidosPendientes']),
+            ventasPorProducto=ventas_lista,
+            ventasPorDia=ventas_por_dia,
+            enriquecimientosOmitidos=self.omitidos,
+        )
@@ -0,0 +1,112 @@
+"""Microbenchmark: resumen de ventas/producción con dicts vs. columnas NumPy.
+
+Genera pedidos y órdenes sintéticos con ``--detalles`` filas de detalle en
+total (unas 3 por pedido) y mide ``agregar_ventas``/``agregar_produccion``
+en Python puro frente al motor columnar. Comprueba además que ambos caminos
+dan el mismo resumen.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.aggregation --detalles 10000 100000 1000000
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+from app import aggregates, columnar
+
+
+ESTADOS_PEDIDO = ['pendiente', 'pagado', 'entregado', 'completado', 'cancelado']
+ESTADOS_ORDEN = ['pendiente', 'en_proceso', 'completada']
+
+
+def generar_pedidos(n_detalles: int, productos: int = 200, dias: int = 365, seed: int = 1):
+    rnd = random.Random(seed)
+    pedidos = []
+    restantes = n_detalles
+    while restantes > 0:
+        n = min(restantes, rnd.randint(1, 5))
+        restantes -= n
+        detalles = []
+        for _ in range(n):
+            cantidad = rnd.randint(1, 20)
+            precio = rnd.choice((1.25, 2.5, 3.75, 4.0))
+            detalles.append({'productoId': rnd.randint(1, productos), 'cantidad_solicitada': cantidad,
+                             'subtotal': cantidad * precio})
+        dia = rnd.randrange(dias)
+        pedidos.append({
+            'id': len(pedidos) + 1,
+            'fecha': f'2025-{1 + dia // 31 % 12:02d}-{1 + dia % 28:02d}T12:00:00',
+            'estado': rnd.choice(ESTADOS_PEDIDO),
+            'total': sum(d['subtotal'] for d in detalles),
+            'detalles': detalles,
+        })
+    return pedidos
+
+
+def generar_ordenes(n_detalles: int, productos: int = 200, insumos: int = 50, seed: int = 2):
+    rnd = random.Random(seed)
+    return [{
+        'id': i + 1,
+        'fecha_inicio': f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}',
+        'estado': rnd.choice(ESTADOS_ORDEN),
+        'productoId': rnd.randint(1, productos),
+        'cantidad_producir': rnd.randint(10, 500),
+        'detalles': [{'insumoId': rnd.randint(1, insumos), 'cantidad_utilizada': rnd.randint(1, 40) / 4}
+                     for _ in range(3)],
+    } for i in range(max(1, n_detalles // 3))]
+
+
+def _medir(fn, datos, repeticiones: int) -> float:
+    mejor = math.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn(datos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def _iguales(a, b) -> bool:
+    for campo, valor in a.items():
+        otro = b[campo]
+        if isinstance(valor, dict):
+            if list(valor) != list(otro) or any(not math.isclose(valor[k], otro[k], rel_tol=1e-9) for k in valor):
+                return False
+        elif not math.isclose(valor, otro, rel_tol=1e-9):
+            return False
+    return True
+
+
+def ejecutar(n_detalles: int, repeticiones: int) -> dict:
+    pedidos = generar_pedidos(n_detalles)
+    ordenes = generar_ordenes(n_detalles)
+    resultado = {'detalles': n_detalles, 'pedidos': len(pedidos), 'ordenes': len(ordenes)}
+    for nombre, datos, python, numpy_ in (
+        ('ventas', pedidos, aggregates.agregar_ventas, columnar.agregar_ventas_columnar),
+        ('produccion', ordenes, aggregates.agregar_produccion, columnar.agregar_produccion_columnar),
+    ):
+        t_python = _medir(python, datos, repeticiones)
+        t_numpy = _medir(numpy_, datos, repeticiones)
+        resultado[nombre] = {
+            'pythonMs': round(t_python * 1000, 2),
+            'columnarMs': round(t_numpy * 1000, 2),
+            'speedup': round(t_python / t_numpy, 2),
+            'iguales': _iguales(python(datos), numpy_(datos)),
+        }
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--detalles', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    if not columnar.disponible():
+        raise SystemExit('numpy no está instalado: pip install numpy')
+    print(json.dumps([ejecutar(n, args.repeticiones) for n in args.detalles], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Prueba de carga: conexiones abiertas hacia el API REST bajo tráfico sostenido.
+
+Lanza ``--users`` clientes concurrentes, cada uno con su propio token Bearer,
+que consultan ``/graphql`` durante ``--seconds`` segundos. Compara el modo
+``shared`` (pool único con el token aplicado por llamada) con ``per_request``
+(un RESTClient nuevo por request, el comportamiento anterior) y muestrea las
+conexiones abiertas en el servidor REST falso.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.connection_pool --users 50 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.fake_rest import FakeRESTServer
+from benchmarks.utils import lifespan
+
+
+QUERY = '{ consumoInsumos { insumoId insumoNombre cantidadTotal } }'
+
+
+def _routes(path, query):
+    if path.endswith('/ordenes-produccion'):
+        return [{'id': i, 'detalles': [{'insumoId': i % 5, 'cantidad_utilizada': 1}]} for i in range(20)]
+    if '/insumos/' in path:
+        insumo_id = int(path.rsplit('/', 1)[1])
+        return {'id': insumo_id, 'nombre': f'Insumo {insumo_id}', 'unidad_medida': 'kg'}
+    raise KeyError(path)
+
+
+async def _run(mode: str, users: int, seconds: float, latency: float) -> dict:
+    async with FakeRESTServer(_routes, latency=latency) as upstream:
+        os.environ['API_URL'] = upstream.url
+        os.environ['API_TOKEN'] = 'service-token'
+        os.environ['CACHE_ENABLED'] = 'false'
+        from app.main import create_app
+        from infrastructure.http_client import RESTClient
+
+        if mode == 'per_request':
+            shared_for_token = RESTClient.for_token
+            RESTClient.for_token = lambda self, token: RESTClient(base_url=self.base_url, token=token)
+
+        app = create_app()
+        samples = []
+        completed = 0
+        deadline = time.monotonic() + seconds
+
+        async def user(n: int, client: httpx.AsyncClient):
+            nonlocal completed
+            headers = {'Authorization': f'Bearer user-{n}'}
+            while time.monotonic() < deadline:
+                resp = await client.post('/graphql', json={'query': QUERY}, headers=headers)
+                resp.raise_for_status()
+                completed += 1
+
+        async def sampler():
+            while time.monotonic() < deadline:
+                samples.append(upstream.open_connections)
+                await asyncio.sleep(0.25)
+
+        transport = httpx.ASGITransport(app=app)
+        async with lifespan(app), httpx.AsyncClient(transport=transport, base_url='http://graphql') as client:
+            await asyncio.gather(sampler(), *(user(n, client) for n in range(users)))
+
+        if mode == 'per_request':
+            RESTClient.for_token = shared_for_token
+
+        return {
+            'mode': mode,
+            'users': users,
+            'graphqlRequests': completed,
+            'upstreamRequests': upstream.requests,
+            'connectionsOpened': upstream.connections_opened,
+            'maxOpenConnections': upstream.max_open_connections,
+            'openConnectionsSamples': samples,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--latency', type=float, default=0.005, help='latencia inyectada en el REST falso (s)')
+    parser.add_argument('--mode', choices=['shared', 'per_request', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = ['per_request', 'shared'] if args.mode == 'both' else [args.mode]
+    results = [asyncio.run(_run(mode, args.users, args.seconds, args.latency)) for mode in modes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
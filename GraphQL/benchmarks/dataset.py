@@ -0,0 +1,94 @@
+"""Datos sintéticos del API REST de Sistema Chifles a escala configurable.
+
+``ChiflesDataset`` genera pedidos, órdenes de producción, productos, insumos
+y recetas con semilla fija, y ``routes`` los sirve con la misma forma que el
+API real (listas sin envolver, detalles anidados). Los listados grandes se
+serializan una sola vez para que el servidor falso no sea el cuello de botella.
+
+Con ``agregados=True`` sirve además ``/reportes/agregados`` (el contrato de
+``infrastructure.aggregation``), sumando en el servidor con el rango de fechas.
+"""
+import json
+import random
+from typing import Any, Dict
+
+from app.aggregates import agregar_produccion, agregar_ventas, dia
+from benchmarks.aggregation import generar_ordenes, generar_pedidos
+
+
+class ChiflesDataset:
+    def __init__(self, pedidos: int = 5000, ordenes: int = 2000, productos: int = 200, insumos: int = 50,
+                 clientes: int = 500, seed: int = 7, agregados: bool = False):
+        rnd = random.Random(seed)
+        self.agregados = agregados
+        self.pedidos = generar_pedidos(pedidos * 5, productos=productos, seed=seed)[:pedidos]
+        for pedido in self.pedidos:
+            pedido['clienteId'] = rnd.randint(1, clientes)
+        self.ordenes = generar_ordenes(ordenes * 3, productos=productos, insumos=insumos, seed=seed + 1)
+        self.productos = [
+            {'id': i, 'nombre': f'Chifle {i}', 'stock': rnd.randint(0, 500),
+             'precio_venta': rnd.choice((1.25, 2.5, 3.75, 4.0))}
+            for i in range(1, productos + 1)
+        ]
+        self.insumos = [
+            {'id': i, 'nombre': f'Insumo {i}', 'stock': rnd.randint(0, 200), 'stock_minimo': 20,
+             'unidad_medida': rnd.choice(('kg', 'l', 'und')), 'precio_unitario': rnd.randint(1, 40) / 4}
+            for i in range(1, insumos + 1)
+        ]
+        self.recetas = {
+            p['id']: [{'productoId': p['id'], 'insumoId': rnd.randint(1, insumos),
+                       'cantidad_necesaria': rnd.randint(1, 8) / 4} for _ in range(3)]
+            for p in self.productos
+        }
+        self._pedidos_por_id = {p['id']: p for p in self.pedidos}
+        self._json = {
+            '/pedidos': json.dumps(self.pedidos).encode(),
+            '/ordenes-produccion': json.dumps(self.ordenes).encode(),
+            '/productos': json.dumps(self.productos).encode(),
+            '/insumos': json.dumps(self.insumos).encode(),
+        }
+
+    def describe(self) -> Dict[str, int]:
+        return {
+            'pedidos': len(self.pedidos),
+            'ordenes': len(self.ordenes),
+            'productos': len(self.productos),
+            'insumos': len(self.insumos),
+            'pedidosBytes': len(self._json['/pedidos']),
+        }
+
+    def _agregado(self, query: Dict[str, str]) -> Dict[str, Any]:
+        desde, hasta = query.get('fechaInicio', '')[:10], query.get('fechaFin', '')[:10] or '9999'
+
+        def en_rango(fecha):
+            return (not query.get('fechaInicio') and not query.get('fechaFin')) or desde <= dia(fecha) <= hasta
+
+        if query['tipo'] == 'ventas':
+            return agregar_ventas(p for p in self.pedidos if en_rango(p.get('fecha')))
+        return agregar_produccion(o for o in self.ordenes if en_rango(o.get('fecha_inicio')))
+
+    def routes(self, path: str, query: Dict[str, str]) -> Any:
+        """Resuelve ``path`` (con o sin el prefijo ``/chifles``); KeyError -> 404."""
+        if path.startswith('/chifles'):
+            path = path[len('/chifles'):]
+        if path == '/pedidos' and 'clienteId' in query:
+            cliente = int(query['clienteId'])
+            return [p for p in self.pedidos if p['clienteId'] == cliente]
+        if path == '/productos-insumos':
+            return self.recetas.get(int(query.get('productoId', 0)), [])
+        if path in self._json:
+            return self._json[path]
+        if path == '/reportes/agregados' and self.agregados:
+            return self._agregado(query)
+
+        recurso, _, entity_id = path.rpartition('/')
+        if not entity_id.isdigit():
+            raise KeyError(path)
+        entity_id = int(entity_id)
+        if recurso == '/pedidos':
+            return self._pedidos_por_id[entity_id]
+        if recurso == '/productos' and 1 <= entity_id <= len(self.productos):
+            return self.productos[entity_id - 1]
+        if recurso == '/insumos' and 1 <= entity_id <= len(self.insumos):
+            return self.insumos[entity_id - 1]
+        raise KeyError(path)
@@ -0,0 +1,153 @@
+"""Servidor HTTP/1.1 mínimo que imita al API REST de Sistema Chifles.
+
+Sirve JSON con keep-alive y cuenta conexiones y peticiones, para poder medir
+cómo se comporta el servicio GraphQL frente al upstream sin levantar Nest ni
+Postgres. Las rutas se resuelven con una función ``routes(path, query)``, que
+puede devolver datos o el JSON ya serializado (``bytes``).
+
+También se puede levantar suelto con datos sintéticos, para apuntar a él un
+servicio GraphQL real (``API_URL=http://127.0.0.1:3000``):
+    python -m benchmarks.fake_rest --pedidos 20000 --latency 0.01 --port 3000
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+
+Routes = Callable[[str, Dict[str, str]], Any]
+
+
+class FakeRESTServer:
+    def __init__(self, routes: Routes, latency: float = 0.0, host: str = '127.0.0.1', port: int = 0,
+                 jitter: float = 0.0):
+        self.routes = routes
+        # Cada respuesta tarda latency + uniforme(0, jitter) segundos
+        self.latency = latency
+        self.jitter = jitter
+        self.host = host
+        self.port = port
+        self.connections_opened = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.requests = 0
+        self.requests_by_path: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    async def start(self) -> 'FakeRESTServer':
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Cierra también las conexiones keep-alive que los clientes dejaron abiertas
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            await asyncio.sleep(0)
+
+    async def __aenter__(self) -> 'FakeRESTServer':
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        self.connections_opened += 1
+        self.open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self.open_connections)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length:
+                    await reader.readexactly(length)
+
+                _, target, _ = request_line.decode('latin-1').split(' ', 2)
+                url = urlsplit(target)
+                status, body = await self._respond(url.path, dict(parse_qsl(url.query)))
+                writer.write(
+                    f'HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n'
+                    f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.open_connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, path: str, query: Dict[str, str]):
+        self.requests += 1
+        self.requests_by_path[path] = self.requests_by_path.get(path, 0) + 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        try:
+            data = self.routes(path, query)
+        except KeyError:
+            return 404, b'{"message": "Not Found"}'
+        body = data if isinstance(data, bytes) else json.dumps(data).encode()
+        self.bytes_sent += len(body)
+        return 200, body
+
+    def reset_counters(self) -> None:
+        self.requests = 0
+        self.requests_by_path = {}
+        self.bytes_sent = 0
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    from benchmarks.dataset import ChiflesDataset
+
+    dataset = ChiflesDataset(pedidos=args.pedidos, ordenes=args.ordenes, productos=args.productos,
+                             insumos=args.insumos)
+    server = FakeRESTServer(dataset.routes, latency=args.latency, jitter=args.jitter, port=args.port)
+    await server.start()
+    print(f"✅ API REST falso en {server.url} {json.dumps(dataset.describe())}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=20000)
+    parser.add_argument('--ordenes', type=int, default=5000)
+    parser.add_argument('--productos', type=int, default=200)
+    parser.add_argument('--insumos', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0, help='latencia fija por respuesta (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latencia aleatoria extra, uniforme (s)')
+    parser.add_argument('--port', type=int, default=3000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
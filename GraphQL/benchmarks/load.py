@@ -0,0 +1,154 @@
+"""Prueba de carga de extremo a extremo: dashboards concurrentes contra ``/graphql``.
+
+Levanta el REST falso con ``ChiflesDataset`` y la app FastAPI en proceso
+(``httpx.ASGITransport``, con sus hooks de startup/shutdown), y lanza
+``--dashboards`` usuarios que piden en bucle la consulta completa del
+dashboard durante ``--seconds``. Con ``--url`` apunta en cambio a un servicio
+ya levantado (el REST falso se levanta aparte con ``benchmarks.fake_rest``).
+
+Resultado: throughput, latencias p50/p90/p99, errores y llamadas upstream
+(por plantilla de endpoint), en JSON. ``--baseline`` compara con un JSON
+anterior y termina con código 1 si alguna métrica empeora más de
+``--tolerance``.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.load --dashboards 20 --seconds 15 --output load.json
+    python -m benchmarks.load --baseline load.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from benchmarks.dataset import ChiflesDataset
+from benchmarks.fake_rest import FakeRESTServer
+from benchmarks.persisted_queries import DASHBOARD_QUERY
+from benchmarks.utils import compare, latency_summary, lifespan, upstream_by_endpoint, write_json
+
+
+async def _dashboards(client: httpx.AsyncClient, dashboards: int, seconds: float, users: int) -> dict:
+    tiempos = []
+    errores = 0
+    deadline = time.monotonic() + seconds
+    variables = {'fechaInicio': '2025-01-01', 'fechaFin': '2025-12-31'}
+
+    async def dashboard(n: int):
+        nonlocal errores
+        # Los dashboards se reparten entre ``users`` usuarios (cada uno con su token y su scope de caché)
+        headers = {'Authorization': f'Bearer user-{n % users}'}
+        while time.monotonic() < deadline:
+            inicio = time.perf_counter()
+            try:
+                resp = await client.post('/graphql', json={'query': DASHBOARD_QUERY, 'variables': variables},
+                                         headers=headers)
+                body = resp.json()
+                ok = resp.status_code == 200 and not body.get('errors')
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            tiempos.append(time.perf_counter() - inicio)
+            errores += not ok
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(dashboard(n) for n in range(dashboards)))
+    duracion = time.perf_counter() - inicio
+    return {
+        'requests': len(tiempos),
+        'errors': errores,
+        'seconds': round(duracion, 2),
+        'throughputRps': round(len(tiempos) / duracion, 1),
+        'latency': latency_summary(tiempos),
+    }
+
+
+async def _run_local(args: argparse.Namespace) -> dict:
+    dataset = ChiflesDataset(pedidos=args.pedidos, ordenes=args.ordenes, productos=args.productos,
+                             insumos=args.insumos)
+    async with FakeRESTServer(dataset.routes, latency=args.latency, jitter=args.jitter) as upstream:
+        os.environ['API_URL'] = upstream.url
+        os.environ['API_TOKEN'] = 'service-token'
+        if args.no_cache:
+            os.environ['CACHE_ENABLED'] = 'false'
+            os.environ['REPORT_CACHE_ENABLED'] = 'false'
+        from app.main import create_app
+
+        app = create_app()
+        transport = httpx.ASGITransport(app=app)
+        async with lifespan(app), httpx.AsyncClient(transport=transport, base_url='http://graphql',
+                                                    timeout=60) as client:
+            upstream.reset_counters()
+            resultado = await _dashboards(client, args.dashboards, args.seconds, args.users)
+        resultado['dataset'] = dataset.describe()
+        resultado['upstream'] = {
+            'requests': upstream.requests,
+            'perDashboard': round(upstream.requests / max(1, resultado['requests']), 2),
+            'byEndpoint': upstream_by_endpoint(upstream.requests_by_path),
+            'maxOpenConnections': upstream.max_open_connections,
+        }
+        return resultado
+
+
+async def _run_remote(args: argparse.Namespace) -> dict:
+    async with httpx.AsyncClient(base_url=args.url.rstrip('/'), timeout=60) as client:
+        return await _dashboards(client, args.dashboards, args.seconds, args.users)
+
+
+def _metricas(resultado: dict) -> dict:
+    metricas = {
+        'throughputRps': resultado['throughputRps'],
+        'p50Ms': resultado['latency'].get('p50Ms', 0),
+        'p99Ms': resultado['latency'].get('p99Ms', 0),
+    }
+    if 'upstream' in resultado:
+        metricas['upstreamPerDashboard'] = resultado['upstream']['perDashboard']
+    return metricas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dashboards', type=int, default=20, help='dashboards concurrentes')
+    parser.add_argument('--users', type=int, default=5, help='usuarios (tokens) distintos')
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--pedidos', type=int, default=5000)
+    parser.add_argument('--ordenes', type=int, default=2000)
+    parser.add_argument('--productos', type=int, default=200)
+    parser.add_argument('--insumos', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.005, help='latencia inyectada en el REST falso (s)')
+    parser.add_argument('--jitter', type=float, default=0.005)
+    parser.add_argument('--no-cache', action='store_true', help='desactiva las cachés de catálogo y reportes')
+    parser.add_argument('--url', help='servicio GraphQL ya levantado (p. ej. http://127.0.0.1:8001)')
+    parser.add_argument('--output', help='fichero JSON de resultados')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='empeoramiento máximo admitido (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    resultado = asyncio.run(_run_remote(args) if args.url else _run_local(args))
+    resultado = {
+        'benchmark': 'load',
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')},
+        **resultado,
+        'metrics': {},
+    }
+    resultado['metrics'] = _metricas(resultado)
+
+    regresion = False
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            base = json.load(f)
+        resultado['comparison'] = compare(base.get('metrics', {}), resultado['metrics'], args.tolerance,
+                                          higher_is_better=('throughputRps',))
+        regresion = any(c['regression'] for c in resultado['comparison'])
+
+    if args.output:
+        write_json(args.output, resultado)
+    print(json.dumps(resultado, indent=2))
+    if regresion:
+        print("⚠️ Regresión respecto al baseline", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Microbenchmark: reporte de ventas grande servido como filas tipadas vs. dicts re-materializados.
+
+Parte de un resumen de ventas ya agregado (``--productos`` productos y
+``--dias`` días) y mide, para la consulta completa de ``reporteVentas``
+ejecutada con el schema GraphQL hasta el JSON de respuesta:
+
+* ``typed``: ``ReportService`` devuelve ``ResultadoVentas`` (filas con
+  ``__slots__``) y el resolver lo sirve tal cual.
+* ``dicts``: el camino anterior, reproducido aquí: filas como dicts y un
+  segundo recorrido que crea ``VentaProducto``, ``ProductoVendidoReporte`` y
+  ``VentaDiaria`` con ``int()``/``float()`` (dos listas por producto).
+
+Por camino (intercalados): tiempo de la ejecución completa (media/p50/p99) y
+solo de construir el reporte, bloques y KiB vivos del reporte construido y
+pico de memoria de una ejecución (``tracemalloc``).
+
+Uso (desde GraphQL/):
+    python -m benchmarks.materialization --productos 5000 --dias 365 --iterations 20
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import strawberry
+
+from app.usecases import ReportService
+from benchmarks.utils import latency_summary, write_json
+from interface.graphql.types import ProductoVendidoReporte, ReporteVentas, VentaDiaria, VentaProducto
+
+
+QUERY = """
+query { reporteVentas {
+    totalVentas totalPedidos cantidadPedidos pedidosCompletados pedidosPendientes
+    ventasPorProducto { productoId productoNombre cantidadVendida totalVendido }
+    productosMasVendidos { idProducto nombre cantidadVendida totalVendido }
+    ventasPorDia { fecha total cantidad }
+} }
+"""
+
+
+class _ResumenFijo:
+    """Hace de AggregateStore: devuelve siempre el mismo resumen, sin I/O."""
+
+    def __init__(self, productos: int, dias: int):
+        self.resumen = {
+            'totalVentas': 0.0, 'totalPedidos': dias * 10, 'pedidosCompletados': dias * 7,
+            'pedidosPendientes': dias * 3,
+            'cantidades': {pid: pid % 97 + 1 for pid in range(1, productos + 1)},
+            'totales': {pid: (pid % 97 + 1) * 2.5 for pid in range(1, productos + 1)},
+            'totalDiario': {f'2025-{1 + d // 28 % 12:02d}-{1 + d % 28:02d}': 100.0 + d for d in range(dias)},
+            'pedidosDiarios': {f'2025-{1 + d // 28 % 12:02d}-{1 + d % 28:02d}': 10 for d in range(dias)},
+        }
+        self.resumen['totalVentas'] = sum(self.resumen['totales'].values())
+
+    async def resumen_ventas(self, fechaInicio=None, fechaFin=None):
+        return self.resumen
+
+
+class _Catalogo:
+    async def get(self, path, params=None):
+        return {'id': int(path.rsplit('/', 1)[1]), 'nombre': f'Chifle {path.rsplit("/", 1)[1]}'}
+
+
+def _como_dicts(r) -> dict:
+    # Forma del resultado de ReportService.reporte_ventas antes de las filas tipadas
+    return {
+        'totalVentas': r.totalVentas, 'totalPedidos': r.totalPedidos,
+        'pedidosCompletados': r.pedidosCompletados, 'pedidosPendientes': r.pedidosPendientes,
+        'ventasPorProducto': [{'productoId': v.productoId, 'cantidadVendida': v.cantidadVendida,
+                               'totalVendido': v.totalVendido, 'productoNombre': v.productoNombre}
+                              for v in r.ventasPorProducto],
+        'ventasPorDia': [{'fecha': d.fecha, 'total': d.total, 'cantidad': d.cantidad} for d in r.ventasPorDia],
+    }
+
+
+def _rematerializar(data: dict) -> ReporteVentas:
+    # El segundo recorrido que hacía el resolver
+    return ReporteVentas(
+        totalVentas=float(data.get('totalVentas', 0)),
+        totalPedidos=int(data.get('totalPedidos', 0)),
+        cantidadPedidos=int(data.get('totalPedidos', 0)),
+        pedidosCompletados=int(data.get('pedidosCompletados', 0)),
+        pedidosPendientes=int(data.get('pedidosPendientes', 0)),
+        ventasPorProducto=[
+            VentaProducto(productoId=int(v['productoId']), productoNombre=v.get('productoNombre'),
+                          cantidadVendida=int(v.get('cantidadVendida', 0)), totalVendido=float(v.get('totalVendido', 0)))
+            for v in data.get('ventasPorProducto', [])
+        ],
+        productosMasVendidos=[
+            ProductoVendidoReporte(idProducto=int(v['productoId']), nombre=v.get('productoNombre') or '',
+                                   cantidadVendida=int(v.get('cantidadVendida', 0)),
+                                   totalVendido=float(v.get('totalVendido', 0)))
+            for v in data.get('ventasPorProducto', [])
+        ],
+        ventasPorDia=[
+            VentaDiaria(fecha=v['fecha'], total=float(v.get('total', 0)), cantidad=int(v.get('cantidad', 0)))
+            for v in data.get('ventasPorDia', [])
+        ],
+    )
+
+
+def _schema(camino: str) -> strawberry.Schema:
+    # Mismo schema mínimo (sin extensiones) para los dos caminos: solo cambia lo que devuelve el resolver
+    @strawberry.type
+    class Query:
+        @strawberry.field
+        async def reporteVentas(self, info, fechaInicio: Optional[str] = None,
+                                fechaFin: Optional[str] = None) -> ReporteVentas:
+            return await _reporte(camino, info.context)
+
+    return strawberry.Schema(query=Query)
+
+
+async def _reporte(camino: str, context: dict):
+    # Solo el cálculo del reporte, para contar los objetos que quedan vivos
+    resultado = await ReportService(context['rest'], aggregates=context['aggregates']).reporte_ventas()
+    return resultado if camino == 'typed' else _rematerializar(_como_dicts(resultado))
+
+
+def _memoria(camino: str, s: strawberry.Schema, context: dict) -> dict:
+    async def medir() -> dict:
+        tracemalloc.start()
+        antes = tracemalloc.take_snapshot()
+        reporte = await _reporte(camino, context)
+        diff = tracemalloc.take_snapshot().compare_to(antes, 'filename')
+        del reporte
+        tracemalloc.reset_peak()
+        await s.execute(QUERY, context_value=dict(context))
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'reportLiveBlocks': sum(stat.count_diff for stat in diff),
+            'reportLiveKiB': round(sum(stat.size_diff for stat in diff) / 1024, 1),
+            'executionPeakKiB': round(pico / 1024, 1),
+        }
+    return medir()
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    context = {'rest': _Catalogo(), 'aggregates': _ResumenFijo(args.productos, args.dias)}
+    caminos = ('dicts', 'typed')
+    schemas = {camino: _schema(camino) for camino in caminos}
+    tiempos: Dict[str, List[float]] = {camino: [] for camino in caminos}
+    construccion: Dict[str, List[float]] = {camino: [] for camino in caminos}
+    cuerpos: Dict[str, bytes] = {}
+    for camino in caminos:
+        await schemas[camino].execute(QUERY, context_value=dict(context))   # calentamiento
+    # Caminos intercalados: el ruido (GC, CPU) se reparte por igual
+    for _ in range(args.iterations):
+        for camino in caminos:
+            inicio = time.perf_counter()
+            await _reporte(camino, context)
+            construccion[camino].append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            result = await schemas[camino].execute(QUERY, context_value=dict(context))
+            cuerpos[camino] = json.dumps({'data': result.data}).encode()
+            tiempos[camino].append(time.perf_counter() - inicio)
+            assert result.errors is None, result.errors
+    assert cuerpos['dicts'] == cuerpos['typed']
+
+    resultados = []
+    for camino in caminos:
+        resultados.append({
+            'path': camino,
+            **latency_summary(tiempos[camino]),
+            'buildMeanMs': round(sum(construccion[camino]) / len(construccion[camino]) * 1000, 2),
+            **await _memoria(camino, schemas[camino], context),
+            'responseBytes': len(cuerpos[camino]),
+        })
+    return {
+        'benchmark': 'materialization',
+        'productos': args.productos,
+        'dias': args.dias,
+        'iterations': args.iterations,
+        'results': resultados,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--productos', type=int, default=5000)
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--output', help='fichero JSON de resultados')
+    args = parser.parse_args()
+
+    resultado = asyncio.run(_run(args))
+    if args.output:
+        write_json(args.output, resultado)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Microbenchmark: coste de parsear y validar la consulta del dashboard por request.
+
+Compara el esquema con ``DocumentCache`` frente al mismo esquema sin ella,
+ejecutando la consulta completa del dashboard contra un REST falso en memoria
+(datos mínimos, para que domine el trabajo de GraphQL), y mide además
+``parse`` + ``validate`` por separado.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.persisted_queries --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import strawberry
+from graphql import parse, validate
+
+from interface.graphql.cost import QueryCostExtension
+from interface.graphql.persisted import DocumentCache
+from interface.graphql.resolvers import Query
+
+
+DASHBOARD_QUERY = """
+query Dashboard($fechaInicio: String, $fechaFin: String) {
+  reporteVentas(fechaInicio: $fechaInicio, fechaFin: $fechaFin) {
+    totalVentas totalPedidos cantidadPedidos pedidosCompletados pedidosPendientes
+    ventasPorProducto { productoId productoNombre cantidadVendida totalVendido }
+    productosMasVendidos { idProducto nombre cantidadVendida totalVendido }
+    ventasPorDia { fecha total cantidad }
+  }
+  reporteProduccion(fechaInicio: $fechaInicio, fechaFin: $fechaFin) {
+    totalOrdenesProduccion ordenesCompletadas ordenesPendientes ordenesEnProceso
+    produccionPorProducto { productoId productoNombre cantidadProducida }
+    insumosMasUtilizados { idInsumo nombre cantidadUtilizada }
+    produccionPorDia { fecha cantidadOrdenes }
+  }
+  reporteInventario {
+    totalProductos totalInsumos valorInventario
+    productos { id nombre stock precioVenta }
+    insumos { id nombre stock unidadMedida stockMinimo precioUnitario }
+    insumosStockBajo { id nombre stock unidadMedida stockMinimo precioUnitario }
+  }
+  productosMasVendidos(limite: 5) { productoId productoNombre cantidadVendida }
+}
+"""
+
+
+class _StaticRest:
+    async def get(self, path, params=None):
+        if path.startswith('/productos/') or path.startswith('/insumos/'):
+            return {'id': int(path.rsplit('/', 1)[1]), 'nombre': 'x'}
+        return []
+
+
+async def _por_request(schema: strawberry.Schema, requests: int) -> float:
+    rest = _StaticRest()
+    await schema.execute(DASHBOARD_QUERY, context_value={'rest': rest})  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(requests):
+        result = await schema.execute(DASHBOARD_QUERY, context_value={'rest': rest})
+        assert result.errors is None, result.errors
+    return (time.perf_counter() - inicio) / requests
+
+
+def _parse_validate(schema: strawberry.Schema, requests: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(requests):
+        validate(schema._schema, parse(DASHBOARD_QUERY))
+    return (time.perf_counter() - inicio) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    sin_cache = strawberry.Schema(query=Query, extensions=[QueryCostExtension])
+    con_cache = strawberry.Schema(query=Query, extensions=[DocumentCache, QueryCostExtension])
+
+    t_sin = asyncio.run(_por_request(sin_cache, args.requests))
+    t_con = asyncio.run(_por_request(con_cache, args.requests))
+    t_parse = _parse_validate(sin_cache, args.requests)
+    print(json.dumps({
+        'requests': args.requests,
+        'queryBytes': len(DASHBOARD_QUERY),
+        'parseValidateUs': round(t_parse * 1e6, 1),
+        'sinCacheUsPorRequest': round(t_sin * 1e6, 1),
+        'conCacheUsPorRequest': round(t_con * 1e6, 1),
+        'ahorroUsPorRequest': round((t_sin - t_con) * 1e6, 1),
+        'documentCache': DocumentCache.documents.stats(),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
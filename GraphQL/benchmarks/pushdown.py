@@ -0,0 +1,127 @@
+"""Benchmark: agregación local vs. en el API REST (pushdown) vs. snapshot SQLite.
+
+Levanta ``FakeRESTServer`` con ``ChiflesDataset(agregados=True)`` y ejecuta
+los reportes que suman pedidos/órdenes con un ``ReportService`` nuevo por
+iteración: ``local`` descarga los listados completos, ``pushdown`` pide el
+resumen a ``/reportes/agregados`` y ``snapshot`` lee de ``SnapshotStore``
+(sincronizado una vez antes de medir). Por método y camino: latencia, bytes
+recibidos del upstream por ejecución y llamadas por endpoint.
+
+Comprueba que los tres caminos dan el mismo resultado, sin tener en cuenta el
+orden de las filas agrupadas. Por eso se piden sin fechas: el listado
+``/pedidos`` del API ignora el rango y los otros caminos sí lo aplican.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.pushdown --pedidos 20000 --iterations 10
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import tempfile
+import time
+
+from app.snapshot import SnapshotStore
+from app.usecases import ReportService
+from benchmarks.dataset import ChiflesDataset
+from benchmarks.fake_rest import FakeRESTServer
+from benchmarks.utils import latency_summary, upstream_by_endpoint, write_json
+from infrastructure.aggregation import AggregationClient
+from infrastructure.http_client import RESTClient
+from infrastructure.loaders import CatalogLoaders
+
+
+METODOS = {
+    'productos_mas_vendidos': lambda svc: svc.productos_mas_vendidos(10),
+    'consumo_insumos': lambda svc: svc.consumo_insumos(),
+    'reporte_produccion': lambda svc: svc.reporte_produccion(),
+    'reporte_ventas': lambda svc: svc.reporte_ventas(),
+}
+
+
+CAMINOS = ('local', 'pushdown', 'snapshot')
+
+
+def _sin_orden(valor):
+    # Los mapas agrupados no tienen orden definido (SQLite agrupa por id): se compara el contenido
+    if dataclasses.is_dataclass(valor):
+        valor = dataclasses.asdict(valor)
+    if isinstance(valor, dict):
+        return {k: _sin_orden(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return sorted((_sin_orden(v) for v in valor), key=lambda v: json.dumps(v, sort_keys=True))
+    return valor
+
+
+async def _medir(upstream: FakeRESTServer, rest, nombre: str, camino: str, iterations: int) -> tuple:
+    llamada = METODOS[nombre]
+    aggregation = AggregationClient() if camino != 'local' else None
+    resultado = await llamada(ReportService(rest, CatalogLoaders(rest), aggregation=aggregation))  # calentamiento
+    upstream.reset_counters()
+    tiempos = []
+    for _ in range(iterations):
+        svc = ReportService(rest, CatalogLoaders(rest), aggregation=aggregation)
+        inicio = time.perf_counter()
+        await llamada(svc)
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, {
+        'method': nombre,
+        'path': camino,
+        **latency_summary(tiempos),
+        'upstreamKiBPerRun': round(upstream.bytes_sent / iterations / 1024, 1),
+        'upstreamByEndpoint': upstream_by_endpoint(upstream.requests_by_path),
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    dataset = ChiflesDataset(pedidos=args.pedidos, ordenes=args.ordenes, productos=args.productos,
+                             insumos=args.insumos, agregados=True)
+    resultados = []
+    async with FakeRESTServer(dataset.routes, latency=args.latency) as upstream:
+        rest = RESTClient(base_url=upstream.url, token='bench')
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(rest, os.path.join(tmp, 'snapshot.db'))
+            try:
+                inicio = time.perf_counter()
+                await store.sync()
+                sync_ms = round((time.perf_counter() - inicio) * 1000, 1)
+                clientes = {'local': rest, 'pushdown': rest, 'snapshot': store.view(rest)}
+                for nombre in METODOS:
+                    medidas = [await _medir(upstream, clientes[camino], nombre, camino, args.iterations)
+                               for camino in CAMINOS]
+                    esperado = _sin_orden(medidas[0][0])
+                    assert all(_sin_orden(resultado) == esperado for resultado, _ in medidas), nombre
+                    resultados += [medida for _, medida in medidas]
+            finally:
+                await store.stop()
+                await rest.close()
+    return {
+        'benchmark': 'pushdown',
+        'dataset': dataset.describe(),
+        'latencySeconds': args.latency,
+        'iterations': args.iterations,
+        'snapshotSyncMs': sync_ms,
+        'results': resultados,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=20000)
+    parser.add_argument('--ordenes', type=int, default=5000)
+    parser.add_argument('--productos', type=int, default=200)
+    parser.add_argument('--insumos', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.002, help='latencia inyectada en el REST falso (s)')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--output', help='fichero JSON de resultados')
+    args = parser.parse_args()
+
+    resultado = asyncio.run(_run(args))
+    if args.output:
+        write_json(args.output, resultado)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
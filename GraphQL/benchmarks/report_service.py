@@ -0,0 +1,94 @@
+"""Microbenchmarks de cada método de ``ReportService`` contra el REST falso.
+
+Cada iteración usa un ``ReportService`` nuevo con sus propios loaders y sin
+cachés de proceso (coste en frío de un request), sobre un ``RESTClient`` real
+que habla HTTP con ``FakeRESTServer`` servido con ``ChiflesDataset``. Por
+método se mide latencia (media/p50/p90/p99) y llamadas upstream por ejecución.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.report_service --pedidos 20000 --iterations 20 --output report_service.json
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.usecases import ReportService
+from benchmarks.dataset import ChiflesDataset
+from benchmarks.fake_rest import FakeRESTServer
+from benchmarks.utils import latency_summary, upstream_by_endpoint, write_json
+from infrastructure.http_client import RESTClient
+from infrastructure.loaders import CatalogLoaders
+
+
+METODOS = {
+    'pedidos_por_cliente': lambda svc: svc.pedidos_por_cliente(1),
+    'consumo_insumos': lambda svc: svc.consumo_insumos(),
+    'productos_mas_vendidos': lambda svc: svc.productos_mas_vendidos(10),
+    'trazabilidad_pedido': lambda svc: svc.trazabilidad_pedido(1),
+    'reporte_produccion': lambda svc: svc.reporte_produccion('2025-01-01', '2025-06-30'),
+    'reporte_inventario': lambda svc: svc.reporte_inventario(),
+    'reporte_ventas': lambda svc: svc.reporte_ventas('2025-01-01', '2025-06-30'),
+}
+
+
+async def _medir(upstream: FakeRESTServer, rest: RESTClient, nombre: str, iterations: int, warmup: int) -> dict:
+    llamada = METODOS[nombre]
+    for _ in range(warmup):
+        await llamada(ReportService(rest, CatalogLoaders(rest)))
+    upstream.reset_counters()
+    tiempos = []
+    for _ in range(iterations):
+        svc = ReportService(rest, CatalogLoaders(rest))
+        inicio = time.perf_counter()
+        await llamada(svc)
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        'method': nombre,
+        **latency_summary(tiempos),
+        'upstreamCallsPerRun': round(upstream.requests / iterations, 1),
+        'upstreamByEndpoint': upstream_by_endpoint(upstream.requests_by_path),
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    dataset = ChiflesDataset(pedidos=args.pedidos, ordenes=args.ordenes, productos=args.productos,
+                             insumos=args.insumos)
+    async with FakeRESTServer(dataset.routes, latency=args.latency, jitter=args.jitter) as upstream:
+        rest = RESTClient(base_url=upstream.url, token='bench')
+        try:
+            resultados = [await _medir(upstream, rest, nombre, args.iterations, args.warmup)
+                          for nombre in args.methods]
+        finally:
+            await rest.close()
+    return {
+        'benchmark': 'report_service',
+        'dataset': dataset.describe(),
+        'latencySeconds': args.latency,
+        'iterations': args.iterations,
+        'results': resultados,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=5000)
+    parser.add_argument('--ordenes', type=int, default=2000)
+    parser.add_argument('--productos', type=int, default=200)
+    parser.add_argument('--insumos', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.002, help='latencia inyectada en el REST falso (s)')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--methods', nargs='+', choices=sorted(METODOS), default=list(METODOS))
+    parser.add_argument('--output', help='fichero JSON de resultados')
+    args = parser.parse_args()
+
+    resultado = asyncio.run(_run(args))
+    if args.output:
+        write_json(args.output, resultado)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark de memoria: /pedidos con ``get`` + agregación vs. ``stream_items``.
+
+El upstream es un ``httpx.MockTransport`` que genera el array JSON por trozos
+sobre la marcha, así que la memoria medida con ``tracemalloc`` es solo la del
+cliente: cuerpo, dicts de pedidos y resumen.
+
+Uso (desde GraphQL/):
+    python -m benchmarks.streaming --pedidos 10000 50000 200000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+import httpx
+
+from app import columnar
+from benchmarks.aggregation import generar_pedidos
+from infrastructure.http_client import RESTClient
+
+
+def _transport(n_pedidos: int, por_trozo: int = 500) -> httpx.MockTransport:
+    # Un mismo trozo de pedidos repetido: el upstream nunca tiene el listado entero
+    lote = generar_pedidos(por_trozo * 5)[:por_trozo]
+    trozo = ','.join(json.dumps(p) for p in lote).encode()
+
+    async def cuerpo():
+        yield b'['
+        for inicio in range(0, n_pedidos, por_trozo):
+            yield (b'' if inicio == 0 else b',') + trozo
+        yield b']'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={'Content-Type': 'application/json'}, content=cuerpo())
+
+    return httpx.MockTransport(handler)
+
+
+async def _medir(modo: str, n_pedidos: int) -> dict:
+    client = httpx.AsyncClient(transport=_transport(n_pedidos), base_url='http://rest')
+    rest = RESTClient(base_url='http://rest', token='bench', client=client)
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    if modo == 'buffered':
+        resumen = columnar.agregar_ventas(await rest.get('/pedidos'))
+    else:
+        resumen = await columnar.agregar_ventas_stream(rest.stream_items('/pedidos'))
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await client.aclose()
+    return {
+        'modo': modo,
+        'pedidos': resumen['totalPedidos'],
+        'picoMB': round(pico / 2 ** 20, 1),
+        'segundos': round(segundos, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    args = parser.parse_args()
+
+    resultados = []
+    for n in args.pedidos:
+        for modo in ('buffered', 'streaming'):
+            resultados.append(asyncio.run(_medir(modo, n)))
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == '__main__':
+    main()
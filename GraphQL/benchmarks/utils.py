@@ -0,0 +1,80 @@
+"""Utilidades compartidas por los benchmarks."""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Sequence
+
+from infrastructure.resilience import endpoint_template
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+    """Percentil ``p`` (0-1) de una secuencia ya ordenada (nearest-rank)."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(p * len(ordered)) - 1))]
+
+
+def latency_summary(seconds: Iterable[float]) -> Dict[str, float]:
+    """Resumen en milisegundos: media, p50, p90, p99 y máximo."""
+    ordered = sorted(seconds)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'meanMs': round(sum(ordered) / len(ordered) * 1000, 2),
+        'p50Ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p90Ms': round(percentile(ordered, 0.90) * 1000, 2),
+        'p99Ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'maxMs': round(ordered[-1] * 1000, 2),
+    }
+
+
+def upstream_by_endpoint(requests_by_path: Dict[str, int]) -> Dict[str, int]:
+    """Agrupa las peticiones del REST falso por plantilla (``/productos/{id}``)."""
+    grouped: Dict[str, int] = {}
+    for path, count in requests_by_path.items():
+        endpoint = endpoint_template(path)
+        grouped[endpoint] = grouped.get(endpoint, 0) + count
+    return dict(sorted(grouped.items()))
+
+
+def write_json(path: str, data) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], tolerance: float,
+            higher_is_better: Iterable[str] = ()) -> List[dict]:
+    """Compara métricas numéricas con un baseline y marca las que empeoran más de ``tolerance``."""
+    higher = set(higher_is_better)
+    report = []
+    for name, actual in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = (actual - base) / base
+        worse = -change if name in higher else change
+        report.append({'metric': name, 'baseline': base, 'current': actual,
+                       'changePct': round(change * 100, 1), 'regression': worse > tolerance})
+    return report
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Ejecuta los hooks de startup/shutdown de una app ASGI sin levantar un servidor."""
+    receive_queue: asyncio.Queue = asyncio.Queue()
+    sent: asyncio.Queue = asyncio.Queue()
+    scope = {'type': 'lifespan', 'asgi': {'version': '3.0'}, 'state': {}}
+    task = asyncio.create_task(app(scope, receive_queue.get, sent.put))
+
+    await receive_queue.put({'type': 'lifespan.startup'})
+    message = await sent.get()
+    if message['type'] != 'lifespan.startup.complete':
+        raise RuntimeError(f"Startup falló: {message.get('message')}")
+    try:
+        yield app
+    finally:
+        await receive_queue.put({'type': 'lifespan.shutdown'})
+        await sent.get()
+        await task
@@ -0,0 +1,144 @@
+"""Escalado con varios workers: throughput del dashboard con 1, 2, 4... procesos.
+
+Levanta el REST falso (``benchmarks.fake_rest``) y, para cada valor de
+``--workers``, el servicio con ``uvicorn --workers N`` (el mismo modo que el
+Dockerfile con ``WEB_CONCURRENCY``). La carga la generan ``--clients``
+procesos de ``benchmarks.load --url`` en paralelo, para que el generador no
+sea el cuello de botella, y se suman sus throughputs.
+
+Resultado por número de workers: throughput, p50/p99 (peor cliente) y
+eficiencia de escalado (``rps_N / (N * rps_1)``; 1.0 = lineal). Con
+``--cache-backend redis`` los workers comparten las cachés (``CACHE_REDIS_URL``).
+
+Uso (desde GraphQL/):
+    python -m benchmarks.workers --workers 1 2 4 --clients 4 --seconds 15 --output workers.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.utils import write_json
+
+
+def _esperar(url: str, proceso: subprocess.Popen, timeout: float = 60.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El proceso terminó al arrancar (código {proceso.returncode})")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} no respondió en {timeout:.0f}s")
+
+
+def _detener(proceso: subprocess.Popen) -> None:
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+
+
+def _carga(url: str, args: argparse.Namespace, carpeta: str) -> dict:
+    clientes = []
+    for n in range(args.clients):
+        salida = os.path.join(carpeta, f'cliente-{n}.json')
+        cmd = [sys.executable, '-m', 'benchmarks.load', '--url', url, '--seconds', str(args.seconds),
+               '--dashboards', str(args.dashboards), '--users', str(args.users), '--output', salida]
+        clientes.append((subprocess.Popen(cmd, stdout=subprocess.DEVNULL), salida))
+
+    resultados = []
+    for proceso, salida in clientes:
+        proceso.wait()
+        with open(salida, encoding='utf-8') as f:
+            resultados.append(json.load(f))
+    return {
+        'requests': sum(r['requests'] for r in resultados),
+        'errors': sum(r['errors'] for r in resultados),
+        'throughputRps': round(sum(r['throughputRps'] for r in resultados), 1),
+        'p50Ms': max(r['latency'].get('p50Ms', 0) for r in resultados),
+        'p99Ms': max(r['latency'].get('p99Ms', 0) for r in resultados),
+    }
+
+
+def _medir(workers: int, upstream_url: str, args: argparse.Namespace, carpeta: str) -> dict:
+    env = {
+        **os.environ,
+        'API_URL': upstream_url,
+        'API_TOKEN': 'service-token',
+        'WEB_CONCURRENCY': str(workers),
+        'CACHE_BACKEND': args.cache_backend,
+    }
+    if args.no_cache:
+        env.update(CACHE_ENABLED='false', REPORT_CACHE_ENABLED='false')
+    url = f'http://127.0.0.1:{args.port}'
+    servicio = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1',
+                                 '--port', str(args.port), '--workers', str(workers), '--log-level', 'warning'],
+                                env=env, stdout=subprocess.DEVNULL)
+    try:
+        _esperar(f'{url}/health', servicio)
+        # Calentamiento: cada worker hace su login y llena (o lee) las cachés
+        _carga(url, argparse.Namespace(**{**vars(args), 'seconds': args.warmup}), carpeta)
+        return {'workers': workers, **_carga(url, args, carpeta)}
+    finally:
+        _detener(servicio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=4, help='procesos generadores de carga')
+    parser.add_argument('--dashboards', type=int, default=10, help='dashboards concurrentes por cliente')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--pedidos', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.005, help='latencia inyectada en el REST falso (s)')
+    parser.add_argument('--cache-backend', choices=('memory', 'redis'), default='memory')
+    parser.add_argument('--no-cache', action='store_true', help='desactiva las cachés de catálogo y reportes')
+    parser.add_argument('--port', type=int, default=8011)
+    parser.add_argument('--upstream-port', type=int, default=3011)
+    parser.add_argument('--output', help='fichero JSON de resultados')
+    args = parser.parse_args()
+
+    upstream_url = f'http://127.0.0.1:{args.upstream_port}'
+    upstream = subprocess.Popen([sys.executable, '-m', 'benchmarks.fake_rest', '--port', str(args.upstream_port),
+                                 '--pedidos', str(args.pedidos), '--latency', str(args.latency)],
+                                stdout=subprocess.DEVNULL)
+    filas = []
+    try:
+        _esperar(f'{upstream_url}/productos', upstream)
+        with tempfile.TemporaryDirectory() as carpeta:
+            for workers in args.workers:
+                filas.append(_medir(workers, upstream_url, args, carpeta))
+                print(f"✅ {workers} worker(s): {filas[-1]['throughputRps']} req/s", file=sys.stderr)
+    finally:
+        _detener(upstream)
+
+    base = filas[0]['throughputRps'] / filas[0]['workers'] if filas and filas[0]['throughputRps'] else 0
+    for fila in filas:
+        fila['scalingEfficiency'] = round(fila['throughputRps'] / (fila['workers'] * base), 2) if base else 0.0
+
+    resultado = {
+        'benchmark': 'workers',
+        'cpus': os.cpu_count(),
+        'config': {k: v for k, v in vars(args).items() if k != 'output'},
+        'results': filas,
+    }
+    if args.output:
+        write_json(args.output, resultado)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
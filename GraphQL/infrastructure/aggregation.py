@@ -0,0 +1,91 @@
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+
+# El API REST no tiene (todavía) el endpoint: se vuelve a probar pasado retry_after
+UNSUPPORTED_STATUS = (404, 405, 501)
+
+
+class AggregationUnavailable(Exception):
+    """Resumen no disponible solo en esta llamada (p. ej. snapshot local aún sin sincronizar)."""
+
+
+class AggregationClient:
+    """Agregación en el API REST (*pushdown*) con vuelta a la agregación local.
+
+    Contrato del endpoint (``REPORT_PUSHDOWN_PATH``)::
+
+        GET /reportes/agregados?tipo=ventas|produccion[&fechaInicio=..&fechaFin=..]
+
+    Responde el resumen ya sumado, con los mismos campos que
+    ``app.aggregates.resumen_ventas_vacio``/``resumen_produccion_vacio`` (mapas
+    por producto, insumo y día): unos KB en lugar de todos los pedidos con sus
+    detalles. Si el API no lo ofrece (404/405/501) o la respuesta no tiene esa
+    forma, el cliente lo da por no disponible durante ``retry_after`` segundos
+    y ``fetch`` devuelve None: ``ReportService`` agrega en local como siempre.
+    Un error puntual (red, 5xx, circuito abierto, ``AggregationUnavailable``)
+    solo hace caer esa llamada.
+    """
+
+    def __init__(self, path: str = '/reportes/agregados', retry_after: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.retry_after = retry_after
+        self._clock = clock
+        self._unavailable_until = 0.0
+        # None: aún sin negociar; True/False según la última respuesta
+        self.available: Optional[bool] = None
+        self.pushdowns = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['AggregationClient']:
+        if os.getenv('REPORT_PUSHDOWN', 'true').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            path=os.getenv('REPORT_PUSHDOWN_PATH', '/reportes/agregados'),
+            retry_after=float(os.getenv('REPORT_PUSHDOWN_RETRY_AFTER', '600')),
+        )
+
+    def _disable(self, reason: str) -> None:
+        if self.available is not False:
+            print(f"ℹ️ Agregación en el API REST no disponible ({reason}): se agrega en local")
+        self.available = False
+        self._unavailable_until = self._clock() + self.retry_after
+
+    async def fetch(self, rest, tipo: str, params: Dict[str, Any],
+                    parse: Callable[[Any], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Resumen ``tipo`` calculado por el API (pasado por ``parse``), o None -> agregar en local."""
+        # rest es el RESTClient del request (token del usuario o de servicio)
+        if self._clock() < self._unavailable_until:
+            self.fallbacks += 1
+            return None
+        try:
+            resumen = parse(await rest.get(self.path, params={'tipo': tipo, **params}))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in UNSUPPORTED_STATUS:
+                self._disable(f'HTTP {e.response.status_code}')
+            else:
+                print(f"⚠️ Error en la agregación del API REST ({e.response.status_code}), se agrega en local")
+            self.fallbacks += 1
+            return None
+        except httpx.TransportError as e:
+            print(f"⚠️ Agregación del API REST no disponible ({e}), se agrega en local")
+            self.fallbacks += 1
+            return None
+        except AggregationUnavailable:
+            self.fallbacks += 1
+            return None
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self._disable('respuesta con otra forma')
+            self.fallbacks += 1
+            return None
+        self.available = True
+        self.pushdowns += 1
+        return resumen
+
+    def stats(self) -> Dict[str, Any]:
+        return {'available': self.available, 'pushdowns': self.pushdowns, 'fallbacks': self.fallbacks}
@@ -0,0 +1,432 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Caché LRU acotada en memoria con expiración por entrada.
+
+    Cada acceso mueve la entrada al final; al superar ``max_entries`` se
+    descarta la usada hace más tiempo. Lleva contadores de aciertos, fallos,
+    expiraciones y desalojos.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at > self._clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxEntries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hits / lookups if lookups else 0.0,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+        }
+
+
+class SharedStore:
+    """Almacén compartido entre procesos (aiocache, p. ej. Redis) para las cachés.
+
+    Con varios workers cada uno tiene su memoria; las entradas guardadas aquí
+    las ven todos. Las claves son texto ``{prefijo}:...`` y los valores se
+    serializan con pickle. ``delete_prefix`` borra por prefijo de clave
+    (``KEYS prefijo:*`` en Redis), suficiente para invalidaciones por tipo.
+    """
+
+    def __init__(self, cache, prefix: str = 'chifles', backend: str = 'redis'):
+        # cache es una instancia de aiocache (RedisCache, o SimpleMemoryCache en tests)
+        self.cache = cache
+        self.prefix = prefix
+        self.backend = backend
+
+    @classmethod
+    def from_env(cls) -> Optional['SharedStore']:
+        """``CACHE_BACKEND=redis`` -> almacén en ``CACHE_REDIS_URL``; ``memory`` (por defecto) -> None."""
+        backend = os.getenv('CACHE_BACKEND', 'memory').lower()
+        if backend == 'memory':
+            return None
+        if backend != 'redis':
+            raise ValueError(f"CACHE_BACKEND no soportado: {backend} (memory | redis)")
+        from aiocache import Cache
+        from aiocache.serializers import PickleSerializer
+
+        cache = Cache.from_url(os.getenv('CACHE_REDIS_URL', 'redis://127.0.0.1:6379/0'))
+        cache.serializer = PickleSerializer()
+        return cls(cache, prefix=os.getenv('CACHE_KEY_PREFIX', 'chifles'), backend=backend)
+
+    def key(self, *parts: Any) -> str:
+        return ':'.join([self.prefix, *(str(p) for p in parts)])
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = await self.cache.get(key)
+        return default if value is None else value
+
+    async def get_many(self, keys: Iterable[str]) -> list:
+        keys = list(keys)
+        return await self.cache.multi_get(keys) if keys else []
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.cache.set(key, value, ttl=ttl)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        if items:
+            await self.cache.multi_set(list(items.items()), ttl=ttl)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Guarda solo si la clave no existe (SET NX); False si ya estaba."""
+        try:
+            return await self.cache.add(key, value, ttl=ttl)
+        except ValueError:
+            return False
+
+    async def delete(self, key: str) -> int:
+        return int(await self.cache.delete(key))
+
+    async def delete_prefix(self, *parts: Any) -> None:
+        await self.cache.clear(namespace=self.key(*parts))
+
+    async def close(self) -> None:
+        await self.cache.close()
+
+
+class CatalogCache:
+    """Caché de proceso para entidades del catálogo (productos, insumos, recetas).
+
+    Las claves son ``(tipo, id)``; los ids se normalizan a texto para que
+    ``1`` y ``'1'`` apunten a la misma entrada. La API es asíncrona, igual que
+    la de aiocache, para poder cambiar el almacenamiento sin tocar a quien la usa.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 300.0, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic, shared: Optional[SharedStore] = None):
+        self.enabled = enabled
+        self.ttl = ttl
+        # Con ``shared`` las entradas viven en el almacén compartido por todos los workers
+        self.shared = shared
+        self._store = TTLCache(max_entries=max_entries, ttl=ttl, clock=clock)
+
+    @classmethod
+    def from_env(cls, shared: Optional[SharedStore] = None) -> 'CatalogCache':
+        return cls(
+            max_entries=int(os.getenv('CACHE_MAX_ENTRIES', '1000')),
+            ttl=float(os.getenv('CACHE_TTL', '300')),
+            enabled=os.getenv('CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+            shared=shared,
+        )
+
+    @staticmethod
+    def _key(kind: str, entity_id: Any) -> tuple:
+        return (kind, str(entity_id))
+
+    async def get_many(self, kind: str, ids: Iterable[Any]) -> Dict[Any, Any]:
+        """Devuelve ``{id: valor}`` solo para los ids presentes y vigentes."""
+        if not self.enabled:
+            return {}
+        if self.shared is not None:
+            return await self._get_shared(kind, list(ids))
+        found = {}
+        for entity_id in ids:
+            value = self._store.get(self._key(kind, entity_id), _MISSING)
+            if value is not _MISSING:
+                found[entity_id] = value
+        return found
+
+    async def set_many(self, kind: str, items: Dict[Any, Any]) -> None:
+        if not self.enabled:
+            return
+        if self.shared is not None:
+            await self.shared.set_many({self.shared.key('catalog', kind, entity_id): value
+                                        for entity_id, value in items.items()}, ttl=self.ttl)
+            return
+        for entity_id, value in items.items():
+            self._store.set(self._key(kind, entity_id), value)
+
+    async def _get_shared(self, kind: str, ids: list) -> Dict[Any, Any]:
+        # Una sola ida y vuelta (MGET) para todo el lote del DataLoader
+        values = await self.shared.get_many(self.shared.key('catalog', kind, entity_id) for entity_id in ids)
+        found = {entity_id: value for entity_id, value in zip(ids, values) if value is not None}
+        self._store.hits += len(found)
+        self._store.misses += len(ids) - len(found)
+        return found
+
+    async def invalidate(self, kind: str, entity_id: Any = None) -> int:
+        """Invalida una entrada, o todas las de ``kind`` si no se indica id."""
+        if self.shared is not None:
+            if entity_id is not None:
+                return await self.shared.delete(self.shared.key('catalog', kind, entity_id))
+            await self.shared.delete_prefix('catalog', kind)
+            return 0
+        if entity_id is not None:
+            return int(self._store.delete(self._key(kind, entity_id)))
+        return self._store.delete_where(lambda key: key[0] == kind)
+
+    async def clear(self) -> None:
+        if self.shared is not None:
+            await self.shared.delete_prefix('catalog')
+        self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'enabled': self.enabled, 'shared': self.shared is not None, **self._store.stats()}
+
+
+class ReportCache:
+    """Caché de resultados completos de reportes, con stale-while-revalidate y single-flight.
+
+    Un resultado es fresco durante ``ttl`` segundos; después, y hasta
+    ``stale_ttl`` segundos más, se sigue sirviendo mientras se recalcula en
+    segundo plano. Los cálculos concurrentes de una misma clave se unen en una
+    sola tarea, así N dashboards simultáneos disparan un único cálculo upstream.
+
+    Con ``shared`` (varios workers) los resultados se guardan en el almacén
+    compartido, con ``fresh_until`` en hora de reloj para que valga en todos
+    los procesos, y el single-flight se extiende entre workers con un lock
+    ``SET NX``: el resto espera hasta ``lock_wait`` segundos el resultado del
+    que calcula antes de calcular por su cuenta.
+    """
+
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 300.0, max_entries: int = 256, enabled: bool = True,
+                 clock: Optional[Callable[[], float]] = None, shared: Optional[SharedStore] = None,
+                 lock_wait: float = 10.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self.shared = shared
+        self.lock_wait = lock_wait
+        # time.monotonic no es comparable entre procesos: con almacén compartido se usa time.time
+        clock = clock or (time.time if shared is not None else time.monotonic)
+        self._clock = clock
+        self._store = TTLCache(max_entries=max_entries, ttl=ttl + stale_ttl, clock=clock)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # Generación por clave en cálculo: invalidar una clave la incrementa y el cálculo
+        # que empezó antes no se guarda (las demás claves no se ven afectadas)
+        self._generations: Dict[Hashable, int] = {}
+        # Cálculos descartados que siguen corriendo: mientras quede alguno la generación no se olvida
+        self._discarded: Dict[Hashable, int] = {}
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.waited = 0
+
+    @classmethod
+    def from_env(cls, shared: Optional[SharedStore] = None) -> 'ReportCache':
+        return cls(
+            ttl=float(os.getenv('REPORT_CACHE_TTL', '30')),
+            stale_ttl=float(os.getenv('REPORT_CACHE_STALE_TTL', '300')),
+            max_entries=int(os.getenv('REPORT_CACHE_MAX_ENTRIES', '256')),
+            enabled=os.getenv('REPORT_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+            shared=shared,
+            lock_wait=float(os.getenv('REPORT_CACHE_LOCK_WAIT', '10')),
+        )
+
+    @staticmethod
+    def key(report: str, args: Dict[str, Any], scope: Optional[str]) -> tuple:
+        return (report, scope, tuple(sorted(args.items())))
+
+    async def get_or_compute(self, key: tuple, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        # cacheable(valor) -> False: el valor se comparte con los requests en espera pero no se guarda
+        if not self.enabled:
+            return await compute()
+
+        entry = await self._get_entry(key)
+        if entry is not None:
+            value, fresh_until = entry
+            if self._clock() >= fresh_until:
+                self.stale_hits += 1
+                self._refresh(key, compute, cacheable)
+            return value
+
+        if self._running(key):
+            self.coalesced += 1
+        # shield: si el request que espera se cancela, el cálculo compartido sigue
+        return await asyncio.shield(self._start(key, compute, cacheable))
+
+    def _running(self, key: tuple) -> bool:
+        task = self._inflight.get(key)
+        return task is not None and not task.done()
+
+    def _start(self, key: tuple, compute: Callable[[], Awaitable[Any]],
+               cacheable: Optional[Callable[[Any], bool]] = None) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._compute_and_store(key, compute, self._generations.get(key, 0), cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    def _finish(self, key: tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        elif self._discarded.get(key, 0) > 1:
+            self._discarded[key] -= 1
+        else:
+            self._discarded.pop(key, None)
+        if key not in self._inflight and key not in self._discarded:
+            # Ningún cálculo anterior a la invalidación puede ya guardar: la generación se olvida
+            self._generations.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # marca la excepción como recuperada
+
+    def _refresh(self, key: tuple, compute: Callable[[], Awaitable[Any]],
+                 cacheable: Optional[Callable[[Any], bool]] = None) -> None:
+        if self._running(key):
+            return
+        task = self._start(key, compute, cacheable)
+
+        def _log_failure(t: asyncio.Task) -> None:
+            if not t.cancelled() and t.exception() is not None:
+                print(f"⚠️ No se pudo refrescar el reporte {key[0]}: {t.exception()}")
+
+        task.add_done_callback(_log_failure)
+
+    async def _compute_and_store(self, key: tuple, compute: Callable[[], Awaitable[Any]], generation: int,
+                                 cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        lock = None
+        if self.shared is not None:
+            lock = self._shared_key(key) + ':lock'
+            if not await self.shared.add(lock, os.getpid(), ttl=self.lock_wait):
+                # Otro worker ya lo está calculando: se espera su resultado
+                entry = await self._wait_for_worker(key, lock)
+                if entry is not None:
+                    return entry[0]
+                lock = None
+        try:
+            value = await compute()
+            if generation == self._generations.get(key, 0) and (cacheable is None or cacheable(value)):
+                await self._set_entry(key, (value, self._clock() + self.ttl))
+        finally:
+            if lock is not None:
+                await self.shared.delete(lock)
+        return value
+
+    async def _wait_for_worker(self, key: tuple, lock: str) -> Optional[tuple]:
+        self.waited += 1
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self._get_entry(key)
+            if entry is not None and entry[1] > self._clock():
+                return entry
+            if await self.shared.get(lock) is None:
+                break
+        return None
+
+    def _shared_key(self, key: tuple) -> str:
+        report, scope, args = key
+        # scope y argumentos resumidos: longitud fija y sin ':' que confunda los prefijos
+        return self.shared.key('report', report, _digest(scope), _digest(args))
+
+    async def _get_entry(self, key: tuple) -> Optional[tuple]:
+        if self.shared is None:
+            return self._store.get(key)
+        entry = await self.shared.get(self._shared_key(key))
+        if entry is None:
+            self._store.misses += 1
+        else:
+            self._store.hits += 1
+        return entry
+
+    async def _set_entry(self, key: tuple, entry: tuple) -> None:
+        if self.shared is None:
+            self._store.set(key, entry)
+        else:
+            await self.shared.set(self._shared_key(key), entry, ttl=self.ttl + self.stale_ttl)
+
+    async def invalidate(self, report: Optional[str] = None, scope: Optional[str] = None) -> int:
+        """Descarta los resultados de un reporte (o de todos), opcionalmente de un solo scope."""
+        def matches(key: Hashable) -> bool:
+            return (report is None or key[0] == report) and (scope is None or key[1] == scope)
+
+        # Los cálculos en curso siguen para quien ya espera, pero no se comparten con nuevos requests
+        self._discard_inflight([k for k in self._inflight if matches(k)])
+        if self.shared is not None:
+            # Cada worker recibe el mismo evento: borrar en el almacén compartido es idempotente
+            if report is None:
+                await self.shared.delete_prefix('report')
+            elif scope is None:
+                await self.shared.delete_prefix('report', report)
+            else:
+                await self.shared.delete_prefix('report', report, _digest(scope))
+            return 0
+        return self._store.delete_where(matches)
+
+    def _discard_inflight(self, keys: list) -> None:
+        # Solo las claves invalidadas cambian de generación: el resto de reportes se sigue guardando
+        for key in keys:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._discarded[key] = self._discarded.get(key, 0) + 1
+            del self._inflight[key]
+
+    async def clear(self) -> None:
+        self._discard_inflight(list(self._inflight))
+        self._store.clear()
+        if self.shared is not None:
+            await self.shared.delete_prefix('report')
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            **self._store.stats(),
+            'staleHits': self.stale_hits,
+            'coalesced': self.coalesced,
+            'inflight': len(self._inflight),
+            'shared': self.shared is not None,
+            'waitedForWorker': self.waited,
+        }
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(repr(value).encode()).hexdigest()[:16]
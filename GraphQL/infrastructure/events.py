@@ -0,0 +1,75 @@
+import asyncio
+import json
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import websockets
+
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class EventSubscriber:
+    """Suscriptor al hub WebSocket (servicio Go) que retransmite los eventos del API REST.
+
+    Cada mensaje ``{"type": ..., "payload": ...}`` se entrega a ``handler``.
+    Si la conexión se cae, se reintenta con backoff exponencial con jitter
+    (entre ``initial_backoff`` y ``max_backoff`` segundos). ``on_connect`` se
+    llama en cada (re)conexión, útil para descartar lo que pudo perderse
+    mientras no había conexión.
+    """
+
+    def __init__(self, url: str, handler: EventHandler, on_connect: Optional[Callable[[], Awaitable[None]]] = None,
+                 initial_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.url = url
+        self.handler = handler
+        self.on_connect = on_connect
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        backoff = self.initial_backoff
+        while True:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    backoff = self.initial_backoff
+                    self.connected.set()
+                    if self.on_connect is not None:
+                        await self.on_connect()
+                    async for message in ws:
+                        await self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Conexión con el hub de eventos perdida ({self.url}): {e}")
+            self.connected.clear()
+            await asyncio.sleep(random.uniform(0, backoff))
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _dispatch(self, message: Any) -> None:
+        try:
+            event = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(event, dict) or not event.get('type'):
+            return
+        try:
+            await self.handler(event)
+        except Exception as e:
+            print(f"⚠️ Error procesando evento {event.get('type')}: {e}")
@@ -1,6 +1,13 @@
+import asyncio
 import httpx
 import os
-from typing import Any, Dict, Optional
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from infrastructure.json_stream import JSONArrayParser
+from infrastructure.metrics import record_upstream
+from infrastructure.resilience import RETRY_STATUS, Resilience, endpoint_template
 
 
 class AuthClient:
@@ -35,34 +42,195 @@ class AuthClient:
         await self._client.aclose()
 
 
+def _pool_limits() -> httpx.Limits:
+    """Límites del pool de conexiones hacia el API REST (configurables por env)."""
+    return httpx.Limits(
+        max_connections=int(os.getenv('REST_MAX_CONNECTIONS', '100')),
+        max_keepalive_connections=int(os.getenv('REST_MAX_KEEPALIVE', '20')),
+        keepalive_expiry=float(os.getenv('REST_KEEPALIVE_EXPIRY', '5.0')),
+    )
+
+
+def _page_items(body: Any) -> List[Any]:
+    """Elementos de una página: un array o un sobre tipo ``{data|items|results: [...]}``."""
+    if isinstance(body, dict):
+        for key in ('data', 'items', 'results'):
+            if isinstance(body.get(key), list):
+                return body[key]
+        return [body]
+    return body if isinstance(body, list) else [body]
+
+
 class RESTClient:
-    """Cliente HTTP para el API REST de Sistema Chifles."""
+    """Cliente HTTP para el API REST de Sistema Chifles.
+
+    Una sola instancia es dueña del ``httpx.AsyncClient`` (y de su pool de
+    conexiones); ``for_token`` devuelve vistas que lo reutilizan enviando otro
+    token en cada llamada, así los requests de usuario no abren conexiones nuevas.
+    """
     
-    def __init__(self, base_url: str = 'http://127.0.0.1:3000/chifles', token: Optional[str] = None):
+    def __init__(self, base_url: str = 'http://127.0.0.1:3000/chifles', token: Optional[str] = None,
+                 client: Optional[httpx.AsyncClient] = None, resilience: Optional[Resilience] = None):
         self.base_url = base_url.rstrip('/')
 
-        # Prefer explicit token param, fallback to env var
-        api_token = token or os.getenv('API_TOKEN')
-        headers = {}
+        # Prefer explicit token param, fallback to env var (solo para el cliente dueño del pool)
+        api_token = token
+        if not api_token and client is None:
+            api_token = os.getenv('API_TOKEN')
+        # Las cabeceras se aplican por llamada sobre el cliente compartido
+        self._headers: Dict[str, str] = {}
         if api_token:
-            headers['Authorization'] = f'Bearer {api_token}'
+            self._headers = {'Authorization': f'Bearer {api_token}'}
+
+        self._owns_client = client is None
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=float(os.getenv('REST_TIMEOUT', '10.0')),
+                limits=_pool_limits(),
+            )
+        self._client = client
+        # Reintentos, hedging y circuit breaker: compartidos con las vistas de for_token
+        self.resilience = resilience or Resilience.from_env()
+        # Solo en el cliente del token de servicio (TokenManager): ante un 401 renueva y se reintenta una vez
+        self.on_unauthorized: Optional[Callable[[Optional[str]], Awaitable[bool]]] = None
+
+        # Paginación de listados (REST_PAGE_SIZE=0 la desactiva)
+        self.page_size = int(os.getenv('REST_PAGE_SIZE', '0'))
+        self.page_prefetch = max(1, int(os.getenv('REST_PAGE_PREFETCH', '4')))
+        self.page_style = os.getenv('REST_PAGE_STYLE', 'page').lower()   # 'page' (page/limit) u 'offset'
 
-        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=10.0, headers=headers)
+    def for_token(self, token: str) -> 'RESTClient':
+        """Cliente para el token de un usuario que comparte el pool de este."""
+        return RESTClient(base_url=self.base_url, token=token, client=self._client, resilience=self.resilience)
 
     async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
-        resp = await self._client.get(path, params=params)
+        headers = self._headers
+        resp = await self._get(path, params, headers)
+        if (resp.status_code == 401 and self.on_unauthorized is not None
+                and await self.on_unauthorized(headers.get('Authorization'))):
+            resp = await self._get(path, params, self._headers)
         resp.raise_for_status()
         return resp.json()
 
+    async def _get(self, path: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            resp = await self.resilience.call(
+                path, lambda timeout: self._client.get(path, params=params, headers=headers, timeout=timeout),
+            )
+        except httpx.TransportError as e:
+            record_upstream(endpoint_template(path), type(e).__name__, time.perf_counter() - started)
+            raise
+        record_upstream(endpoint_template(path), resp.status_code, time.perf_counter() - started, len(resp.content))
+        return resp
+
+    async def stream_items(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        """Recorre un listado elemento a elemento, parseando el cuerpo según llega.
+
+        A diferencia de ``get`` no carga la respuesta entera en memoria: cada
+        elemento del array se entrega en cuanto se ha recibido completo.
+        """
+        # Sin reintentos: el cuerpo ya se ha ido entregando. Sí cuenta para el circuit breaker
+        breaker = self.resilience.check(path)
+        parser = JSONArrayParser()
+        endpoint = endpoint_template(path)
+        timeout = self.resilience.budget(endpoint)
+        started = time.perf_counter()
+        try:
+            async with self._client.stream('GET', path, params=params, headers=self._headers, timeout=timeout) as resp:
+                if resp.status_code not in RETRY_STATUS:
+                    breaker.record_success()
+                resp.raise_for_status()
+                async for chunk in resp.aiter_text():
+                    for item in parser.feed(chunk):
+                        yield item
+            # Tiempo hasta el último byte (incluye lo que tarde el consumidor en agregar)
+            record_upstream(endpoint, resp.status_code, time.perf_counter() - started, resp.num_bytes_downloaded)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            record_upstream(endpoint, type(e).__name__, time.perf_counter() - started)
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in RETRY_STATUS:
+                breaker.record_failure()
+            record_upstream(endpoint, e.response.status_code, time.perf_counter() - started)
+            raise
+        except BaseException:
+            # Consumidor que abandona el generador o request cancelado
+            breaker.record_abandoned()
+            raise
+        for item in parser.close():
+            yield item
+
+    def iter_items(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        """Recorre un listado por páginas si REST_PAGE_SIZE está configurado, o en streaming."""
+        if self.page_size > 0:
+            return self.paginate(path, params)
+        return self.stream_items(path, params)
+
+    def _page_params(self, params: Optional[Dict[str, Any]], page: int, page_size: int) -> Dict[str, Any]:
+        paged = dict(params or {})
+        paged['limit'] = page_size
+        if self.page_style == 'offset':
+            paged['offset'] = page * page_size
+        else:
+            paged['page'] = page + 1
+        return paged
+
+    async def paginate(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       page_size: Optional[int] = None, prefetch: Optional[int] = None) -> AsyncIterator[Any]:
+        """Recorre un listado página a página, con ``prefetch`` páginas pedidas en paralelo.
+
+        Las páginas se entregan en orden. Se para en la primera página
+        incompleta. Si el upstream ignora la paginación (devuelve más de
+        ``page_size`` elementos o repite la primera página) se entrega lo
+        recibido una sola vez, como si fuera el listado completo.
+        """
+        page_size = page_size or self.page_size or 100
+        prefetch = max(1, prefetch or self.page_prefetch)
+        pending: deque = deque()
+        next_page = 0
+
+        def launch() -> None:
+            nonlocal next_page
+            pending.append(asyncio.ensure_future(self.get(path, params=self._page_params(params, next_page, page_size))))
+            next_page += 1
+
+        first = None
+        try:
+            for _ in range(prefetch):
+                launch()
+            page = 0
+            while pending:
+                items = _page_items(await pending.popleft())
+                if page == 0:
+                    first = items[0] if items else None
+                elif items and items[0] == first:
+                    break  # el upstream no pagina: la página se repite
+                for item in items:
+                    yield item
+                if len(items) != page_size:
+                    break  # última página (o listado completo si no pagina)
+                page += 1
+                launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def post(self, path: str, json: Dict[str, Any]) -> Any:
-        resp = await self._client.post(path, json=json)
+        resp = await self._client.post(path, json=json, headers=self._headers)
         resp.raise_for_status()
         return resp.json()
 
     async def close(self) -> None:
-        await self._client.aclose()
+        # Las vistas de for_token no cierran el pool compartido
+        if self._owns_client:
+            await self._client.aclose()
 
     def set_token(self, token: str) -> None:
         """Set Authorization header dynamically."""
         if token:
-            self._client.headers.update({'Authorization': f'Bearer {token}'})
+            # Se reemplaza el dict entero: los requests en vuelo conservan el que ya tenían
+            self._headers = {'Authorization': f'Bearer {token}'}
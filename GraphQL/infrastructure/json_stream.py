@@ -0,0 +1,92 @@
+"""Parser incremental de arrays JSON.
+
+El API REST devuelve los listados como un único array JSON. ``JSONArrayParser``
+recibe el cuerpo por trozos y entrega cada elemento en cuanto está completo,
+así que nunca hace falta tener el cuerpo entero (ni todos los dicts) en memoria.
+"""
+import json
+from typing import Any, List
+
+
+_WS = ' \t\r\n'
+
+
+class JSONArrayParser:
+    """Convierte trozos de texto de un array JSON en sus elementos.
+
+    ``feed(texto)`` devuelve los elementos completos hasta ese momento y
+    ``close()`` los que queden al terminar el cuerpo. Si el cuerpo no es un
+    array (p.ej. un objeto de error) se acumula y ``close()`` devuelve el
+    valor entero, o sus elementos si resultó ser una lista.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._array = None      # None: aún no se sabe; True: array; False: otro valor
+        self._esperando_coma = False
+        self._terminado = False
+
+    def feed(self, texto: str) -> List[Any]:
+        # Descarta lo ya consumido para que el buffer no crezca con el cuerpo
+        self._buf = self._buf[self._pos:] + texto
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        if self._array is False:
+            value = json.loads(self._buf)
+            self._buf = ''
+            return value if isinstance(value, list) else [value]
+        items = self._parse(final=True)
+        if not self._terminado:
+            raise ValueError('JSON incompleto: el array no se cerró')
+        return items
+
+    def _saltar_espacios(self) -> None:
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WS:
+            pos += 1
+        self._pos = pos
+
+    def _parse(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        while not self._terminado:
+            self._saltar_espacios()
+            if self._pos >= len(self._buf):
+                break
+            char = self._buf[self._pos]
+
+            if self._array is None:
+                self._array = char == '['
+                if not self._array:
+                    break
+                self._pos += 1
+                continue
+            if self._array is False:
+                break
+
+            if char == ']':
+                self._pos += 1
+                self._terminado = True
+                break
+            if self._esperando_coma:
+                if char != ',':
+                    raise ValueError(f'JSON inválido: se esperaba "," en la posición {self._pos}')
+                self._pos += 1
+                self._esperando_coma = False
+                continue
+
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # elemento incompleto: esperar al siguiente trozo
+            if end == len(self._buf) and not final and not isinstance(value, (dict, list, str)):
+                break  # un número/literal al final del trozo puede seguir en el siguiente
+            items.append(value)
+            self._pos = end
+            self._esperando_coma = True
+        return items
@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from infrastructure.cache import TTLCache
+
+
+class InvalidToken(Exception):
+    """Token de usuario rechazado localmente (firma, formato o expiración)."""
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+class JWTVerifier:
+    """Verificación local de los JWT de usuario, igual que ``Api-Rest/src/auth/jwt-auth.service.ts``.
+
+    Firma HMAC con el ``JWT_SECRET`` compartido con el Auth-Service y el API
+    REST, ``exp``/``nbf`` y ``type`` (solo access tokens, como
+    ``jwt-auth.guard.ts``). El resultado se cachea por token (resumen SHA-256,
+    nunca el token en claro): los válidos hasta su ``exp``, los rechazados
+    ``invalid_ttl`` segundos. Así un token inválido se rechaza
+    antes de cualquier llamada upstream y los válidos cuestan un dict lookup.
+    """
+
+    ALGORITHMS = {'HS256': hashlib.sha256, 'HS384': hashlib.sha384, 'HS512': hashlib.sha512}
+
+    def __init__(self, secret: str, leeway: float = 0.0, max_entries: int = 10000, invalid_ttl: float = 60.0,
+                 clock: Callable[[], float] = time.time):
+        self._secret = secret.encode()
+        self.leeway = leeway
+        self.invalid_ttl = invalid_ttl
+        self._clock = clock
+        self._results = TTLCache(max_entries=max_entries, ttl=invalid_ttl)
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['JWTVerifier']:
+        """Sin ``JWT_SECRET`` no se verifica nada localmente (los tokens se reenvían como antes)."""
+        secret = os.getenv('JWT_SECRET')
+        if not secret:
+            return None
+        return cls(
+            secret,
+            leeway=float(os.getenv('JWT_LEEWAY', '0')),
+            max_entries=int(os.getenv('JWT_CACHE_MAX_ENTRIES', '10000')),
+        )
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Claims del token si es válido; ``InvalidToken`` si no."""
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self._results.get(key)
+        if cached is None:
+            try:
+                cached = self._verify(token)
+                ttl = cached['exp'] - self._clock() if 'exp' in cached else None
+            except InvalidToken as e:
+                cached, ttl = e, self.invalid_ttl
+            self._results.set(key, cached, ttl=ttl)
+        elif isinstance(cached, dict) and 'exp' in cached and cached['exp'] + self.leeway <= self._clock():
+            cached = InvalidToken('Token expirado. Por favor, renueve su sesión.')
+        if isinstance(cached, InvalidToken):
+            self.rejected += 1
+            raise cached
+        return cached
+
+    def _verify(self, token: str) -> Dict[str, Any]:
+        try:
+            header_b64, payload_b64, signature_b64 = token.split('.')
+            header = json.loads(_b64decode(header_b64))
+            digest = self.ALGORITHMS.get(header.get('alg'))
+            if digest is None:
+                raise InvalidToken('Token inválido')
+            expected = hmac.new(self._secret, f'{header_b64}.{payload_b64}'.encode(), digest).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+                raise InvalidToken('Token inválido')
+            claims = json.loads(_b64decode(payload_b64))
+        except (ValueError, AttributeError, TypeError):
+            raise InvalidToken('Token inválido')
+        if not isinstance(claims, dict):
+            raise InvalidToken('Token inválido')
+        # Como jwt-auth.guard.ts: los refresh tokens no sirven para consultar
+        if claims.get('type') and claims['type'] != 'access':
+            raise InvalidToken('Se requiere un access token. Los refresh tokens no son válidos para esta operación.')
+
+        now = self._clock()
+        if 'exp' in claims and claims['exp'] + self.leeway <= now:
+            raise InvalidToken('Token expirado. Por favor, renueve su sesión.')
+        if 'nbf' in claims and claims['nbf'] - self.leeway > now:
+            raise InvalidToken('Token inválido')
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._results.stats(), 'rejected': self.rejected}
@@ -0,0 +1,74 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Optional
+
+from strawberry.dataloader import DataLoader
+
+from infrastructure.cache import CatalogCache
+
+
+class CatalogLoaders:
+    """DataLoaders por request para las entidades del catálogo del API REST.
+
+    Todas las búsquedas de ``/productos/{id}`` e ``/insumos/{id}`` que se hagan
+    durante una misma operación GraphQL se agrupan en un único lote, se
+    deduplican por id y se resuelven de forma concurrente. Las recetas
+    (``/productos-insumos?productoId=``) se cargan igual, por id de producto.
+
+    ``max_concurrency`` limita las peticiones simultáneas al API REST que hacen
+    estos loaders (por defecto ``REST_MAX_CONCURRENCY`` o 10). Si se pasa un
+    ``cache`` (``CatalogCache`` de proceso), solo se piden al API los ids que no
+    estén en ella.
+    """
+
+    def __init__(self, rest, max_concurrency: Optional[int] = None, cache: Optional[CatalogCache] = None):
+        # rest is an instance of infrastructure.http_client.RESTClient
+        self.rest = rest
+        self.cache = cache
+        limit = max_concurrency or int(os.getenv('REST_MAX_CONCURRENCY', '10'))
+        self._semaphore = asyncio.Semaphore(max(1, limit))
+        self.productos = DataLoader(load_fn=self._load_productos)
+        self.insumos = DataLoader(load_fn=self._load_insumos)
+        self.recetas = DataLoader(load_fn=self._load_recetas)
+        # Valores ya resueltos en este request aunque su lote siga esperando a otra clave
+        self._ready = {'productos': {}, 'insumos': {}, 'recetas': {}}
+
+    async def _get(self, path: str, params: Optional[dict] = None) -> Any:
+        async with self._semaphore:
+            return await self.rest.get(path, params=params)
+
+    async def _load_cached(self, kind: str, keys: List[Any], fetch: Callable[[Any], Awaitable[Any]]) -> List[Any]:
+        found = await self.cache.get_many(kind, keys) if self.cache else {}
+        ready = self._ready[kind]
+        ready.update(found)
+        missing = [key for key in keys if key not in found]
+
+        async def fetch_one(key: Any) -> Any:
+            value = await fetch(key)
+            ready[key] = value
+            return value
+
+        # Los errores se devuelven por clave: DataLoader los relanza solo en el load() afectado
+        fetched = await asyncio.gather(*(fetch_one(key) for key in missing), return_exceptions=True)
+        results = {**found, **dict(zip(missing, fetched))}
+        if self.cache:
+            fresh = {key: value for key, value in zip(missing, fetched) if not isinstance(value, BaseException)}
+            if fresh:
+                await self.cache.set_many(kind, fresh)
+        return [results[key] for key in keys]
+
+    def ready(self, kind: str, keys: List[Any]) -> dict:
+        """Valores de ``keys`` ya disponibles, sin esperar a que termine su lote."""
+        values = self._ready[kind]
+        return {key: values[key] for key in keys if key in values}
+
+    async def _load_productos(self, keys: List[Any]) -> List[Any]:
+        return await self._load_cached('productos', keys, lambda key: self._get(f'/productos/{key}'))
+
+    async def _load_insumos(self, keys: List[Any]) -> List[Any]:
+        return await self._load_cached('insumos', keys, lambda key: self._get(f'/insumos/{key}'))
+
+    async def _load_recetas(self, keys: List[Any]) -> List[Any]:
+        return await self._load_cached(
+            'recetas', keys, lambda key: self._get('/productos-insumos', params={'productoId': key}),
+        )
@@ -0,0 +1,182 @@
+"""Métricas del proceso en formato de exposición de Prometheus.
+
+Registro en memoria, sin dependencias: contadores e histogramas con
+etiquetas, más *collectors* que en cada scrape leen los ``stats()`` de las
+cachés, la resiliencia, etc. y los publican como gauges.
+
+Además del agregado del proceso, ``track_request`` abre una ventana por
+request (``contextvars``) en la que se acumulan las llamadas upstream, para
+devolver el desglose de tiempos en ``extensions.timing``.
+"""
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Buckets por defecto del cliente oficial de Prometheus (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_CAMEL = re.compile(r'(?<=[a-z0-9])([A-Z])')
+
+# Desglose del request en curso: llamadas upstream ('calls', 'seconds', 'bytes', 'endpoints') y 'resolvers'
+_request_timing: ContextVar[Optional[Dict[str, Any]]] = ContextVar('request_timing', default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def snake_case(name: str) -> str:
+    return _CAMEL.sub(r'_\1', name).lower()
+
+
+class Histogram:
+    """Histograma acumulativo por combinación de etiquetas."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List[float]] = {}   # [count por bucket..., +Inf, sum]
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def samples(self, name: str) -> Iterator[str]:
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                yield f'{name}_bucket{_format_labels(labels, ("le", _number(bound)))} {int(count)}'
+            yield f'{name}_sum{_format_labels(labels)} {_number(series[-1])}'
+            yield f'{name}_count{_format_labels(labels)} {int(series[-2])}'
+
+
+class MetricsRegistry:
+    """Contadores, histogramas y collectors de un proceso."""
+
+    def __init__(self):
+        self._help: Dict[str, Tuple[str, str]] = {}    # nombre -> (tipo, ayuda)
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help.setdefault(name, ('counter', help_text))
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS) -> None:
+        self._help.setdefault(name, ('histogram', help_text))
+        self._histograms.setdefault(name, Histogram(buckets))
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        series = self._counters[name]
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        self._histograms[name].observe(tuple(sorted((k, str(v)) for k, v in labels.items())), value)
+
+    def register_collector(self, prefix: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Publica en cada scrape los valores numéricos de ``stats()`` como ``<prefix>_<clave>``."""
+        self._collectors[prefix] = stats
+
+    def value(self, name: str, **labels: Any) -> float:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        return self._counters.get(name, {}).get(key, 0)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, (kind, help_text) in self._help.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f'{name}{_format_labels(labels)} {_number(value)}')
+            else:
+                lines.extend(self._histograms[name].samples(name))
+
+        for prefix, stats in self._collectors.items():
+            try:
+                values = stats() or {}
+            except Exception as e:
+                print(f"⚠️ No se pudieron leer las métricas de {prefix}: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (list, tuple, set, dict)):
+                    value = len(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                name = f'{prefix}_{snake_case(key)}'
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {_number(float(value))}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+registry.counter('upstream_requests_total', 'Llamadas al API REST por endpoint y estado')
+registry.histogram('upstream_request_seconds', 'Latencia de las llamadas al API REST por endpoint')
+registry.histogram('upstream_response_bytes', 'Tamaño de las respuestas del API REST por endpoint',
+                   buckets=SIZE_BUCKETS)
+registry.counter('graphql_operations_total', 'Operaciones GraphQL por nombre y resultado')
+registry.histogram('graphql_operation_seconds', 'Duración de las operaciones GraphQL')
+registry.histogram('graphql_resolver_seconds', 'Duración de los resolvers de Query por campo')
+
+
+def record_upstream(endpoint: str, status: Any, seconds: float, size: Optional[int] = None,
+                    metrics: Optional[MetricsRegistry] = None) -> None:
+    """Anota una llamada upstream en el registro y en el desglose del request actual."""
+    metrics = metrics or registry
+    metrics.inc('upstream_requests_total', endpoint=endpoint, status=status)
+    metrics.observe('upstream_request_seconds', seconds, endpoint=endpoint)
+    if size is not None:
+        metrics.observe('upstream_response_bytes', size, endpoint=endpoint)
+
+    timing = _request_timing.get()
+    if timing is not None:
+        timing['calls'] += 1
+        timing['seconds'] += seconds
+        timing['bytes'] += size or 0
+        por_endpoint = timing['endpoints'].setdefault(endpoint, {'calls': 0, 'seconds': 0.0})
+        por_endpoint['calls'] += 1
+        por_endpoint['seconds'] += seconds
+
+
+def current_request() -> Optional[Dict[str, Any]]:
+    """Desglose del request en curso (None fuera de ``track_request``)."""
+    return _request_timing.get()
+
+
+@contextmanager
+def track_request() -> Iterator[Dict[str, Any]]:
+    """Acumula las llamadas upstream hechas dentro del bloque (y de las tareas que lance)."""
+    timing = {'calls': 0, 'seconds': 0.0, 'bytes': 0, 'endpoints': {}, 'resolvers': {}}
+    token = _request_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        try:
+            _request_timing.reset(token)
+        except ValueError:
+            # Suscripciones: strawberry cierra la operación desde otra iteración (otro contexto)
+            _request_timing.set(None)
@@ -0,0 +1,256 @@
+"""Resiliencia de las llamadas al API REST.
+
+``Resilience`` envuelve cada GET con:
+
+- presupuesto de latencia por endpoint (timeout de httpx por llamada),
+- reintentos con backoff exponencial y jitter ante errores de red, timeouts
+  y 502/503/504,
+- peticiones *hedged* opcionales: si la respuesta tarda más que el p95
+  observado del endpoint se lanza una segunda y gana la primera en llegar,
+- un circuit breaker por endpoint que, tras varios fallos seguidos, falla al
+  instante (``CircuitOpenError``) en lugar de esperar al timeout. Los loaders
+  y ``ReportService`` ya toleran fallos por entidad, así que con el circuito
+  abierto los reportes salen con lo que haya en caché o con datos parciales.
+
+Los endpoints se agrupan por plantilla: ``/productos/12`` -> ``/productos/{id}``.
+"""
+import asyncio
+import os
+import random
+import re
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+
+RETRY_STATUS = (502, 503, 504)
+_ID_SEGMENT = re.compile(r'/(\d+|[0-9a-fA-F-]{32,36})(?=/|$)')
+
+
+def endpoint_template(path: str) -> str:
+    return _ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])
+
+
+def _parse_budgets(value: str) -> Dict[str, float]:
+    """``"/productos/{id}=2,/pedidos=30"`` -> ``{'/productos/{id}': 2.0, '/pedidos': 30.0}``."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        endpoint, _, seconds = item.partition('=')
+        budgets[endpoint.strip()] = float(seconds)
+    return budgets
+
+
+class CircuitOpenError(httpx.TransportError):
+    """El circuito del endpoint está abierto: no se llama al upstream."""
+
+    def __init__(self, endpoint: str):
+        super().__init__(f'Circuito abierto para {endpoint}: API REST no disponible')
+        self.endpoint = endpoint
+
+
+class CircuitBreaker:
+    """Circuito cerrado -> abierto tras ``failure_threshold`` fallos seguidos.
+
+    Pasado ``reset_timeout`` deja pasar una sola llamada de prueba
+    (semiabierto): si va bien se cierra y si falla vuelve a abrirse. Una prueba
+    que termina sin resultado (cancelada) cuenta como fallo, y si nadie la
+    cierra se lanza otra pasado ``reset_timeout`` desde que empezó.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        now = self._clock()
+        if ((self.state == 'open' and now - self._opened_at >= self.reset_timeout)
+                or (self.state == 'half_open' and now - self._probe_started >= self.reset_timeout)):
+            self.state = 'half_open'
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = 'closed'
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            self.state = 'open'
+            self._opened_at = self._clock()
+
+    def record_abandoned(self) -> None:
+        """La llamada terminó sin resultado (cancelada): si era la prueba, cuenta como fallo."""
+        if self.state == 'half_open':
+            self.record_failure()
+
+
+class LatencyTracker:
+    """Ventana de las últimas latencias correctas de un endpoint."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Resilience:
+    """Política de reintentos/hedging/circuit breaker compartida por un pool de RESTClient."""
+
+    def __init__(self, retries: int = 2, backoff: float = 0.1, timeout: float = 10.0,
+                 budgets: Optional[Dict[str, float]] = None, hedge: bool = False,
+                 hedge_min_samples: int = 20, breaker_failures: int = 5,
+                 breaker_reset: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.budgets = budgets or {}
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self.retried = 0
+        self.hedged = 0
+        self.short_circuited = 0
+
+    @classmethod
+    def from_env(cls) -> 'Resilience':
+        return cls(
+            retries=int(os.getenv('REST_RETRIES', '2')),
+            backoff=float(os.getenv('REST_RETRY_BACKOFF', '0.1')),
+            timeout=float(os.getenv('REST_TIMEOUT', '10.0')),
+            budgets=_parse_budgets(os.getenv('REST_LATENCY_BUDGETS', '')),
+            hedge=os.getenv('REST_HEDGE', 'false').lower() in ('1', 'true', 'yes'),
+            hedge_min_samples=int(os.getenv('REST_HEDGE_MIN_SAMPLES', '20')),
+            breaker_failures=int(os.getenv('REST_BREAKER_FAILURES', '5')),
+            breaker_reset=float(os.getenv('REST_BREAKER_RESET', '30')),
+        )
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(self.breaker_failures, self.breaker_reset, self._clock)
+        return breaker
+
+    def latency(self, endpoint: str) -> LatencyTracker:
+        tracker = self._latencies.get(endpoint)
+        if tracker is None:
+            tracker = self._latencies[endpoint] = LatencyTracker()
+        return tracker
+
+    def budget(self, endpoint: str) -> float:
+        return self.budgets.get(endpoint, self.timeout)
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        tracker = self.latency(endpoint)
+        if not self.hedge or len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(0.95)
+
+    def check(self, path: str) -> CircuitBreaker:
+        """Breaker del endpoint; lanza ``CircuitOpenError`` si está abierto."""
+        endpoint = endpoint_template(path)
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError(endpoint)
+        return breaker
+
+    async def call(self, path: str, send: Callable[[float], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Ejecuta ``send(timeout)`` con reintentos, hedging y circuit breaker.
+
+        Devuelve la última respuesta (aunque sea 5xx, para que el llamador
+        haga ``raise_for_status``) o relanza el último error de red.
+        """
+        endpoint = endpoint_template(path)
+        breaker = self.check(path)
+        budget = self.budget(endpoint)
+        try:
+            for attempt in range(self.retries + 1):
+                error: Optional[Exception] = None
+                try:
+                    resp = await self._send(endpoint, send, budget)
+                except httpx.TransportError as e:
+                    error = e
+                    breaker.record_failure()
+                else:
+                    if resp.status_code not in RETRY_STATUS:
+                        breaker.record_success()
+                        return resp
+                    breaker.record_failure()
+                if attempt == self.retries or breaker.state != 'closed':
+                    break
+                self.retried += 1
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        except BaseException:
+            # Cancelada (timeout, cliente desconectado, hedging): no dejar la prueba semiabierta
+            breaker.record_abandoned()
+            raise
+        if error is not None:
+            raise error
+        return resp
+
+    async def _send(self, endpoint: str, send: Callable[[float], Awaitable[httpx.Response]],
+                    budget: float) -> httpx.Response:
+        started = self._clock()
+        delay = self.hedge_delay(endpoint)
+        if delay is None:
+            resp = await send(budget)
+        else:
+            resp = await self._hedged(send, budget, delay)
+        self.latency(endpoint).record(self._clock() - started)
+        return resp
+
+    async def _hedged(self, send: Callable[[float], Awaitable[httpx.Response]], budget: float,
+                      delay: float) -> httpx.Response:
+        first = asyncio.ensure_future(send(budget))
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+        except BaseException:
+            first.cancel()
+            raise
+        if done:
+            return first.result()
+        self.hedged += 1
+        pending = {first, asyncio.ensure_future(send(budget))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t.exception() is not None):
+                    if task.exception() is None or not pending:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            'retried': self.retried,
+            'hedged': self.hedged,
+            'shortCircuited': self.short_circuited,
+            'openCircuits': sorted(e for e, b in self._breakers.items() if b.state != 'closed'),
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import base64
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """Claim ``exp`` de un JWT (epoch en segundos), sin verificar la firma; None si no se puede leer."""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenManager:
+    """Ciclo de vida del token de servicio: login, renovación anticipada y relogin.
+
+    Una tarea en segundo plano renueva el access token ``refresh_margin``
+    segundos antes de que caduque (claim ``exp`` del JWT, o ``expiresIn`` de
+    la respuesta del Auth-Service) con ``AuthClient.refresh``; si el refresh
+    token ya no sirve, vuelve a hacer login. Las renovaciones concurrentes se
+    unen en una sola (single-flight) y la cabecera del ``RESTClient``
+    compartido se sustituye de una vez, así nunca se envía un token a medias.
+
+    Además queda como ``on_unauthorized`` del cliente: un 401 con el token de
+    servicio (p. ej. revocado) dispara una única renovación para todos los
+    requests que lo recibieron, y cada uno reintenta una vez.
+    """
+
+    def __init__(self, auth, rest, email: str, password: str, refresh_margin: float = 60.0,
+                 retry_interval: float = 5.0, default_ttl: float = 900.0, clock: Callable[[], float] = time.time):
+        # auth es un infrastructure.http_client.AuthClient y rest el RESTClient dueño del pool
+        self.auth = auth
+        self.rest = rest
+        self.email = email
+        self.password = password
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self.logins = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.unauthorized = 0
+        rest.on_unauthorized = self.on_unauthorized
+
+    @classmethod
+    def from_env(cls, auth, rest) -> 'TokenManager':
+        return cls(
+            auth, rest,
+            email=os.getenv('API_LOGIN_EMAIL', 'admin@chifles.com'),
+            password=os.getenv('API_LOGIN_PASSWORD', 'Admin123!'),
+            refresh_margin=float(os.getenv('TOKEN_REFRESH_MARGIN', '60')),
+            retry_interval=float(os.getenv('TOKEN_RETRY_INTERVAL', '5')),
+        )
+
+    async def start(self) -> None:
+        """Primer login (sin lanzar si falla: la tarea de fondo reintenta) y arranque de la renovación."""
+        try:
+            await self.renew()
+        except Exception as e:
+            print(f"⚠️ No se pudo autenticar con Auth-Service: {e}")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._inflight):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._task = None
+
+    def renew(self) -> 'asyncio.Future':
+        """Renueva el token; las llamadas concurrentes esperan la misma renovación."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._renew())
+        return asyncio.shield(self._inflight)
+
+    async def on_unauthorized(self, authorization: Optional[str]) -> bool:
+        """401 con ``authorization``: renueva si ese sigue siendo el token vigente. True -> reintentar."""
+        self.unauthorized += 1
+        if self.access_token and authorization != f'Bearer {self.access_token}':
+            return True   # otro request ya lo renovó
+        try:
+            await self.renew()
+        except Exception:
+            return False
+        return True
+
+    async def _renew(self) -> None:
+        try:
+            if self.refresh_token:
+                try:
+                    result = await self.auth.refresh(self.refresh_token)
+                    self.refreshes += 1
+                    self._apply(result.get('accessToken'), result.get('expiresIn'))
+                    return
+                except httpx.HTTPStatusError as e:
+                    # Refresh token caducado o revocado: se vuelve a hacer login
+                    print(f"⚠️ Refresh del token de servicio rechazado ({e.response.status_code}), relogin")
+            result = await self.auth.login(self.email, self.password)
+            tokens = result.get('tokens', {})
+            self.logins += 1
+            self.refresh_token = tokens.get('refreshToken')
+            self._apply(tokens.get('accessToken'), tokens.get('accessExpiresIn'))
+            print(f"✅ GraphQL Service autenticado con Auth-Service ({self.email}, pid {os.getpid()})")
+        except Exception:
+            self.failures += 1
+            raise
+
+    def _apply(self, access_token: Optional[str], expires_in_ms: Any = None) -> None:
+        if not access_token:
+            raise ValueError("El Auth-Service no devolvió accessToken")
+        expires_at = jwt_expiry(access_token)
+        if expires_at is None:
+            # El Auth-Service informa la duración en milisegundos
+            ttl = float(expires_in_ms) / 1000 if expires_in_ms else self.default_ttl
+            expires_at = self._clock() + ttl
+        self.access_token = access_token
+        self.expires_at = expires_at
+        self.rest.set_token(access_token)
+
+    def seconds_to_refresh(self) -> float:
+        if self.expires_at is None:
+            return self.retry_interval
+        lifetime = self.expires_at - self._clock()
+        # Con tokens muy cortos se renueva a mitad de vida en vez de en cuanto se obtienen
+        return max(0.0, lifetime - min(self.refresh_margin, lifetime / 2))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.seconds_to_refresh())
+            try:
+                await self.renew()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ No se pudo renovar el token de servicio: {e}")
+                await asyncio.sleep(self.retry_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'authenticated': self.access_token is not None,
+            'expiresIn': max(0.0, self.expires_at - self._clock()) if self.expires_at else 0.0,
+            'logins': self.logins,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'unauthorized': self.unauthorized,
+        }
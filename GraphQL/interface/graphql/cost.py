@@ -0,0 +1,189 @@
+"""Análisis de coste de las operaciones GraphQL.
+
+Antes de ejecutar, ``QueryCostExtension`` estima el coste de la operación
+sumando el peso de cada campo raíz (cada alias cuenta por separado),
+escalado por sus argumentos: ``limite`` en productosMasVendidos y la anchura
+del rango de fechas en los reportes. Si el coste supera ``QUERY_COST_MAX``
+la operación se rechaza sin tocar el API REST; si el usuario agotó su
+presupuesto por minuto (``QUERY_COST_RATE``) se limita con un error
+reintentable. El coste calculado se devuelve en ``extensions.cost``.
+"""
+import os
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from graphql import GraphQLError, ExecutionResult as GraphQLExecutionResult
+from graphql.language import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+)
+from graphql.utilities import value_from_ast_untyped
+from strawberry.extensions import SchemaExtension
+
+
+# Peso base de cada campo de Query (~ llamadas al API REST que dispara)
+COSTES_CAMPO = {
+    'pedidosPorCliente': 2,
+    'consumoInsumos': 6,
+    'productosMasVendidos': 4,
+    'trazabilidadPedido': 12,
+    'reporteProduccion': 10,
+    'reporteInventario': 8,
+    'reporteVentas': 10,
+}
+COSTE_POR_DEFECTO = 1
+# Cada producto pedido en productosMasVendidos supone una búsqueda de nombre
+COSTE_POR_LIMITE = 0.5
+# Los reportes con fechas escalan con la anchura del rango (en bloques de 90 días);
+# sin rango se recorre todo el histórico
+CAMPOS_CON_RANGO = ('consumoInsumos', 'reporteProduccion', 'reporteVentas')
+DIAS_POR_BLOQUE = 90
+FACTOR_SIN_RANGO = 3.0
+
+
+def _factor_rango(args: Dict[str, Any]) -> float:
+    inicio, fin = args.get('fechaInicio'), args.get('fechaFin')
+    if not inicio and not fin:
+        return FACTOR_SIN_RANGO
+    try:
+        desde = date.fromisoformat(str(inicio)[:10]) if inicio else None
+        hasta = date.fromisoformat(str(fin)[:10]) if fin else date.today()
+    except ValueError:
+        return FACTOR_SIN_RANGO
+    if desde is None:
+        return FACTOR_SIN_RANGO
+    return 1.0 + max(0, (hasta - desde).days) / DIAS_POR_BLOQUE
+
+
+def coste_campo(nombre: str, args: Dict[str, Any]) -> float:
+    if nombre.startswith('__'):
+        return 0.0  # introspección: no llega al API REST
+    coste = COSTES_CAMPO.get(nombre, COSTE_POR_DEFECTO)
+    if nombre == 'productosMasVendidos':
+        limite = args.get('limite')
+        try:
+            limite = int(10 if limite is None else limite)
+        except (TypeError, ValueError):
+            limite = 10  # valor inválido: lo rechaza la validación de variables de GraphQL
+        coste += COSTE_POR_LIMITE * max(0, limite)
+    if nombre in CAMPOS_CON_RANGO:
+        coste *= _factor_rango(args)
+    return round(coste, 2)
+
+
+def coste_operacion(document, variables: Optional[Dict[str, Any]] = None,
+                    operation_name: Optional[str] = None) -> float:
+    """Coste estimado de la operación ``operation_name`` del documento."""
+    variables = dict(variables or {})
+    fragmentos = {}
+    operacion = None
+    for definicion in document.definitions:
+        if isinstance(definicion, FragmentDefinitionNode):
+            fragmentos[definicion.name.value] = definicion
+        elif isinstance(definicion, OperationDefinitionNode):
+            if operation_name is None or (definicion.name and definicion.name.value == operation_name):
+                operacion = operacion or definicion
+    if operacion is None:
+        return 0.0
+
+    # Valores por defecto de las variables no enviadas
+    for var in operacion.variable_definitions or ():
+        nombre = var.variable.name.value
+        if nombre not in variables and var.default_value is not None:
+            variables[nombre] = value_from_ast_untyped(var.default_value)
+
+    def campos(selecciones: Iterable, vistos: frozenset) -> Iterable[FieldNode]:
+        for sel in selecciones:
+            if isinstance(sel, FieldNode):
+                yield sel
+            elif isinstance(sel, InlineFragmentNode):
+                yield from campos(sel.selection_set.selections, vistos)
+            elif isinstance(sel, FragmentSpreadNode) and sel.name.value not in vistos:
+                fragmento = fragmentos.get(sel.name.value)
+                if fragmento is not None:
+                    yield from campos(fragmento.selection_set.selections, vistos | {sel.name.value})
+
+    total = 0.0
+    for campo in campos(operacion.selection_set.selections, frozenset()):
+        args = {a.name.value: value_from_ast_untyped(a.value, variables) for a in campo.arguments or ()}
+        total += coste_campo(campo.name.value, args)
+    return round(total, 2)
+
+
+class CostBudget:
+    """Presupuesto de coste por usuario (token bucket en memoria del proceso).
+
+    Cada usuario (``cache_scope``) recupera ``rate`` unidades de coste por
+    minuto hasta un máximo de ``burst``; una operación consume su coste.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._clock = clock
+        self._buckets: Dict[str, tuple] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional['CostBudget']:
+        rate = float(os.getenv('QUERY_COST_RATE', '0'))
+        if rate <= 0:
+            return None
+        # Por defecto cabe al menos una operación del coste máximo permitido
+        burst = float(os.getenv('QUERY_COST_BURST') or max(rate, float(os.getenv('QUERY_COST_MAX', '200'))))
+        return cls(rate, burst)
+
+    def disponible(self, scope: str) -> float:
+        tokens, ultimo = self._buckets.get(scope, (self.burst, self._clock()))
+        return min(self.burst, tokens + (self._clock() - ultimo) * self.rate / 60.0)
+
+    def consumir(self, scope: str, coste: float) -> bool:
+        tokens = self.disponible(scope)
+        if coste > tokens:
+            self._buckets[scope] = (tokens, self._clock())
+            return False
+        self._buckets[scope] = (tokens - coste, self._clock())
+        return True
+
+
+class QueryCostExtension(SchemaExtension):
+    """Calcula el coste de cada operación y rechaza/limita las demasiado caras."""
+
+    max_cost = float(os.getenv('QUERY_COST_MAX', '200'))
+
+    def __init__(self, *, execution_context=None):
+        self.execution_context = execution_context
+        self.cost: Optional[float] = None
+        self.remaining: Optional[float] = None
+
+    def _rechazar(self, mensaje: str, code: str) -> None:
+        error = GraphQLError(mensaje, extensions={'code': code, 'cost': self.cost})
+        self.execution_context.result = GraphQLExecutionResult(data=None, errors=[error])
+
+    def on_execute(self):
+        ctx = self.execution_context
+        if ctx.graphql_document is not None:
+            self.cost = coste_operacion(ctx.graphql_document, ctx.variables, ctx.operation_name)
+            context = ctx.context if isinstance(ctx.context, dict) else {}
+            budget = context.get('cost_budget')
+
+            if self.max_cost > 0 and self.cost > self.max_cost:
+                self._rechazar(f"Operación demasiado costosa: coste {self.cost} > máximo {self.max_cost}",
+                               'QUERY_TOO_EXPENSIVE')
+            elif budget is not None:
+                scope = context.get('cache_scope') or 'service'
+                if not budget.consumir(scope, self.cost):
+                    self._rechazar("Presupuesto de consultas agotado, reintenta en unos segundos", 'THROTTLED')
+                self.remaining = round(budget.disponible(scope), 2)
+        yield
+
+    def get_results(self) -> Dict[str, Any]:
+        if self.cost is None:
+            return {}
+        cost = {'requested': self.cost, 'maximum': self.max_cost}
+        if self.remaining is not None:
+            cost['remaining'] = self.remaining
+        return {'cost': cost}
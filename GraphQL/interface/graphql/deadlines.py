@@ -0,0 +1,63 @@
+"""Deadline por request para los enriquecimientos de los reportes.
+
+Los totales de un reporte salen de los agregados; los nombres de productos e
+insumos requieren búsquedas extra al API REST. Con un deadline, lo que no
+llegue a tiempo se devuelve sin nombre (``productoNombre: null``) en lugar de
+retrasar toda la respuesta, y ``extensions.partial`` indica qué se omitió.
+Las búsquedas pendientes siguen en segundo plano y llenan la caché del
+catálogo, así que el siguiente request normalmente sale completo.
+
+El deadline se toma de ``GRAPHQL_ENRICHMENT_DEADLINE_MS`` (0 = desactivado)
+o, por request, del header ``X-Request-Deadline-Ms``.
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from strawberry.extensions import SchemaExtension
+
+
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+
+
+def deadline_ms(header: Optional[str]) -> float:
+    default = float(os.getenv('GRAPHQL_ENRICHMENT_DEADLINE_MS', '0'))
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            pass
+    return default
+
+
+def request_deadline(header: Optional[str]) -> Optional[float]:
+    """Instante (``loop.time()``) límite para enriquecer, o None si no hay deadline."""
+    ms = deadline_ms(header)
+    if ms <= 0:
+        return None
+    return asyncio.get_running_loop().time() + ms / 1000.0
+
+
+def omitted(data: Any) -> List[Dict[str, Any]]:
+    """Enriquecimientos omitidos de un resultado (dict o resultado tipado de app.results)."""
+    if isinstance(data, dict):
+        return data.get('enriquecimientosOmitidos') or []
+    return getattr(data, 'enriquecimientosOmitidos', None) or []
+
+
+def record_omitted(context: Any, report: str, data: Any) -> None:
+    """Anota en el contexto los enriquecimientos que el reporte no alcanzó a hacer."""
+    omitidos = omitted(data)
+    if omitidos and isinstance(context, dict) and 'partial' in context:
+        context['partial'][report] = omitidos
+
+
+class PartialResultsExtension(SchemaExtension):
+    """Publica en ``extensions.partial`` los enriquecimientos omitidos por deadline."""
+
+    def get_results(self) -> Dict[str, Any]:
+        context = self.execution_context.context
+        partial = context.get('partial') if isinstance(context, dict) else None
+        if not partial:
+            return {}
+        return {'partial': partial}
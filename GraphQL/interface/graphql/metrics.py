@@ -0,0 +1,109 @@
+"""Instrumentación de las operaciones GraphQL.
+
+``MetricsExtension`` mide la duración de cada operación y de cada resolver de
+``Query`` (los campos anidados solo leen atributos y no se miden, para no
+cargar el camino caliente) y abre el desglose por request de las llamadas
+upstream de ``RESTClient``. Todo va al registro de ``infrastructure.metrics``
+que se expone en ``/metrics``; con ``GRAPHQL_TIMING_EXTENSIONS=true`` el
+desglose también se devuelve en ``extensions.timing``.
+
+La etiqueta ``operation`` la elige el cliente: se aceptan como mucho
+``GRAPHQL_METRICS_MAX_OPERATIONS`` nombres distintos por proceso y el resto
+se cuenta como ``other``, para que no crezcan sin límite las series.
+"""
+import os
+import re
+import time
+from inspect import isawaitable
+from typing import Any, Dict, Optional
+
+from strawberry.extensions import SchemaExtension
+
+from infrastructure.metrics import current_request, registry, track_request
+
+
+_NAME = re.compile(r'^[_A-Za-z][_0-9A-Za-z]{0,99}$')
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class MetricsExtension(SchemaExtension):
+    """Tiempos por operación, por resolver raíz y por endpoint upstream."""
+
+    timing_in_response = os.getenv('GRAPHQL_TIMING_EXTENSIONS', 'false').lower() in ('1', 'true', 'yes')
+    max_operations = int(os.getenv('GRAPHQL_METRICS_MAX_OPERATIONS', '100'))
+    # Nombres de operación ya publicados como etiqueta (compartido por todas las instancias)
+    _operations: set = set()
+
+    def __init__(self, *, execution_context=None):
+        self.execution_context = execution_context
+        self.started: Optional[float] = None
+        self.request: Optional[Dict[str, Any]] = None
+
+    def on_operation(self):
+        self.started = time.perf_counter()
+        with track_request() as request:
+            self.request = request
+            yield
+        ctx = self.execution_context
+        operation = self._operation_label(ctx.operation_name)
+        # Errores de validación o de los resolvers (result.errors) cuentan igual
+        errors = ctx.pre_execution_errors or getattr(ctx.result, 'errors', None)
+        status = 'error' if errors else 'ok'
+        registry.inc('graphql_operations_total', operation=operation, status=status)
+        registry.observe('graphql_operation_seconds', time.perf_counter() - self.started, operation=operation)
+
+    @classmethod
+    def _operation_label(cls, name: Optional[str]) -> str:
+        if not name:
+            return 'anonymous'
+        if name in cls._operations:
+            return name
+        if not _NAME.match(name) or len(cls._operations) >= cls.max_operations:
+            return 'other'
+        cls._operations.add(name)
+        return name
+
+    # strawberry reutiliza la instancia de la primera operación para ``resolve``:
+    # los tiempos del request se guardan en su contexto, no en ``self``
+    def resolve(self, _next, root, info, *args, **kwargs):
+        if info.path.prev is not None:
+            return _next(root, info, *args, **kwargs)
+        started = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if isawaitable(result):
+            return self._timed(result, info, started)
+        self._record(info, started)
+        return result
+
+    async def _timed(self, result, info, started: float):
+        try:
+            return await result
+        finally:
+            self._record(info, started)
+
+    @staticmethod
+    def _record(info, started: float) -> None:
+        seconds = time.perf_counter() - started
+        registry.observe('graphql_resolver_seconds', seconds, field=info.field_name)
+        request = current_request()
+        if request is not None:
+            request['resolvers'][info.path.key] = seconds
+
+    def get_results(self) -> Dict[str, Any]:
+        if not self.timing_in_response or self.started is None:
+            return {}
+        request = self.request or {'calls': 0, 'seconds': 0.0, 'bytes': 0, 'endpoints': {}, 'resolvers': {}}
+        return {'timing': {
+            'totalMs': _ms(time.perf_counter() - self.started),
+            'resolversMs': {path: _ms(s) for path, s in request['resolvers'].items()},
+            'upstream': {
+                'calls': request['calls'],
+                'ms': _ms(request['seconds']),
+                'bytes': request['bytes'],
+                'endpoints': {e: {'calls': v['calls'], 'ms': _ms(v['seconds'])}
+                              for e, v in request['endpoints'].items()},
+            },
+        }}
@@ -0,0 +1,132 @@
+"""Persisted queries automáticas (APQ) y caché de documentos parseados/validados.
+
+El dashboard envía siempre las mismas consultas grandes. Con APQ el cliente
+manda solo ``extensions.persistedQuery.sha256Hash``; la primera vez que el
+servidor no conoce el hash responde ``PERSISTED_QUERY_NOT_FOUND`` y el
+cliente reenvía hash + texto, que queda guardado (protocolo de Apollo).
+Las consultas por GET con hash tienen una URL corta y estable, así que se
+marcan cacheables por HTTP/CDN.
+
+``DocumentCache`` evita volver a parsear y validar un texto ya visto: el
+documento y el resultado de la validación se guardan en una caché LRU
+acotada del proceso.
+"""
+import hashlib
+import os
+from typing import Any, Optional
+
+from graphql import GraphQLError, parse
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import GraphQLRouter
+from strawberry.types import ExecutionResult
+
+from infrastructure.cache import TTLCache
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class DocumentCache(SchemaExtension):
+    """Reutiliza el documento parseado y la validación de cada texto de consulta.
+
+    Se registra como clase (una instancia por operación); la caché es un
+    atributo de clase compartido por todo el proceso.
+    """
+
+    documents = TTLCache(max_entries=int(os.getenv('DOCUMENT_CACHE_MAX_ENTRIES', '500')), ttl=None)
+
+    def on_parse(self):
+        ctx = self.execution_context
+        entry = self.documents.get(ctx.query) if ctx.query else None
+        if entry is not None:
+            ctx.graphql_document = entry[0]
+        elif ctx.query:
+            try:
+                ctx.graphql_document = parse(ctx.query)
+            except GraphQLError:
+                pass  # strawberry vuelve a parsear y devuelve el error de sintaxis
+            else:
+                self.documents.set(ctx.query, (ctx.graphql_document, None))
+        yield
+
+    def on_validate(self):
+        ctx = self.execution_context
+        entry = self.documents.get(ctx.query) if ctx.query else None
+        cached = entry is not None and entry[0] is ctx.graphql_document and entry[1] is not None
+        if cached:
+            # Lista (posiblemente vacía): strawberry no vuelve a validar
+            ctx.pre_execution_errors = list(entry[1])
+        yield
+        if not cached and entry is not None and entry[0] is ctx.graphql_document:
+            self.documents.set(ctx.query, (entry[0], tuple(ctx.pre_execution_errors or ())))
+
+
+class PersistedQueryStore:
+    """Textos de consulta indexados por su sha256 (LRU acotada)."""
+
+    def __init__(self, max_entries: int = 1000):
+        self._queries = TTLCache(max_entries=max_entries, ttl=None)
+
+    @classmethod
+    def from_env(cls) -> 'PersistedQueryStore':
+        return cls(max_entries=int(os.getenv('PERSISTED_QUERIES_MAX_ENTRIES', '1000')))
+
+    def get(self, sha256: str) -> Optional[str]:
+        return self._queries.get(sha256)
+
+    def register(self, sha256: str, query: str) -> bool:
+        if query_hash(query) != sha256:
+            return False
+        self._queries.set(sha256, query)
+        return True
+
+    def stats(self) -> dict:
+        return self._queries.stats()
+
+
+def _apq_error(message: str, code: str) -> ExecutionResult:
+    return ExecutionResult(data=None, errors=[GraphQLError(message, extensions={'code': code})])
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """``GraphQLRouter`` con soporte de persisted queries automáticas."""
+
+    def __init__(self, *args: Any, store: Optional[PersistedQueryStore] = None,
+                 get_max_age: Optional[int] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.store = store or PersistedQueryStore.from_env()
+        self.get_max_age = int(os.getenv('GRAPHQL_GET_MAX_AGE', '30')) if get_max_age is None else get_max_age
+
+    def should_render_graphql_ide(self, request) -> bool:
+        # Un GET con solo el hash es una consulta, no una visita a GraphiQL
+        if 'persistedQuery' in (request.query_params.get('extensions') or ''):
+            return False
+        return super().should_render_graphql_ide(request)
+
+    async def execute_single(self, request, request_adapter, sub_response, context, root_value, request_data):
+        persisted = (request_data.extensions or {}).get('persistedQuery')
+        sha256 = persisted.get('sha256Hash') if isinstance(persisted, dict) else None
+        if sha256:
+            if request_data.query is None:
+                request_data.query = self.store.get(sha256)
+                if request_data.query is None:
+                    return _apq_error('PersistedQueryNotFound', 'PERSISTED_QUERY_NOT_FOUND')
+            elif not self.store.register(sha256, request_data.query):
+                return _apq_error('provided sha does not match query', 'PERSISTED_QUERY_HASH_MISMATCH')
+
+        result = await super().execute_single(
+            request=request,
+            request_adapter=request_adapter,
+            sub_response=sub_response,
+            context=context,
+            root_value=root_value,
+            request_data=request_data,
+        )
+
+        if sha256 and request_adapter.method == 'GET' and not result.errors and self.get_max_age > 0:
+            # La respuesta depende del usuario: las cachés compartidas solo sin Authorization
+            scope = 'private' if request.headers.get('Authorization') else 'public'
+            sub_response.headers['Cache-Control'] = f'{scope}, max-age={self.get_max_age}'
+            sub_response.headers['Vary'] = 'Authorization'
+        return result
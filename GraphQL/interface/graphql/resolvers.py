@@ -1,6 +1,9 @@
 import strawberry
 from typing import List, Optional
 from app.usecases import ReportService
+from infrastructure.cache import ReportCache
+from interface.graphql.deadlines import omitted, record_omitted
+from interface.graphql.selection import selected_paths
 from interface.graphql.types import (
     PedidoResumen,
     ConsumoInsumo,
@@ -8,27 +11,68 @@ from interface.graphql.types import (
     InsumoReceta,
     ProductoMasVendido,
     ReporteProduccion,
-    ProduccionProducto,
-    InsumoUtilizado,
-    ProduccionDiaria,
     ReporteInventario,
-    ProductoInventario,
-    InsumoInventario,
     ReporteVentas,
-    VentaProducto,
-    ProductoVendidoReporte,
-    VentaDiaria,
 )
 from graphql import GraphQLError
 import httpx
 
 
+def _report_service(info) -> ReportService:
+    # Los loaders del contexto comparten lotes y caché entre todos los campos de la operación
+    return ReportService(info.context['rest'], info.context.get('loaders'), info.context.get('aggregates'),
+                         deadline=info.context.get('deadline'), aggregation=info.context.get('aggregation'))
+
+
+def _completo(data) -> bool:
+    return not omitted(data)
+
+
+# Parte del cálculo de cada reporte -> campos de la selección que la necesitan
+PARTES_REPORTE = {
+    'reporteVentas': {
+        'ventasPorProducto': ('ventasPorProducto', 'productosMasVendidos'),
+        'nombres': ('ventasPorProducto.productoNombre', 'productosMasVendidos.nombre'),
+        'ventasPorDia': ('ventasPorDia',),
+    },
+    'reporteProduccion': {
+        'produccionPorProducto': ('produccionPorProducto',),
+        'nombresProductos': ('produccionPorProducto.productoNombre',),
+        'insumosMasUtilizados': ('insumosMasUtilizados',),
+        'nombresInsumos': ('insumosMasUtilizados.nombre',),
+        'produccionPorDia': ('produccionPorDia',),
+    },
+    'reporteInventario': {
+        'productos': ('totalProductos', 'productos', 'valorInventario'),
+        'insumos': ('totalInsumos', 'insumos', 'insumosStockBajo'),
+    },
+}
+
+
+def _partes(info, report: str) -> frozenset:
+    """Partes del reporte que pide la consulta (lo no seleccionado no se calcula ni se enriquece)."""
+    paths = selected_paths(info)
+    return frozenset(parte for parte, campos in PARTES_REPORTE[report].items() if paths.intersection(campos))
+
+
+async def _cached_report(info, report: str, args: dict, compute):
+    # Reutiliza el resultado del mismo reporte/argumentos/usuario; sin caché, calcula directo.
+    # Los resultados parciales (deadline) se devuelven pero no se guardan.
+    cache = info.context.get('report_cache')
+    if cache is None:
+        data = await compute()
+    else:
+        key = ReportCache.key(report, args, info.context.get('cache_scope'))
+        data = await cache.get_or_compute(key, compute, cacheable=_completo)
+    record_omitted(info.context, report, data)
+    return data
+
+
 @strawberry.type
 class Query:
     @strawberry.field
     async def pedidosPorCliente(self, info, clienteId: int, fechaInicio: Optional[str] = None, fechaFin: Optional[str] = None) -> List[PedidoResumen]:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+        svc = _report_service(info)
         try:
             data = await svc.pedidos_por_cliente(clienteId, fechaInicio, fechaFin)
         except httpx.HTTPStatusError as e:
@@ -38,10 +82,10 @@ class Query:
 
     @strawberry.field
     async def consumoInsumos(self, info, fechaInicio: Optional[str] = None, fechaFin: Optional[str] = None) -> List[ConsumoInsumo]:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+        svc = _report_service(info)
         try:
-            data = await svc.consumo_insumos(fechaInicio, fechaFin)
+            data = await _cached_report(info, 'consumoInsumos', {'fechaInicio': fechaInicio, 'fechaFin': fechaFin},
+                                       lambda: svc.consumo_insumos(fechaInicio, fechaFin))
         except httpx.HTTPStatusError as e:
             # convierte errores HTTP en error GraphQL legible
             raise GraphQLError(f"Error al recuperar consumo de insumos: {e.response.status_code} {e.response.text}")
@@ -57,11 +101,13 @@ class Query:
         ]
 
     @strawberry.field
-    async def productosMasVendidos(self, info, limite: int = 10) -> List[ProductoMasVendido]:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+    async def productosMasVendidos(self, info, limite: int = 10, fechaInicio: Optional[str] = None,
+                                   fechaFin: Optional[str] = None) -> List[ProductoMasVendido]:
+        svc = _report_service(info)
         try:
-            data = await svc.productos_mas_vendidos(limite)
+            data = await _cached_report(info, 'productosMasVendidos',
+                                       {'limite': limite, 'fechaInicio': fechaInicio, 'fechaFin': fechaFin},
+                                       lambda: svc.productos_mas_vendidos(limite, fechaInicio, fechaFin))
         except httpx.HTTPStatusError as e:
             raise GraphQLError(f"Error al recuperar productos más vendidos: {e.response.status_code} {e.response.text}")
 
@@ -78,8 +124,7 @@ class Query:
 
     @strawberry.field
     async def trazabilidadPedido(self, info, pedidoId: int) -> List[TrazabilidadProducto]:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+        svc = _report_service(info)
         try:
             data = await svc.trazabilidad_pedido(pedidoId)
         except httpx.HTTPStatusError as e:
@@ -108,146 +153,41 @@ class Query:
 
     @strawberry.field
     async def reporteProduccion(self, info, fechaInicio: Optional[str] = None, fechaFin: Optional[str] = None) -> ReporteProduccion:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+        svc = _report_service(info)
         try:
-            data = await svc.reporte_produccion(fechaInicio, fechaFin)
+            partes = _partes(info, 'reporteProduccion')
+            # Cada forma de selección se cachea aparte: un resultado parcial no sirve a otra más amplia
+            data = await _cached_report(info, 'reporteProduccion',
+                                       {'fechaInicio': fechaInicio, 'fechaFin': fechaFin, 'partes': tuple(sorted(partes))},
+                                       lambda: svc.reporte_produccion(fechaInicio, fechaFin, partes))
         except httpx.HTTPStatusError as e:
             raise GraphQLError(f"Error al recuperar reporte de producción: {e.response.status_code} {e.response.text}")
-        
-        produccion_por_producto = [
-            ProduccionProducto(
-                productoId=int(p['productoId']),
-                productoNombre=p.get('productoNombre'),
-                cantidadProducida=int(p.get('cantidadProducida', 0))
-            )
-            for p in data.get('produccionPorProducto', [])
-        ]
-        
-        insumos_mas_utilizados = [
-            InsumoUtilizado(
-                idInsumo=int(i['id_insumo']),
-                nombre=i.get('nombre', ''),
-                cantidadUtilizada=float(i.get('cantidad_utilizada', 0))
-            )
-            for i in data.get('insumosMasUtilizados', [])
-        ]
-        
-        produccion_por_dia = [
-            ProduccionDiaria(
-                fecha=p['fecha'],
-                cantidadOrdenes=int(p.get('cantidad_ordenes', 0))
-            )
-            for p in data.get('produccionPorDia', [])
-        ]
-        
-        return ReporteProduccion(
-            totalOrdenesProduccion=int(data.get('totalOrdenesProduccion', 0)),
-            ordenesCompletadas=int(data.get('ordenesCompletadas', 0)),
-            ordenesPendientes=int(data.get('ordenesPendientes', 0)),
-            ordenesEnProceso=int(data.get('ordenesEnProceso', 0)),
-            produccionPorProducto=produccion_por_producto,
-            insumosMasUtilizados=insumos_mas_utilizados,
-            produccionPorDia=produccion_por_dia
-        )
+
+        # ResultadoProduccion: los campos se sirven directamente, sin copiarlos a objetos strawberry
+        return data
 
     @strawberry.field
     async def reporteInventario(self, info) -> ReporteInventario:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+        svc = _report_service(info)
         try:
-            data = await svc.reporte_inventario()
+            partes = _partes(info, 'reporteInventario')
+            data = await _cached_report(info, 'reporteInventario', {'partes': tuple(sorted(partes))},
+                                       lambda: svc.reporte_inventario(partes))
         except httpx.HTTPStatusError as e:
             raise GraphQLError(f"Error al recuperar reporte de inventario: {e.response.status_code} {e.response.text}")
-        
-        productos = [
-            ProductoInventario(
-                id=int(p['id']),
-                nombre=p.get('nombre', ''),
-                stock=float(p.get('stock', 0)),
-                precioVenta=float(p.get('precioVenta', 0))
-            )
-            for p in data.get('productos', [])
-        ]
-        
-        insumos = [
-            InsumoInventario(
-                id=int(i['id']),
-                nombre=i.get('nombre', ''),
-                stock=float(i.get('stock', 0)),
-                unidadMedida=i.get('unidadMedida'),
-                stockMinimo=float(i.get('stockMinimo', 0)),
-                precioUnitario=float(i.get('precio_unitario', 0))
-            )
-            for i in data.get('insumos', [])
-        ]
-        
-        insumos_stock_bajo = [
-            InsumoInventario(
-                id=int(i['id']),
-                nombre=i.get('nombre', ''),
-                stock=float(i.get('stock', 0)),
-                unidadMedida=i.get('unidadMedida'),
-                stockMinimo=float(i.get('stockMinimo', 0)),
-                precioUnitario=float(i.get('precio_unitario', 0))
-            )
-            for i in data.get('insumosStockBajo', [])
-        ]
-        
-        return ReporteInventario(
-            totalProductos=int(data.get('totalProductos', 0)),
-            totalInsumos=int(data.get('totalInsumos', 0)),
-            productos=productos,
-            insumos=insumos,
-            insumosStockBajo=insumos_stock_bajo,
-            valorInventario=float(data.get('valorInventario', 0))
-        )
+
+        return data
 
     @strawberry.field
     async def reporteVentas(self, info, fechaInicio: Optional[str] = None, fechaFin: Optional[str] = None) -> ReporteVentas:
-        rest = info.context['rest']
-        svc = ReportService(rest)
+        svc = _report_service(info)
         try:
-            data = await svc.reporte_ventas(fechaInicio, fechaFin)
+            partes = _partes(info, 'reporteVentas')
+            data = await _cached_report(info, 'reporteVentas',
+                                       {'fechaInicio': fechaInicio, 'fechaFin': fechaFin, 'partes': tuple(sorted(partes))},
+                                       lambda: svc.reporte_ventas(fechaInicio, fechaFin, partes))
         except httpx.HTTPStatusError as e:
             raise GraphQLError(f"Error al recuperar reporte de ventas: {e.response.status_code} {e.response.text}")
-        
-        ventas_por_producto = [
-            VentaProducto(
-                productoId=int(v['productoId']),
-                productoNombre=v.get('productoNombre'),
-                cantidadVendida=int(v.get('cantidadVendida', 0)),
-                totalVendido=float(v.get('totalVendido', 0))
-            )
-            for v in data.get('ventasPorProducto', [])
-        ]
-        
-        productos_mas_vendidos = [
-            ProductoVendidoReporte(
-                idProducto=int(v['productoId']),
-                nombre=v.get('productoNombre', ''),
-                cantidadVendida=int(v.get('cantidadVendida', 0)),
-                totalVendido=float(v.get('totalVendido', 0))
-            )
-            for v in data.get('ventasPorProducto', [])
-        ]
-        
-        ventas_por_dia = [
-            VentaDiaria(
-                fecha=v['fecha'],
-                total=float(v.get('total', 0)),
-                cantidad=int(v.get('cantidad', 0))
-            )
-            for v in data.get('ventasPorDia', [])
-        ]
-        
-        return ReporteVentas(
-            totalVentas=float(data.get('totalVentas', 0)),
-            totalPedidos=int(data.get('totalPedidos', 0)),
-            cantidadPedidos=int(data.get('totalPedidos', 0)),
-            pedidosCompletados=int(data.get('pedidosCompletados', 0)),
-            pedidosPendientes=int(data.get('pedidosPendientes', 0)),
-            ventasPorProducto=ventas_por_producto,
-            productosMasVendidos=productos_mas_vendidos,
-            ventasPorDia=ventas_por_dia
-        )
+
+        # productosMasVendidos y ventasPorProducto comparten las mismas filas
+        return data
@@ -1,27 +1,84 @@
 import strawberry
-from typing import Any
-from fastapi import Request
-from infrastructure.http_client import RESTClient
-import os
+import hashlib
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, Request, WebSocket, WebSocketException, status
+from infrastructure.jwt_auth import InvalidToken
+from infrastructure.loaders import CatalogLoaders
+from .cost import QueryCostExtension
+from .deadlines import DEADLINE_HEADER, PartialResultsExtension, request_deadline
+from .metrics import MetricsExtension
+from .persisted import DocumentCache
 from .resolvers import Query
+from .subscriptions import Subscription
 
 
-schema = strawberry.Schema(query=Query)
+schema = strawberry.Schema(
+    query=Query,
+    subscription=Subscription,
+    extensions=[MetricsExtension, DocumentCache, QueryCostExtension, PartialResultsExtension],
+)
 
-async def get_context(request: Request) -> dict:
+
+def _cache_scope(token: Optional[str], user: Optional[Dict[str, Any]] = None) -> str:
+    # Los reportes cacheados se separan por usuario; el token nunca se guarda en claro
+    if not token:
+        return 'service'
+    if user and user.get('sub'):
+        # Token verificado: el mismo usuario conserva su caché al renovar el token
+        return f"user:{user['sub']}"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def _verify_user(state, token: Optional[str], websocket: Optional[WebSocket]) -> Optional[Dict[str, Any]]:
+    # Con JWT_SECRET los tokens inválidos o caducados se rechazan aquí, antes de cualquier llamada upstream
+    verifier = getattr(state, "jwt_verifier", None)
+    if not token or verifier is None:
+        return None
+    try:
+        return verifier.verify(token)
+    except InvalidToken as e:
+        if websocket is not None:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        raise HTTPException(status_code=401, detail=str(e), headers={'WWW-Authenticate': 'Bearer'})
+
+
+async def get_context(request: Request = None, websocket: WebSocket = None) -> dict:
+    # Las suscripciones llegan por WebSocket: mismas cabeceras y app.state, sin deadline por request
+    connection = request or websocket
     # Extraer token del header Authorization del request del frontend
-    auth_header = request.headers.get("Authorization", "")
+    auth_header = connection.headers.get("Authorization", "")
     token = None
     
     if auth_header.startswith("Bearer "):
         token = auth_header[7:]  # Quitar "Bearer "
+
+    state = connection.app.state
+    user = _verify_user(state, token, websocket)
+    cache = getattr(state, "catalog_cache", None)
+    shared = {
+        'report_cache': getattr(state, "report_cache", None),
+        'aggregates': getattr(state, "aggregates", None),
+        'aggregation': getattr(state, "aggregation", None),
+        'live': getattr(state, "live", None),
+        'cache_scope': _cache_scope(token, user),
+        'user': user,
+        'cost_budget': getattr(state, "cost_budget", None),
+        # Enriquecimientos (nombres) que no lleguen antes del deadline se omiten
+        'deadline': request_deadline(request.headers.get(DEADLINE_HEADER)) if request is not None else None,
+        'partial': {},
+    }
     
-    # Si hay token del frontend, crear un nuevo RESTClient con ese token
-    # Esto permite que cada request use el token del usuario autenticado
+    # Con SNAPSHOT_ENABLED los GET se responden desde la réplica local mientras esté al día
+    snapshot = getattr(state, "snapshot", None)
+
+    # Si hay token del frontend, usar una vista del cliente global con ese token:
+    # cada request usa el token del usuario pero comparte el pool de conexiones
     if token:
-        api_url = os.getenv("API_URL") or "http://127.0.0.1:3000/chifles"
-        rest = RESTClient(base_url=api_url, token=token)
-        return {'rest': rest, 'user_token': token}
+        rest = state.rest.for_token(token)
+        if snapshot is not None:
+            rest = snapshot.view(rest)
+        return {'rest': rest, 'loaders': CatalogLoaders(rest, cache=cache), 'user_token': token, **shared}
     
     # Si no hay token, usar el cliente global (que puede tener token de servicio)
-    return {'rest': request.app.state.rest, 'user_token': None}
+    rest = state.rest if snapshot is None else snapshot.view(state.rest)
+    return {'rest': rest, 'loaders': CatalogLoaders(rest, cache=cache), 'user_token': None, **shared}
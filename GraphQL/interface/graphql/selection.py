@@ -0,0 +1,25 @@
+from typing import FrozenSet
+
+from strawberry.types.nodes import SelectedField
+
+
+def selected_paths(info) -> FrozenSet[str]:
+    """Campos pedidos bajo el campo actual, como rutas ``campo`` y ``campo.subcampo``.
+
+    Los fragmentos (con nombre o en línea) se aplanan; las directivas
+    ``@include``/``@skip`` no se evalúan, así que en la duda se calcula de más.
+    """
+    paths = set()
+
+    def walk(selections, prefix: str) -> None:
+        for selection in selections:
+            if isinstance(selection, SelectedField):
+                path = prefix + selection.name
+                paths.add(path)
+                walk(selection.selections, path + '.')
+            else:
+                walk(selection.selections, prefix)
+
+    for field in info.selected_fields:
+        walk(field.selections, '')
+    return frozenset(paths)
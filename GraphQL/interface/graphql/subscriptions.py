@@ -0,0 +1,77 @@
+import strawberry
+from typing import AsyncGenerator, Optional
+from graphql import GraphQLError
+from interface.graphql.types import (
+    InsumoInventario,
+    InventarioDelta,
+    VentaDiaria,
+    VentaProducto,
+    VentasDelta,
+)
+
+
+def _live(info):
+    live = info.context.get('live')
+    if live is None:
+        raise GraphQLError("Las suscripciones en vivo requieren WS_EVENTS_URL y AGGREGATES_ENABLED=true")
+    return live
+
+
+def _ventas_delta(d: dict) -> VentasDelta:
+    if d['tipo'] != 'delta':
+        return VentasDelta(tipo=d['tipo'])
+    return VentasDelta(
+        tipo='delta',
+        totalVentas=float(d['totalVentas']),
+        totalPedidos=int(d['totalPedidos']),
+        pedidosCompletados=int(d['pedidosCompletados']),
+        pedidosPendientes=int(d['pedidosPendientes']),
+        ventasPorProducto=[
+            VentaProducto(
+                productoId=int(v['productoId']),
+                productoNombre=v.get('productoNombre'),
+                cantidadVendida=int(v.get('cantidadVendida', 0)),
+                totalVendido=float(v.get('totalVendido', 0))
+            )
+            for v in d['ventasPorProducto']
+        ],
+        ventasPorDia=[
+            VentaDiaria(fecha=v['fecha'], total=float(v.get('total', 0)), cantidad=int(v.get('cantidad', 0)))
+            for v in d['ventasPorDia']
+        ],
+    )
+
+
+def _inventario_delta(d: dict) -> InventarioDelta:
+    if d['tipo'] != 'delta':
+        return InventarioDelta(tipo=d['tipo'])
+    return InventarioDelta(
+        tipo='delta',
+        insumosStockBajo=[
+            InsumoInventario(
+                id=int(i['id']),
+                nombre=i.get('nombre', ''),
+                stock=float(i.get('stock', 0)),
+                unidadMedida=i.get('unidadMedida'),
+                stockMinimo=float(i.get('stockMinimo', 0)),
+                precioUnitario=float(i.get('precio_unitario', 0))
+            )
+            for i in d['insumosStockBajo']
+        ],
+    )
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def ventasEnVivo(self, info, fechaInicio: Optional[str] = None,
+                           fechaFin: Optional[str] = None) -> AsyncGenerator[VentasDelta, None]:
+        # Un delta por pedido nuevo/modificado dentro del rango; se calcula una vez por rango, no por cliente
+        async for delta in _live(info).subscribe('ventas', (fechaInicio, fechaFin)):
+            yield _ventas_delta(delta)
+
+    @strawberry.subscription
+    async def inventarioEnVivo(self, info) -> AsyncGenerator[InventarioDelta, None]:
+        # insumosStockBajo actualizado cada vez que cambia por un evento de insumos/producción
+        async for delta in _live(info).subscribe('inventario'):
+            yield _inventario_delta(delta)
@@ -135,3 +135,22 @@ class VentaDiaria:
     fecha: str
     total: float
     cantidad: int
+
+
+@strawberry.type
+class VentasDelta:
+    # 'delta': solo cambian los días/productos incluidos; 'resync': volver a consultar reporteVentas
+    tipo: str
+    totalVentas: Optional[float] = None
+    totalPedidos: Optional[int] = None
+    pedidosCompletados: Optional[int] = None
+    pedidosPendientes: Optional[int] = None
+    ventasPorProducto: List[VentaProducto] = strawberry.field(default_factory=list)
+    ventasPorDia: List[VentaDiaria] = strawberry.field(default_factory=list)
+
+
+@strawberry.type
+class InventarioDelta:
+    # 'delta': lista completa de insumos con stock bajo; 'resync': volver a consultar reporteInventario
+    tipo: str
+    insumosStockBajo: List[InsumoInventario] = strawberry.field(default_factory=list)
@@ -0,0 +1,155 @@
+import pytest
+
+import random
+
+from app.aggregates import AggregateStore
+from app.topk import TopK, top_k
+from app.usecases import ReportService
+
+
+PEDIDOS = [
+    {'id': 1, 'fecha': '2025-11-01T10:00:00', 'total': 30.0, 'estado': 'pagado', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 2, 'subtotal': 10.0},
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 20.0},
+    ]},
+    {'id': 2, 'fecha': '2025-11-02', 'total': 15.0, 'estado': 'pendiente', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 15.0},
+    ]},
+    {'id': 3, 'fecha': '2025-11-05', 'total': 8.0, 'estado': 'entregado', 'detalles': [
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 8.0},
+    ]},
+]
+
+ORDENES = [
+    {'id': 1, 'fecha_inicio': '2025-11-01', 'estado': 'completada', 'productoId': 1, 'cantidad_producir': 50,
+     'detalles': [{'insumoId': 7, 'cantidad_utilizada': 2.5}]},
+]
+
+
+class _FakeRest:
+    def __init__(self):
+        self.pedidos = [dict(p) for p in PEDIDOS]
+        self.list_calls = 0
+
+    async def get(self, path, params=None):
+        if path == '/pedidos':
+            self.list_calls += 1
+            return self.pedidos
+        if path == '/ordenes-produccion':
+            return ORDENES
+        entity_id = int(path.rsplit('/', 1)[1])
+        return {'id': entity_id, 'nombre': f'{path}'}
+
+
+@pytest.mark.asyncio
+async def test_materialized_report_matches_full_scan():
+    rest = _FakeRest()
+    store = AggregateStore(rest)
+
+    direct = await ReportService(rest).reporte_ventas()
+    materialized = await ReportService(rest, aggregates=store).reporte_ventas()
+    assert materialized == direct
+
+    produccion = await ReportService(rest, aggregates=store).reporte_produccion()
+    assert produccion == await ReportService(rest).reporte_produccion()
+
+
+@pytest.mark.asyncio
+async def test_date_range_is_a_bucket_range_sum():
+    rest = _FakeRest()
+    store = AggregateStore(rest)
+    svc = ReportService(rest, aggregates=store)
+
+    data = await svc.reporte_ventas('2025-11-02', '2025-11-05')
+    assert data.totalVentas == 23.0
+    assert data.totalPedidos == 2
+    assert [d.fecha for d in data.ventasPorDia] == ['2025-11-02', '2025-11-05']
+
+    # Los reportes siguientes no vuelven a leer /pedidos
+    await svc.reporte_ventas('2025-11-01', '2025-11-01')
+    assert rest.list_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_events_and_sync_update_buckets_incrementally():
+    rest = _FakeRest()
+    store = AggregateStore(rest)
+    await store.ensure_ready()
+
+    # Pedido 2 cambia de fecha y de estado: se retira su aporte anterior
+    await store.handle_event({'type': 'order.completed', 'payload': {
+        'id': 2, 'fecha': '2025-11-05', 'total': 15.0, 'estado': 'completado',
+        'detalles': [{'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 15.0}],
+    }})
+    resumen = store.ventas.resumen('2025-11-02', '2025-11-02')
+    assert resumen['totalPedidos'] == 0
+    resumen = store.ventas.resumen('2025-11-05', '2025-11-05')
+    assert (resumen['totalPedidos'], resumen['pedidosCompletados'], resumen['cantidades']) == (2, 2, {1: 3, 2: 1})
+
+    # Un pedido borrado (sin evento) desaparece en la siguiente sincronización
+    rest.pedidos = [p for p in rest.pedidos if p['id'] != 1]
+    await store.sync()
+    assert store.ventas.resumen()['totalPedidos'] == 2
+    assert '2025-11-01' not in store.ventas.resumen()['totalDiario']
+
+
+def test_incremental_top_k_matches_heap_selection():
+    # Empates por la clave menor; bajadas dentro del top fuerzan un recalculo
+    assert top_k({3: 5, 1: 5, 2: 9, 4: 1}, 3) == [(2, 9), (1, 5), (3, 5)]
+    rng = random.Random(7)
+    ranking = TopK(5)
+    for _ in range(2000):
+        ranking.add(rng.randrange(40), rng.choice((1, 2, 3, -1)))
+        assert ranking.top(3) == top_k(ranking.valores, 3)
+    assert ranking.top(8) == top_k(ranking.valores, 8)
+
+
+@pytest.mark.asyncio
+async def test_top_sellers_follow_order_events():
+    rest = _FakeRest()
+    store = AggregateStore(rest, top_capacity=2)
+    svc = ReportService(rest, aggregates=store)
+    assert [p['productId'] for p in await svc.productos_mas_vendidos(2)] == [1, 2]
+
+    await store.handle_event({'type': 'order.created', 'payload': {
+        'id': 9, 'fecha': '2025-11-06', 'total': 50.0, 'estado': 'nuevo',
+        'detalles': [{'productoId': 3, 'cantidad_solicitada': 10, 'subtotal': 50.0}],
+    }})
+    top = await svc.productos_mas_vendidos(2)
+    assert [(p['productId'], p['totalSold']) for p in top] == [(3, 10), (1, 5)]
+    assert [(p['productId'], p['totalSold']) for p in top] == top_k(store.ventas.resumen()['cantidades'], 2)
+
+
+def test_columnar_engine_matches_python_path(monkeypatch):
+    pytest.importorskip('numpy')
+    from app import aggregates, columnar
+
+    pedidos = [dict(p) for p in PEDIDOS] + [
+        # Sin fecha, importes como texto (decimales de Postgres) y un detalle sin producto
+        {'id': 4, 'fecha': None, 'total': '12.50', 'estado': 'Pagado', 'detalles': [
+            {'productoId': None, 'cantidad_solicitada': 1, 'subtotal': 2.5},
+            {'productoId': 2, 'cantidad_solicitada': '2', 'subtotal': '10.00'},
+        ]},
+        {'id': 5, 'total': 0, 'detalles': []},
+    ]
+    assert columnar.agregar_ventas_columnar(pedidos) == aggregates.agregar_ventas(pedidos)
+    assert list(columnar.agregar_ventas_columnar(pedidos)['cantidades']) == [1, 2]
+    assert columnar.agregar_produccion_columnar(ORDENES) == aggregates.agregar_produccion(ORDENES)
+
+    # Ids no numéricos: el despachador vuelve al camino en Python
+    monkeypatch.setattr(columnar, 'REPORT_ENGINE', 'columnar')
+    raros = [{'id': 1, 'fecha': '2025-11-01', 'total': 1, 'detalles': [{'productoId': 'A1', 'subtotal': 1}]}]
+    assert columnar.agregar_ventas(raros)['totales'] == {'A1': 1.0}
+
+
+@pytest.mark.asyncio
+async def test_streamed_batches_add_up_to_full_summary(monkeypatch):
+    from app import aggregates, columnar
+    monkeypatch.setattr(columnar, 'REPORT_STREAM_BATCH', 2)
+
+    async def flujo(registros):
+        for registro in registros:
+            yield registro
+
+    assert await columnar.agregar_ventas_stream(flujo(PEDIDOS)) == aggregates.agregar_ventas(PEDIDOS)
+    assert await columnar.agregar_produccion_stream(flujo(ORDENES)) == aggregates.agregar_produccion(ORDENES)
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+import respx
+
+from app.aggregates import agregar_ventas
+from app.usecases import ReportService
+from infrastructure.aggregation import AggregationClient
+from infrastructure.http_client import RESTClient
+
+
+BASE = 'http://testserver'
+
+PEDIDOS = [
+    {'id': 1, 'fecha': '2025-11-01', 'total': 30.0, 'estado': 'pagado', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 2, 'subtotal': 10.0},
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 20.0},
+    ]},
+    {'id': 2, 'fecha': '2025-11-02', 'total': 15.0, 'estado': 'pendiente', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 15.0},
+    ]},
+]
+
+
+class _Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_pushdown_summary_matches_local_aggregation(monkeypatch):
+    monkeypatch.setattr('app.usecases.REPORT_STREAMING', False)
+    rest = RESTClient(base_url=BASE, token='t')
+    # El API responde con claves JSON (texto), como lo haría Nest
+    resumen_api = json.loads(json.dumps(agregar_ventas(PEDIDOS)))
+    aggregation = AggregationClient()
+
+    with respx.mock(base_url=BASE) as rsps:
+        rsps.get('/productos/1').respond(200, json={'id': 1, 'nombre': 'Chifle'})
+        rsps.get('/productos/2').respond(200, json={'id': 2, 'nombre': 'Maduro'})
+        pedidos = rsps.get('/pedidos').respond(200, json=PEDIDOS)
+        agregados = rsps.get('/reportes/agregados').respond(200, json=resumen_api)
+
+        local = await ReportService(rest).reporte_ventas('2025-11-01', '2025-11-30')
+        remoto = await ReportService(rest, aggregation=aggregation).reporte_ventas('2025-11-01', '2025-11-30')
+
+    assert remoto == local
+    assert pedidos.call_count == 1
+    assert dict(agregados.calls.last.request.url.params) == {
+        'tipo': 'ventas', 'fechaInicio': '2025-11-01', 'fechaFin': '2025-11-30'}
+    assert aggregation.stats() == {'available': True, 'pushdowns': 1, 'fallbacks': 0}
+    await rest.close()
+
+
+@pytest.mark.asyncio
+async def test_missing_endpoint_falls_back_and_is_retried_later(monkeypatch):
+    monkeypatch.setattr('app.usecases.REPORT_STREAMING', False)
+    rest = RESTClient(base_url=BASE, token='t')
+    clock = _Clock()
+    aggregation = AggregationClient(retry_after=60, clock=clock)
+    svc = ReportService(rest, aggregation=aggregation)
+
+    with respx.mock(base_url=BASE, assert_all_called=False) as rsps:
+        rsps.get('/productos/1').respond(200, json={'id': 1, 'nombre': 'Chifle'})
+        rsps.get('/productos/2').respond(200, json={'id': 2, 'nombre': 'Maduro'})
+        pedidos = rsps.get('/pedidos').respond(200, json=PEDIDOS)
+        agregados = rsps.get('/reportes/agregados').respond(404, json={'message': 'Not Found'})
+
+        top = await svc.productos_mas_vendidos(1)
+        await svc.productos_mas_vendidos(1)
+        assert (agregados.call_count, pedidos.call_count) == (1, 2)
+        assert top == [{'productId': 1, 'productName': 'Chifle', 'totalSold': 5}]
+
+        # Pasado retry_after se vuelve a negociar; una respuesta con otra forma también cae a local
+        clock.now = 61
+        agregados.respond(200, json={'totalVentas': 1})
+        await svc.productos_mas_vendidos(1)
+        assert (agregados.call_count, pedidos.call_count) == (2, 3)
+
+    assert aggregation.stats() == {'available': False, 'pushdowns': 0, 'fallbacks': 3}
+    await rest.close()
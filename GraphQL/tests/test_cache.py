@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+import respx
+
+from infrastructure.cache import CatalogCache, ReportCache, SharedStore, TTLCache
+from infrastructure.http_client import RESTClient
+from infrastructure.loaders import CatalogLoaders
+from app.usecases import ReportService
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    clock = _Clock()
+    cache = TTLCache(max_entries=2, ttl=10, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'a' pasa a ser la más reciente
+    cache.set('c', 3)           # desaloja 'b'
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    clock.now = 11
+    assert cache.get('a') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (2, 2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_catalog_cache_invalidation():
+    cache = CatalogCache()
+    await cache.set_many('productos', {1: {'id': 1}, 2: {'id': 2}})
+    await cache.set_many('insumos', {1: {'id': 1}})
+
+    assert await cache.invalidate('productos', '1') == 1
+    assert await cache.get_many('productos', [1, 2]) == {2: {'id': 2}}
+    assert await cache.invalidate('productos') == 1
+    assert await cache.get_many('insumos', [1]) == {1: {'id': 1}}
+
+
+@pytest.mark.asyncio
+async def test_catalog_cache_is_shared_between_requests():
+    base = 'http://testserver'
+    client = RESTClient(base_url=base)
+    cache = CatalogCache()
+    ordenes = [{'id': 1, 'detalles': [{'insumoId': 5, 'cantidad_utilizada': 2}]}]
+
+    with respx.mock(base_url=base) as rsps:
+        rsps.get('/ordenes-produccion').respond(200, json=ordenes)
+        insumo = rsps.get('/insumos/5').respond(200, json={'id': 5, 'nombre': 'Sal', 'unidad_medida': 'kg'})
+        for _ in range(3):
+            # Un ReportService y unos loaders nuevos por request, como en get_context
+            svc = ReportService(client, CatalogLoaders(client, cache=cache))
+            data = await svc.consumo_insumos()
+            assert data[0]['insumoNombre'] == 'Sal'
+
+    assert insumo.call_count == 1
+    assert cache.stats()['hits'] == 2
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_report_cache_coalesces_concurrent_computations():
+    cache = ReportCache(ttl=30)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {'totalVentas': 10.0}
+
+    key = ReportCache.key('reporteVentas', {'fechaInicio': None, 'fechaFin': None}, 'service')
+    results = await asyncio.gather(*(cache.get_or_compute(key, compute) for _ in range(50)))
+
+    assert calls == 1
+    assert all(r == {'totalVentas': 10.0} for r in results)
+    assert cache.stats()['coalesced'] == 49
+
+
+@pytest.mark.asyncio
+async def test_report_cache_serves_stale_while_revalidating():
+    clock = _Clock()
+    cache = ReportCache(ttl=10, stale_ttl=60, clock=clock)
+    values = iter(['v1', 'v2', 'v3'])
+
+    async def compute():
+        return next(values)
+
+    key = ReportCache.key('reporteInventario', {}, 'service')
+    assert await cache.get_or_compute(key, compute) == 'v1'
+
+    clock.now = 15  # caducado pero dentro de la ventana stale
+    assert await cache.get_or_compute(key, compute) == 'v1'
+    await asyncio.sleep(0)  # deja correr el refresco en segundo plano
+    assert await cache.get_or_compute(key, compute) == 'v2'
+
+    await cache.invalidate('reporteInventario')
+    assert await cache.get_or_compute(key, compute) == 'v3'
+
+
+@pytest.mark.asyncio
+async def test_report_cache_invalidation_only_discards_matching_computations():
+    cache = ReportCache(ttl=30)
+    release = asyncio.Event()
+    calls = []
+
+    def compute(valor):
+        async def _compute():
+            calls.append(valor)
+            await release.wait()
+            return valor
+        return _compute
+
+    ventas = ReportCache.key('reporteVentas', {}, 'service')
+    inventario = ReportCache.key('reporteInventario', {}, 'service')
+    pendientes = [asyncio.ensure_future(cache.get_or_compute(ventas, compute('ventas'))),
+                  asyncio.ensure_future(cache.get_or_compute(inventario, compute('inventario')))]
+    await asyncio.sleep(0)
+
+    # Un evento de ventas no debe impedir que se guarde el inventario que ya se estaba calculando
+    await cache.invalidate('reporteVentas')
+    release.set()
+    assert await asyncio.gather(*pendientes) == ['ventas', 'inventario']
+
+    assert await cache.get_or_compute(inventario, compute('otro')) == 'inventario'
+    assert await cache.get_or_compute(ventas, compute('ventas2')) == 'ventas2'
+    assert calls == ['ventas', 'inventario', 'ventas2']
+
+
+@pytest.mark.asyncio
+async def test_report_cache_discards_computation_that_finishes_after_a_newer_one():
+    cache = ReportCache(ttl=30)
+    lento = asyncio.Event()
+
+    async def viejo():
+        await lento.wait()
+        return 'OLD'
+
+    async def nuevo():
+        return 'NEW'
+
+    key = ReportCache.key('reporteVentas', {}, 'service')
+    pendiente = asyncio.ensure_future(cache.get_or_compute(key, viejo))
+    await asyncio.sleep(0)
+
+    await cache.invalidate('reporteVentas')
+    assert await cache.get_or_compute(key, nuevo) == 'NEW'
+    # El cálculo anterior a la invalidación termina después: su resultado no pisa el nuevo
+    lento.set()
+    assert await pendiente == 'OLD'
+    assert await cache.get_or_compute(key, viejo) == 'NEW'
+
+
+def _shared_store():
+    from aiocache import SimpleMemoryCache
+    from aiocache.serializers import PickleSerializer
+    return SharedStore(SimpleMemoryCache(serializer=PickleSerializer()), backend='memory')
+
+
+@pytest.mark.asyncio
+async def test_shared_store_is_seen_by_every_worker():
+    shared = _shared_store()
+    # Dos instancias de cada caché sobre el mismo almacén, como dos workers
+    catalogo_a, catalogo_b = CatalogCache(shared=shared), CatalogCache(shared=shared)
+    await catalogo_a.set_many('productos', {1: {'id': 1}, 2: {'id': 2}})
+    assert await catalogo_b.get_many('productos', ['1', 2, 3]) == {'1': {'id': 1}, 2: {'id': 2}}
+    await catalogo_b.invalidate('productos', 1)
+    assert await catalogo_a.get_many('productos', [1, 2]) == {2: {'id': 2}}
+
+    worker_a, worker_b = ReportCache(shared=shared, lock_wait=1), ReportCache(shared=shared, lock_wait=1)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return {'total': calls}
+
+    key = ReportCache.key('reporteVentas', {'fechaInicio': '2025-11-01'}, 'user-1')
+    # El segundo worker espera al lock del primero en vez de recalcular
+    results = await asyncio.gather(worker_a.get_or_compute(key, compute), worker_b.get_or_compute(key, compute))
+    assert results == [{'total': 1}, {'total': 1}]
+    assert (calls, worker_b.stats()['waitedForWorker']) == (1, 1)
+
+    await worker_a.invalidate('reporteVentas')
+    assert await worker_b.get_or_compute(key, compute) == {'total': 2}
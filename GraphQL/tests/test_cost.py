@@ -0,0 +1,79 @@
+import pytest
+
+from interface.graphql.cost import CostBudget, QueryCostExtension
+from interface.graphql.schema import schema
+
+
+class _NoRest:
+    """El API REST no debe llegar a consultarse."""
+
+    async def get(self, path, params=None):
+        raise AssertionError(f'llamada inesperada a {path}')
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_cost_scales_with_aliases_limits_and_date_ranges(monkeypatch):
+    query = """
+        query Panel($limite: Int = 20, $desde: String) {
+            top: productosMasVendidos(limite: $limite) { productoId }
+            ...Ventas
+        }
+        fragment Ventas on Query {
+            trimestre: reporteVentas(fechaInicio: $desde, fechaFin: "2025-03-31") { totalVentas }
+            todo: reporteVentas { totalVentas }
+        }
+    """
+    # Con un máximo mínimo la operación se rechaza y solo se calcula su coste
+    monkeypatch.setattr(QueryCostExtension, 'max_cost', 0.5)
+    result = await schema.execute(query, variable_values={'desde': '2025-01-01'},
+                                  context_value={'rest': _NoRest()})
+
+    # 4 + 0.5*20 = 14; 10 * (1 + 89/90) = 19.89; 10 * 3 = 30
+    assert result.extensions['cost']['requested'] == pytest.approx(14 + 19.89 + 30)
+    assert result.errors[0].extensions['code'] == 'QUERY_TOO_EXPENSIVE'
+
+
+@pytest.mark.asyncio
+async def test_invalid_variable_is_reported_by_graphql_validation():
+    query = 'query($l: Int) { productosMasVendidos(limite: $l) { productoId } }'
+    result = await schema.execute(query, variable_values={'l': 'abc'}, context_value={'rest': _NoRest()})
+
+    assert result.data is None
+    assert "Variable '$l' got invalid value 'abc'" in result.errors[0].message
+
+
+@pytest.mark.asyncio
+async def test_expensive_operations_are_rejected_before_any_upstream_call():
+    aliases = '\n'.join(f't{i}: trazabilidadPedido(pedidoId: {i}) {{ productoId }}' for i in range(20))
+    result = await schema.execute(f'{{ {aliases} }}', context_value={'rest': _NoRest()})
+
+    assert result.data is None
+    assert result.errors[0].extensions['code'] == 'QUERY_TOO_EXPENSIVE'
+    assert result.extensions['cost']['requested'] == 240
+
+
+@pytest.mark.asyncio
+async def test_cost_budget_throttles_per_user():
+    clock = _Clock()
+    budget = CostBudget(rate=60, burst=30, clock=clock)
+    context = {'rest': _NoRest(), 'cost_budget': budget, 'cache_scope': 'alice'}
+    query = '{ a: trazabilidadPedido(pedidoId: 1) { productoId } b: trazabilidadPedido(pedidoId: 2) { productoId } }'
+
+    first = await schema.execute('{ __typename }', context_value=context)
+    assert first.extensions['cost'] == {'requested': 0, 'maximum': 200.0, 'remaining': 30}
+
+    assert budget.consumir('alice', 24)
+    result = await schema.execute(query, context_value=context)
+    assert result.errors[0].extensions['code'] == 'THROTTLED'
+    assert budget.disponible('bob') == 30  # cada usuario tiene su propio presupuesto
+
+    clock.now = 30  # medio minuto: +30 unidades (tope 30)
+    assert budget.disponible('alice') == 30
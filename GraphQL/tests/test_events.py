@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from app.invalidation import CacheInvalidator
+from infrastructure.cache import CatalogCache, ReportCache
+from infrastructure.events import EventSubscriber
+
+
+class _FakeHub:
+    """Hub WebSocket local: guarda las conexiones para poder emitir o cortarlas."""
+
+    def __init__(self):
+        self.connections = asyncio.Queue()
+
+    async def handler(self, ws, *args):
+        await self.connections.put(ws)
+        await ws.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_invalidates_cache_from_hub_events_and_reconnects():
+    hub = _FakeHub()
+    cache = CatalogCache()
+    invalidator = CacheInvalidator(cache)
+    handled = asyncio.Queue()
+    resets = asyncio.Queue()
+
+    async def handle(event):
+        await invalidator.handle(event)
+        await handled.put(event['type'])
+
+    async def reset():
+        await invalidator.reset()
+        await resets.put(True)
+
+    async with websockets.serve(hub.handler, '127.0.0.1', 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        subscriber = EventSubscriber(f'ws://127.0.0.1:{port}', handle, on_connect=reset, initial_backoff=0.01, max_backoff=0.05)
+        subscriber.start()
+        try:
+            ws = await asyncio.wait_for(hub.connections.get(), 2)
+            await asyncio.wait_for(resets.get(), 2)
+            await cache.set_many('productos', {1: {'nombre': 'Chifle'}, 2: {'nombre': 'Maduro'}})
+            await cache.set_many('insumos', {1: {'nombre': 'Sal'}})
+
+            await ws.send(json.dumps({'type': 'product.updated', 'payload': {'id': 1, 'nombre': 'Chifle salado'}}))
+            assert await asyncio.wait_for(handled.get(), 2) == 'product.updated'
+            assert await cache.get_many('productos', [1, 2]) == {2: {'nombre': 'Maduro'}}
+            assert await cache.get_many('insumos', [1]) == {1: {'nombre': 'Sal'}}
+
+            # Se corta la conexión: el suscriptor reconecta y vacía la caché por los eventos perdidos
+            await ws.close()
+            ws = await asyncio.wait_for(hub.connections.get(), 2)
+            await asyncio.wait_for(resets.get(), 2)
+            assert await cache.get_many('productos', [2]) == {}
+
+            await cache.set_many('insumos', {3: {'nombre': 'Aceite'}})
+            await ws.send(json.dumps({'type': 'supply.low', 'payload': {'id': 3}}))
+            assert await asyncio.wait_for(handled.get(), 2) == 'supply.low'
+            assert await cache.get_many('insumos', [3]) == {}
+        finally:
+            await subscriber.stop()
+
+
+@pytest.mark.asyncio
+async def test_order_events_only_invalidate_sales_reports():
+    reports = ReportCache()
+    invalidator = CacheInvalidator(CatalogCache(), reports)
+
+    async def compute():
+        return {}
+
+    for report in ('reporteVentas', 'reporteInventario'):
+        await reports.get_or_compute(ReportCache.key(report, {}, 'service'), compute)
+
+    await invalidator.handle({'type': 'order.created', 'payload': {'id': 9}})
+
+    assert [key[0] for key in reports._store._data] == ['reporteInventario']
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+
+from infrastructure.http_client import RESTClient
+from infrastructure.json_stream import JSONArrayParser
+
+
+@pytest.mark.asyncio
+async def test_for_token_shares_pool_and_overlays_authorization():
+    base = 'http://testserver'
+    shared = RESTClient(base_url=base, token='service')
+    alice = shared.for_token('alice')
+    bob = shared.for_token('bob')
+
+    assert alice._client is shared._client and bob._client is shared._client
+
+    with respx.mock(base_url=base) as rsps:
+        route = rsps.get('/productos').respond(200, json=[])
+        await alice.get('/productos')
+        await bob.get('/productos')
+        await shared.get('/productos')
+
+    tokens = [call.request.headers['Authorization'] for call in route.calls]
+    assert tokens == ['Bearer alice', 'Bearer bob', 'Bearer service']
+
+    # Cerrar una vista no cierra el pool compartido
+    await alice.close()
+    assert not shared._client.is_closed
+    await shared.close()
+    assert shared._client.is_closed
+
+
+def test_json_array_parser_handles_any_chunk_boundary():
+    items = [{'id': 1, 'nota': 'a, b ] {'}, {'id': 2, 'detalles': [{'subtotal': 12.5}]}, 1234, 'x', None]
+    body = json.dumps(items, indent=1)
+
+    for corte in range(1, len(body)):
+        parser = JSONArrayParser()
+        parsed = parser.feed(body[:corte]) + parser.feed(body[corte:]) + parser.close()
+        assert parsed == items
+
+    parser = JSONArrayParser()
+    assert [x for c in body for x in parser.feed(c)] + parser.close() == items
+
+    # Un cuerpo que no es array se devuelve entero; uno truncado es un error
+    parser = JSONArrayParser()
+    parser.feed('{"message": ')
+    parser.feed('"Not Found"}')
+    assert parser.close() == [{'message': 'Not Found'}]
+    parser = JSONArrayParser()
+    parser.feed('[{"id": 1}, {"id"')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_items_yields_elements_as_they_arrive():
+    base = 'http://testserver'
+    client = RESTClient(base_url=base, token='service')
+    pedidos = [{'id': i, 'total': i * 1.5} for i in range(500)]
+
+    with respx.mock(base_url=base) as rsps:
+        route = rsps.get('/pedidos').respond(200, json=pedidos)
+        recibidos = [p async for p in client.stream_items('/pedidos', params={'fechaInicio': '2025-01-01'})]
+
+    assert recibidos == pedidos
+    assert route.calls[0].request.headers['Authorization'] == 'Bearer service'
+    assert route.calls[0].request.url.params['fechaInicio'] == '2025-01-01'
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_paginate_prefetches_pages_concurrently_in_order():
+    base = 'http://testserver'
+    client = RESTClient(base_url=base)
+    pedidos = [{'id': i} for i in range(23)]
+    in_flight = max_in_flight = 0
+
+    async def pagina(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        page, limit = int(request.url.params['page']), int(request.url.params['limit'])
+        return httpx.Response(200, json={'data': pedidos[(page - 1) * limit:page * limit]})
+
+    with respx.mock(base_url=base) as rsps:
+        route = rsps.get('/pedidos').mock(side_effect=pagina)
+        recibidos = [p async for p in client.paginate('/pedidos', page_size=5, prefetch=3)]
+
+    assert recibidos == pedidos
+    assert max_in_flight == 3
+    # 5 páginas útiles más, como mucho, las ya pedidas por adelantado
+    assert 5 <= route.call_count <= 7
+    await client.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('total', [4, 5, 12])
+async def test_paginate_degrades_when_upstream_ignores_paging(total):
+    base = 'http://testserver'
+    client = RESTClient(base_url=base)
+    pedidos = [{'id': i} for i in range(total)]
+
+    with respx.mock(base_url=base) as rsps:
+        rsps.get('/pedidos').respond(200, json=pedidos)
+        recibidos = [p async for p in client.paginate('/pedidos', page_size=5, prefetch=2)]
+
+    assert recibidos == pedidos
+    await client.close()
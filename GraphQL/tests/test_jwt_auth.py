@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import hmac
+import json
+
+import httpx
+import pytest
+import respx
+from fastapi import FastAPI
+
+from infrastructure.http_client import RESTClient
+from infrastructure.jwt_auth import InvalidToken, JWTVerifier
+from interface.graphql.persisted import PersistedQueryRouter
+from interface.graphql.schema import get_context, schema
+
+
+SECRET = 'chifles_super_secret_jwt_key_2024'
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def _jwt(claims: dict, secret: str = SECRET) -> str:
+    signing = f"{_b64(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())}.{_b64(json.dumps(claims).encode())}"
+    return f"{signing}.{_b64(hmac.new(secret.encode(), signing.encode(), hashlib.sha256).digest())}"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_verifies_signature_and_expiry_and_caches_the_result():
+    clock = _Clock()
+    verifier = JWTVerifier(SECRET, clock=clock)
+    token = _jwt({'sub': '42', 'type': 'access', 'exp': 1900})
+
+    assert verifier.verify(token)['sub'] == '42'
+    assert verifier.verify(token)['sub'] == '42'
+    assert verifier.stats()['hits'] == 1
+
+    with pytest.raises(InvalidToken, match='inválido'):
+        verifier.verify(_jwt({'sub': '42', 'exp': 1900}, secret='otro'))
+    with pytest.raises(InvalidToken, match='inválido'):
+        verifier.verify('no-es-un-jwt')
+    # Un refresh token bien firmado tampoco vale (como en jwt-auth.guard.ts)
+    with pytest.raises(InvalidToken, match='access token'):
+        verifier.verify(_jwt({'sub': '42', 'type': 'refresh', 'exp': 1900}))
+
+    # El resultado cacheado también caduca con el token
+    clock.now = 1900
+    with pytest.raises(InvalidToken, match='expirado'):
+        verifier.verify(token)
+    assert verifier.stats()['rejected'] == 4
+
+
+@pytest.mark.asyncio
+async def test_invalid_tokens_are_rejected_before_any_upstream_call():
+    base = 'http://testserver'
+    app = FastAPI()
+    app.state.rest = RESTClient(base_url=base, token='service')
+    app.state.jwt_verifier = JWTVerifier(SECRET)
+    app.include_router(PersistedQueryRouter(schema=schema, context_getter=get_context), prefix='/graphql')
+    query = {'query': '{ reporteInventario { totalProductos } }'}
+
+    with respx.mock(base_url=base) as rsps:
+        productos = rsps.get('/productos').respond(200, json=[])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+            rechazado = await client.post('/graphql', json=query,
+                                          headers={'Authorization': f"Bearer {_jwt({'sub': '42'}, secret='otro')}"})
+            assert rechazado.status_code == 401
+            assert productos.call_count == 0
+
+            valido = await client.post('/graphql', json=query,
+                                       headers={'Authorization': f"Bearer {_jwt({'sub': '42', 'exp': 4102444800})}"})
+            assert valido.json()['data'] == {'reporteInventario': {'totalProductos': 0}}
+            assert productos.call_count == 1
+    await app.state.rest.close()
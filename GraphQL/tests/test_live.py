@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.aggregates import AggregateStore
+from app.live import LiveReports
+from interface.graphql.schema import schema
+
+
+class _FakeRest:
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, path, params=None):
+        self.calls.append(path)
+        if path == '/pedidos':
+            return [{'id': 1, 'fecha': '2025-11-01', 'total': 10, 'estado': 'completado',
+                     'detalles': [{'productoId': 1, 'cantidad_solicitada': 2, 'subtotal': 10}]}]
+        if path == '/ordenes-produccion':
+            return []
+        if path == '/insumos':
+            return [{'id': 1, 'nombre': 'Plátano', 'stock': 50, 'stock_minimo': 10},
+                    {'id': 2, 'nombre': 'Sal', 'stock': 5, 'stock_minimo': 10}]
+        if path.startswith('/productos/'):
+            return {'id': int(path.rsplit('/', 1)[1]), 'nombre': f'Chifle {path[-1]}'}
+        raise AssertionError(path)
+
+
+VENTAS = """
+subscription { ventasEnVivo(fechaInicio: "2025-11-01", fechaFin: "2025-11-30") {
+    tipo totalVentas totalPedidos
+    ventasPorDia { fecha total cantidad }
+    ventasPorProducto { productoId productoNombre cantidadVendida totalVendido }
+} }
+"""
+
+
+@pytest.mark.asyncio
+async def test_one_computation_per_order_event_for_all_dashboards():
+    rest = _FakeRest()
+    aggregates = AggregateStore(rest)
+    live = LiveReports(aggregates, rest)
+    context = {'rest': rest, 'live': live}
+    dashboards = [await schema.subscribe(VENTAS, context_value=context) for _ in range(3)]
+
+    # Construcción inicial de los agregados: los dashboards reciben un resync
+    primeros = await asyncio.gather(*(anext(d) for d in dashboards))
+    assert [r.data['ventasEnVivo']['tipo'] for r in primeros] == ['resync'] * 3
+
+    await aggregates.handle_event({'type': 'order.created', 'payload': {
+        'id': 2, 'fecha': '2025-11-02T10:00:00', 'total': 15, 'estado': 'pendiente',
+        'detalles': [{'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 15}],
+    }})
+    deltas = await asyncio.gather(*(anext(d) for d in dashboards))
+
+    assert live.computations == 1
+    delta = deltas[0].data['ventasEnVivo']
+    assert all(r.data['ventasEnVivo'] == delta for r in deltas)
+    assert delta['tipo'] == 'delta'
+    assert (delta['totalVentas'], delta['totalPedidos']) == (25, 2)
+    assert delta['ventasPorDia'] == [{'fecha': '2025-11-02', 'total': 15, 'cantidad': 1}]
+    assert delta['ventasPorProducto'] == [
+        {'productoId': 1, 'productoNombre': 'Chifle 1', 'cantidadVendida': 5, 'totalVendido': 25}
+    ]
+
+    # Al cerrar la suscripción (el servidor cancela su tarea) el suscriptor se da de baja
+    pendientes = [asyncio.ensure_future(anext(d)) for d in dashboards]
+    await asyncio.sleep(0)
+    for tarea in pendientes:
+        tarea.cancel()
+    await asyncio.gather(*pendientes, return_exceptions=True)
+    assert live.subscribers() == 0
+
+
+@pytest.mark.asyncio
+async def test_stock_changes_push_updated_low_stock_list():
+    rest = _FakeRest()
+    live = LiveReports(AggregateStore(rest), rest)
+    sub = await schema.subscribe('subscription { inventarioEnVivo { tipo insumosStockBajo { id stock } } }',
+                                 context_value={'rest': rest, 'live': live})
+    siguiente = asyncio.ensure_future(anext(sub))
+    while not live.subscribers('inventario'):
+        await asyncio.sleep(0)
+
+    await live.handle_event({'type': 'supply.updated', 'payload': {'id': 1}})
+    assert (await asyncio.wait_for(siguiente, 1)).data['inventarioEnVivo']['insumosStockBajo'] == [{'id': 2, 'stock': 5}]
+
+    # Con stock en el payload se actualiza sin releer /insumos
+    await live.handle_event({'type': 'supply.updated', 'payload': {'id': 1, 'stock': 3}})
+    result = await asyncio.wait_for(anext(sub), 1)
+    assert result.data['inventarioEnVivo']['insumosStockBajo'] == [{'id': 1, 'stock': 3}, {'id': 2, 'stock': 5}]
+    assert rest.calls.count('/insumos') == 1
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+import respx
+from httpx import Response
+
+from infrastructure.http_client import RESTClient
+from infrastructure.loaders import CatalogLoaders
+from app.usecases import ReportService
+from interface.graphql.schema import schema
+
+
+BASE = 'http://testserver'
+
+SAMPLE_PEDIDOS = [
+    {'id': 1, 'fecha': '2025-11-01', 'total': 30.0, 'estado': 'pagado', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 2, 'subtotal': 10.0},
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 20.0},
+    ]},
+    {'id': 2, 'fecha': '2025-11-02', 'total': 15.0, 'estado': 'pendiente', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 15.0},
+    ]},
+]
+
+
+def _producto(request, id):
+    return Response(200, json={'id': int(id), 'nombre': f'Producto {id}'})
+
+
+@pytest.mark.asyncio
+async def test_reporte_ventas_fetches_each_producto_once():
+    client = RESTClient(base_url=BASE)
+    svc = ReportService(client)
+
+    with respx.mock(base_url=BASE) as rsps:
+        rsps.get('/pedidos').respond(200, json=SAMPLE_PEDIDOS)
+        productos = rsps.get(path__regex=r'^/productos/(?P<id>\d+)$').mock(side_effect=_producto)
+        data = await svc.reporte_ventas()
+
+    assert productos.call_count == 2
+    nombres = {v.productoId: v.productoNombre for v in data.ventasPorProducto}
+    assert nombres == {1: 'Producto 1', 2: 'Producto 2'}
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_loaders_are_shared_across_fields_of_one_operation():
+    client = RESTClient(base_url=BASE)
+    query = """
+        query {
+            reporteVentas { totalVentas ventasPorProducto { productoNombre } }
+            productosMasVendidos(limite: 5) { productoNombre cantidadVendida }
+        }
+    """
+
+    with respx.mock(base_url=BASE) as rsps:
+        rsps.get('/pedidos').respond(200, json=SAMPLE_PEDIDOS)
+        productos = rsps.get(path__regex=r'^/productos/(?P<id>\d+)$').mock(side_effect=_producto)
+        result = await schema.execute(query, context_value={'rest': client, 'loaders': CatalogLoaders(client)})
+
+    assert result.errors is None
+    assert result.data['productosMasVendidos'][0] == {'productoNombre': 'Producto 1', 'cantidadVendida': 5}
+    # Sin loaders serían 4 llamadas (2 por cada campo); con loaders, una por producto distinto
+    assert productos.call_count == 2
+
+    await client.close()
+
+
+class _SlowRest:
+    """REST falso que registra cuántas peticiones hay en vuelo a la vez."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, path, params=None):
+        self.calls.append((path, params))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if path.startswith('/pedidos/'):
+            return {'id': 7, 'detalles': [{'productoId': i, 'cantidad_solicitada': i} for i in range(1, 9)]}
+        if path == '/productos-insumos':
+            pid = params['productoId']
+            return [{'insumoId': pid % 3, 'cantidad_necesaria': 1.5}, {'insumoId': 10, 'cantidad_necesaria': 2}]
+        entity_id = int(path.rsplit('/', 1)[1])
+        return {'id': entity_id, 'nombre': f'{path}', 'unidad_medida': 'kg'}
+
+
+@pytest.mark.asyncio
+async def test_trazabilidad_pedido_fans_out_with_bounded_concurrency():
+    rest = _SlowRest()
+    svc = ReportService(rest, CatalogLoaders(rest, max_concurrency=4))
+
+    data = await svc.trazabilidad_pedido(7)
+
+    assert [p['productoId'] for p in data['productos']] == list(range(1, 9))
+    assert data['productos'][0]['receta'][1] == {
+        'insumoId': 10, 'insumoNombre': '/insumos/10', 'cantidadNecesaria': 2.0, 'unidadMedida': 'kg',
+    }
+    # 1 pedido + 8 productos + 8 recetas + 4 insumos distintos (0, 1, 2, 10)
+    assert len(rest.calls) == 21
+    assert rest.max_in_flight == 4
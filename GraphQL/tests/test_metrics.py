@@ -0,0 +1,93 @@
+import httpx
+import pytest
+import respx
+
+from app.main import create_app
+from infrastructure.http_client import RESTClient
+from infrastructure.metrics import MetricsRegistry, registry
+from interface.graphql.metrics import MetricsExtension
+from interface.graphql.schema import schema
+
+
+def test_registry_renders_prometheus_text_format():
+    metrics = MetricsRegistry()
+    metrics.counter('llamadas_total', 'Llamadas')
+    metrics.histogram('latencia_seconds', 'Latencia', buckets=(0.1, 1.0))
+    metrics.inc('llamadas_total', endpoint='/productos/{id}', status=200)
+    metrics.observe('latencia_seconds', 0.5, endpoint='/pedidos')
+    metrics.register_collector('cache', lambda: {'hitRate': 0.75, 'enabled': True, 'openCircuits': ['/a']})
+
+    text = metrics.render()
+
+    assert '# TYPE llamadas_total counter' in text
+    assert 'llamadas_total{endpoint="/productos/{id}",status="200"} 1' in text
+    assert 'latencia_seconds_bucket{endpoint="/pedidos",le="0.1"} 0' in text
+    assert 'latencia_seconds_bucket{endpoint="/pedidos",le="1.0"} 1' in text
+    assert 'latencia_seconds_bucket{endpoint="/pedidos",le="+Inf"} 1' in text
+    assert 'latencia_seconds_count{endpoint="/pedidos"} 1' in text
+    assert 'cache_hit_rate 0.75' in text
+    assert 'cache_enabled 1.0' in text
+    assert 'cache_open_circuits 1.0' in text
+
+
+@pytest.mark.asyncio
+async def test_operation_timing_in_extensions_and_upstream_counters(monkeypatch):
+    monkeypatch.setattr(MetricsExtension, 'timing_in_response', True)
+    base = 'http://testserver'
+    rest = RESTClient(base_url=base)
+    antes = registry.value('upstream_requests_total', endpoint='/productos/{id}', status=200)
+
+    with respx.mock(base_url=base) as rsps:
+        rsps.get('/pedidos').respond(200, json=[
+            {'id': 1, 'fecha': '2025-11-01', 'total': 10, 'estado': 'completado',
+             'detalles': [{'productoId': 7, 'cantidad_solicitada': 1, 'subtotal': 10}]},
+        ])
+        rsps.get('/productos/7').respond(200, json={'id': 7, 'nombre': 'Chifle'})
+        result = await schema.execute('query Ventas { reporteVentas { totalVentas ventasPorProducto { productoNombre } } }',
+                                      context_value={'rest': rest})
+
+    await rest.close()
+    assert result.errors is None
+    timing = result.extensions['timing']
+    assert set(timing['resolversMs']) == {'reporteVentas'}
+    assert timing['upstream']['calls'] == 2
+    assert timing['upstream']['endpoints']['/productos/{id}']['calls'] == 1
+    assert timing['upstream']['bytes'] > 0
+    assert registry.value('upstream_requests_total', endpoint='/productos/{id}', status=200) == antes + 1
+    assert registry.value('graphql_operations_total', operation='Ventas', status='ok') >= 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_cache_stats():
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        resp = await client.get('/metrics')
+
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('text/plain')
+    assert '# TYPE upstream_request_seconds histogram' in resp.text
+    assert 'report_cache_hit_rate' in resp.text
+    assert 'document_cache_size' in resp.text
+
+
+@pytest.mark.asyncio
+async def test_operation_status_and_bounded_operation_label(monkeypatch):
+    base = 'http://testserver'
+    rest = RESTClient(base_url=base)
+    monkeypatch.setattr(MetricsExtension, '_operations', set())
+    monkeypatch.setattr(MetricsExtension, 'max_operations', 1)
+    antes = registry.value('graphql_operations_total', operation='Fallida', status='error')
+    otras = registry.value('graphql_operations_total', operation='other', status='ok')
+
+    with respx.mock(base_url=base) as rsps:
+        rsps.get('/pedidos').respond(400, json={'message': 'Bad Request'})
+        result = await schema.execute('query Fallida { reporteVentas { totalVentas } }', context_value={'rest': rest})
+    assert result.errors
+    # Un error en el resolver cuenta como error aunque la validación haya pasado
+    assert registry.value('graphql_operations_total', operation='Fallida', status='error') == antes + 1
+
+    # Alcanzado el límite de nombres distintos, el resto se agrupa en 'other'
+    await schema.execute('query Cualquiera123 { __typename }', context_value={'rest': rest})
+    assert registry.value('graphql_operations_total', operation='Cualquiera123', status='ok') == 0
+    assert registry.value('graphql_operations_total', operation='other', status='ok') == otras + 1
+    await rest.close()
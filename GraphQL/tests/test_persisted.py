@@ -0,0 +1,91 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from interface.graphql import persisted
+from interface.graphql.persisted import PersistedQueryRouter, PersistedQueryStore, query_hash
+from interface.graphql.schema import schema
+
+
+QUERY = 'query Inventario { reporteInventario { totalProductos totalInsumos } }'
+
+
+class _FakeRest:
+    async def get(self, path, params=None):
+        if path == '/productos':
+            return [{'id': 1, 'nombre': 'Chifle', 'stock': 3, 'precio_venta': 2}]
+        if path == '/insumos':
+            return []
+        raise AssertionError(path)
+
+
+def _app(store):
+    async def context():
+        return {'rest': _FakeRest()}
+
+    app = FastAPI()
+    app.include_router(PersistedQueryRouter(schema=schema, context_getter=context, store=store, get_max_age=60),
+                       prefix='/graphql')
+    return app
+
+
+@pytest.mark.asyncio
+async def test_automatic_persisted_query_round_trip():
+    store = PersistedQueryStore()
+    sha = query_hash(QUERY)
+    extensions = {'persistedQuery': {'version': 1, 'sha256Hash': sha}}
+    transport = httpx.ASGITransport(app=_app(store))
+
+    async with httpx.AsyncClient(transport=transport, base_url='http://graphql') as client:
+        # Hash desconocido: el cliente debe reenviar el texto
+        resp = await client.get('/graphql', params={'extensions': json.dumps(extensions)})
+        assert resp.json()['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_NOT_FOUND'
+
+        resp = await client.post('/graphql', json={'query': QUERY, 'extensions': extensions})
+        assert resp.json()['data']['reporteInventario'] == {'totalProductos': 1, 'totalInsumos': 0}
+        assert 'cache-control' not in resp.headers
+
+        # Ya registrado: basta el hash, y la respuesta GET es cacheable
+        resp = await client.get('/graphql', params={'extensions': json.dumps(extensions)})
+        assert resp.json()['data']['reporteInventario']['totalProductos'] == 1
+        assert resp.headers['cache-control'] == 'public, max-age=60'
+
+        resp = await client.get('/graphql', params={'extensions': json.dumps(extensions)},
+                                headers={'Authorization': 'Bearer alice'})
+        assert resp.headers['cache-control'] == 'private, max-age=60'
+
+        bad = {'persistedQuery': {'version': 1, 'sha256Hash': '0' * 64}}
+        resp = await client.post('/graphql', json={'query': QUERY, 'extensions': bad})
+        assert resp.json()['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_HASH_MISMATCH'
+
+
+@pytest.mark.asyncio
+async def test_documents_are_parsed_and_validated_once(monkeypatch):
+    persisted.DocumentCache.documents.clear()
+    calls = {'parse': 0}
+    parse = persisted.parse
+
+    def counting_parse(query):
+        calls['parse'] += 1
+        return parse(query)
+
+    monkeypatch.setattr(persisted, 'parse', counting_parse)
+    validaciones = []
+    import strawberry.schema.schema as strawberry_schema
+    validate = strawberry_schema.validate_document
+    monkeypatch.setattr(strawberry_schema, 'validate_document', lambda *a: validaciones.append(1) or validate(*a))
+
+    for _ in range(5):
+        result = await schema.execute(QUERY, context_value={'rest': _FakeRest()})
+        assert result.errors is None
+
+    assert calls['parse'] == 1
+    assert len(validaciones) == 1
+
+    # Los errores de validación también se cachean
+    for _ in range(2):
+        result = await schema.execute('{ noExiste }', context_value={'rest': _FakeRest()})
+        assert result.errors
+    assert len(validaciones) == 2
@@ -0,0 +1,172 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from app.usecases import ReportService
+from infrastructure.http_client import RESTClient
+from infrastructure.resilience import CircuitBreaker, CircuitOpenError, Resilience, endpoint_template
+
+
+BASE = 'http://testserver'
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_endpoint_template_groups_ids():
+    assert endpoint_template('/productos/12') == '/productos/{id}'
+    assert endpoint_template('/pedidos/7/detalles') == '/pedidos/{id}/detalles'
+    assert endpoint_template('/productos-insumos') == '/productos-insumos'
+
+
+@pytest.mark.asyncio
+async def test_idempotent_get_is_retried_with_latency_budget():
+    resilience = Resilience(retries=2, backoff=0, budgets={'/productos/{id}': 1.5})
+    client = RESTClient(base_url=BASE, resilience=resilience)
+
+    with respx.mock(base_url=BASE) as rsps:
+        route = rsps.get('/productos/3').mock(side_effect=[
+            httpx.ConnectError('reset'),
+            httpx.Response(503),
+            httpx.Response(200, json={'id': 3}),
+        ])
+        assert await client.get('/productos/3') == {'id': 3}
+
+    assert route.call_count == 3
+    assert route.calls[0].request.extensions['timeout']['read'] == 1.5
+    assert resilience.retried == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_recovers():
+    clock = _Clock()
+    resilience = Resilience(retries=0, breaker_failures=3, breaker_reset=30, clock=clock)
+    client = RESTClient(base_url=BASE, resilience=resilience)
+
+    with respx.mock(base_url=BASE) as rsps:
+        route = rsps.get('/insumos').respond(503)
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get('/insumos')
+
+        # Abierto: ni siquiera se llama al upstream; otros endpoints siguen funcionando
+        with pytest.raises(CircuitOpenError):
+            await client.for_token('alice').get('/insumos')
+        assert route.call_count == 3
+        rsps.get('/productos').respond(200, json=[])
+        assert await client.get('/productos') == []
+
+        # Pasado el reset, una llamada de prueba cierra el circuito
+        clock.now = 31
+        route.respond(200, json=[{'id': 1}])
+        assert await client.get('/insumos') == [{'id': 1}]
+        assert resilience.stats()['openCircuits'] == []
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_does_not_wedge_breaker():
+    clock = _Clock()
+    resilience = Resilience(retries=0, breaker_failures=1, breaker_reset=30, clock=clock)
+    client = RESTClient(base_url=BASE, resilience=resilience)
+
+    async def colgada(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200, json=[])
+
+    with respx.mock(base_url=BASE) as rsps:
+        route = rsps.get('/insumos').respond(503)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get('/insumos')
+
+        # La llamada de prueba se cancela (timeout del resolver): cuenta como fallo
+        clock.now = 31
+        route.side_effect = colgada
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get('/insumos'), timeout=0.01)
+        assert resilience.breaker('/insumos').state == 'open'
+
+        clock.now = 62
+        route.side_effect = None
+        route.respond(200, json=[{'id': 1}])
+        assert await client.get('/insumos') == [{'id': 1}]
+
+    # Una prueba que nunca registra resultado no bloquea el endpoint para siempre
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow() and not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_after_p95_delay():
+    resilience = Resilience(retries=0, hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        resilience.latency('/productos/{id}').record(0.01)
+    client = RESTClient(base_url=BASE, resilience=resilience)
+    calls = 0
+
+    async def lenta_y_rapida(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)  # la primera se queda colgada
+        return httpx.Response(200, json={'intento': calls})
+
+    with respx.mock(base_url=BASE) as rsps:
+        rsps.get('/productos/1').mock(side_effect=lenta_y_rapida)
+        inicio = asyncio.get_running_loop().time()
+        assert await client.get('/productos/1') == {'intento': 2}
+        assert asyncio.get_running_loop().time() - inicio < 0.5
+
+    assert resilience.hedged == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_or_short_circuited_names_do_not_fail_the_report(monkeypatch):
+    monkeypatch.setattr('app.usecases.REPORT_STREAMING', False)
+    resilience = Resilience(retries=0, breaker_failures=1, breaker_reset=30, clock=_Clock())
+    client = RESTClient(base_url=BASE, resilience=resilience)
+    ordenes = [{'id': 1, 'estado': 'completada', 'productoId': 1, 'cantidad_producir': 5,
+                'detalles': [{'insumoId': 7, 'cantidad_utilizada': 2}]}]
+    pedidos = [{'id': 1, 'fecha': '2025-11-01', 'total': 10, 'estado': 'pagado', 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 6},
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 4},
+    ]}]
+
+    with respx.mock(base_url=BASE) as rsps:
+        rsps.get('/ordenes-produccion').respond(200, json=ordenes)
+        insumo = rsps.get('/insumos/7').respond(503)
+        rsps.get('/pedidos').respond(200, json=pedidos)
+        rsps.get('/pedidos/1').respond(200, json=pedidos[0])
+        chifle = rsps.get('/productos/1').respond(200, json={'id': 1, 'nombre': 'Chifle'})
+        rsps.get('/productos/2').respond(503)
+        rsps.get('/productos-insumos').respond(200, json=[{'insumoId': 7, 'cantidad_necesaria': 1}])
+
+        # Un 503 en /insumos/7 deja el nombre en null en lugar de tumbar el reporte
+        consumo = await ReportService(client).consumo_insumos()
+        assert consumo == [{'insumoId': 7, 'cantidadTotal': 2.0, 'insumoNombre': None, 'unidad': None}]
+
+        top = await ReportService(client).productos_mas_vendidos(2)
+        assert [(p['productId'], p['productName']) for p in top] == [(1, 'Chifle'), (2, None)]
+
+        # Con los circuitos abiertos la trazabilidad sale igual, sin esos nombres ni llamadas
+        traza = await ReportService(client).trazabilidad_pedido(1)
+        assert [(p['productoId'], p['nombre']) for p in traza['productos']] == [(1, None), (2, None)]
+        assert traza['productos'][0]['receta'][0]['insumoNombre'] is None
+        assert (insumo.call_count, chifle.call_count) == (1, 1)
+
+    await client.close()
@@ -0,0 +1,123 @@
+import httpx
+import pytest
+
+from app.aggregates import AggregateStore
+from app.snapshot import SnapshotStore
+from app.usecases import ReportService
+from infrastructure.aggregation import AggregationClient
+
+
+PEDIDOS = [
+    {'id': 1, 'fecha': '2025-11-01T10:00:00', 'total': 30.0, 'estado': 'Pagado', 'clienteId': 4, 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 2, 'subtotal': 10.0},
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 20.0},
+    ]},
+    {'id': 2, 'fecha': '2025-11-02', 'total': 15.0, 'estado': 'pendiente', 'clienteId': 5, 'detalles': [
+        {'productoId': 1, 'cantidad_solicitada': 3, 'subtotal': 15.0},
+    ]},
+    {'id': 3, 'fecha': None, 'total': 8.0, 'estado': 'entregado', 'clienteId': 4, 'detalles': [
+        {'productoId': 2, 'cantidad_solicitada': 1, 'subtotal': 8.0},
+    ]},
+]
+
+ORDENES = [
+    {'id': 1, 'fecha_inicio': '2025-11-01', 'estado': 'completada', 'productoId': 1, 'cantidad_producir': 50,
+     'detalles': [{'insumoId': 7, 'cantidad_utilizada': 2.5}]},
+    {'id': 2, 'fecha_inicio': '2025-11-03', 'estado': 'en_proceso', 'productoId': 2, 'cantidad_producir': 20,
+     'detalles': [{'insumoId': 7, 'cantidad_utilizada': 1.0}, {'insumoId': 8, 'cantidad_utilizada': 4.0}]},
+]
+
+
+class _FakeRest:
+    def __init__(self):
+        self.calls = []
+        self.down = False
+
+    async def get(self, path, params=None):
+        if self.down:
+            raise httpx.ConnectError('API REST caída')
+        self.calls.append(path)
+        if path == '/reportes/agregados':
+            # El API REST real no tiene el endpoint de agregación
+            request = httpx.Request('GET', f'http://rest{path}')
+            raise httpx.HTTPStatusError('404', request=request, response=httpx.Response(404, request=request))
+        listados = {'/pedidos': PEDIDOS, '/ordenes-produccion': ORDENES, '/productos-insumos': [],
+                    '/productos': [{'id': 1, 'nombre': 'Chifle'}, {'id': 2, 'nombre': 'Maduro'}],
+                    '/insumos': [{'id': 7, 'nombre': 'Plátano'}, {'id': 8, 'nombre': 'Sal'}]}
+        if path in listados:
+            return listados[path]
+        recurso, _, entity_id = path.rpartition('/')
+        return next(e for e in listados[recurso] if e['id'] == int(entity_id))
+
+
+class _Clock:
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_match_materialized_aggregates(tmp_path):
+    rest = _FakeRest()
+    store = SnapshotStore(rest, str(tmp_path / 'snapshot.db'))
+    assert not store.fresh()
+    await store.sync()
+    rest.calls.clear()
+
+    view = store.view(rest)
+    snapshot = ReportService(view, aggregation=AggregationClient())
+    agregados = ReportService(rest, aggregates=AggregateStore(rest))
+    for fechas in ((), ('2025-11-02', '2025-11-30'), ('2025-11-01', None)):
+        assert await snapshot.reporte_ventas(*fechas) == await agregados.reporte_ventas(*fechas)
+        assert await snapshot.reporte_produccion(*fechas) == await agregados.reporte_produccion(*fechas)
+
+    rest.calls.clear()
+    assert [p['id'] for p in await snapshot.pedidos_por_cliente(4)] == [1, 3]
+    assert [p['id'] for p in await snapshot.pedidos_por_cliente(4, '2025-11-01')] == [1]
+    assert (await snapshot.reporte_inventario()).totalInsumos == 2
+    assert rest.calls == []
+    await store.stop()
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_goes_live_and_serves_offline(tmp_path):
+    rest = _FakeRest()
+    clock = _Clock()
+    store = SnapshotStore(rest, str(tmp_path / 'snapshot.db'), sync_interval=60, max_staleness=120, clock=clock)
+    await store.sync()
+    # Otro worker con el mismo fichero ve la copia y no vuelve a sincronizar
+    otro = SnapshotStore(rest, store.path, sync_interval=60, clock=clock)
+    assert otro.fresh() and await otro.sync() is False
+
+    clock.now += 121
+    rest.calls.clear()
+    view = store.view(rest)
+    assert len(await view.get('/productos')) == 2
+    assert rest.calls == ['/productos']
+
+    rest.down = True
+    assert (await view.get('/productos/2'))['nombre'] == 'Maduro'
+    assert store.stats()['staleReads'] == 1
+    await store.stop()
+    await otro.stop()
+
+
+@pytest.mark.asyncio
+async def test_live_404_before_first_sync_does_not_disable_pushdown(tmp_path):
+    rest = _FakeRest()
+    store = SnapshotStore(rest, str(tmp_path / 'snapshot.db'))
+    aggregation = AggregationClient()
+    svc = ReportService(store.view(rest), aggregation=aggregation)
+
+    # Sin sincronizar: el 404 del API solo hace caer esta llamada a la agregación local
+    antes = await svc.reporte_ventas()
+    assert '/reportes/agregados' in rest.calls and '/pedidos' in rest.calls
+    assert aggregation.available is not False
+
+    await store.sync()
+    rest.calls.clear()
+    assert await ReportService(store.view(rest), aggregation=aggregation).reporte_ventas() == antes
+    assert rest.calls == []
+    assert aggregation.stats() == {'available': True, 'pushdowns': 1, 'fallbacks': 1}
+    await store.stop()
@@ -0,0 +1,86 @@
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+import respx
+
+from infrastructure.http_client import RESTClient
+from infrastructure.tokens import TokenManager, jwt_expiry
+
+
+def _jwt(exp: float, n: int = 0) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({'sub': 'svc', 'exp': exp, 'n': n}).encode()).decode().rstrip('=')
+    return f'eyJhbGciOiJIUzI1NiJ9.{payload}.firma'
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeAuth:
+    def __init__(self, clock, refresh_status=200):
+        self.clock = clock
+        self.refresh_status = refresh_status
+        self.calls = []
+
+    async def login(self, email, password):
+        self.calls.append('login')
+        return {'tokens': {'accessToken': _jwt(self.clock() + 900, len(self.calls)), 'refreshToken': 'r1'}}
+
+    async def refresh(self, refresh_token):
+        self.calls.append('refresh')
+        await asyncio.sleep(0.01)
+        if self.refresh_status != 200:
+            request = httpx.Request('POST', 'http://auth/auth/refresh')
+            raise httpx.HTTPStatusError('401', request=request, response=httpx.Response(401, request=request))
+        return {'accessToken': _jwt(self.clock() + 900, len(self.calls)), 'expiresIn': 900000}
+
+
+@pytest.mark.asyncio
+async def test_refreshes_ahead_of_expiry_and_relogs_when_refresh_is_rejected():
+    clock = _Clock()
+    auth = _FakeAuth(clock)
+    rest = RESTClient(base_url='http://testserver', token='x')
+    tokens = TokenManager(auth, rest, 'svc@chifles.com', 'x', refresh_margin=60, clock=clock)
+
+    await tokens.renew()
+    assert jwt_expiry(tokens.access_token) == 1900
+    assert tokens.seconds_to_refresh() == 840   # 60 s antes de caducar
+    assert rest._headers == {'Authorization': f'Bearer {tokens.access_token}'}
+
+    # Renovaciones concurrentes: una sola llamada al Auth-Service
+    await asyncio.gather(*(tokens.renew() for _ in range(5)))
+    assert auth.calls == ['login', 'refresh']
+
+    auth.refresh_status = 401
+    await tokens.renew()
+    assert auth.calls == ['login', 'refresh', 'refresh', 'login']
+    assert (tokens.logins, tokens.refreshes) == (2, 1)
+    await rest.close()
+
+
+@pytest.mark.asyncio
+async def test_unauthorized_storm_triggers_one_refresh_and_retries():
+    base = 'http://testserver'
+    clock = _Clock()
+    auth = _FakeAuth(clock)
+    rest = RESTClient(base_url=base, token='x')
+    tokens = TokenManager(auth, rest, 'svc@chifles.com', 'x', clock=clock)
+    await tokens.renew()
+    caducado = tokens.access_token
+
+    with respx.mock(base_url=base) as rsps:
+        rsps.get('/insumos').mock(side_effect=lambda request: httpx.Response(
+            401 if request.headers['Authorization'] == f'Bearer {caducado}' else 200, json=[]))
+        results = await asyncio.gather(*(rest.get('/insumos') for _ in range(10)))
+
+    assert results == [[]] * 10
+    assert auth.calls == ['login', 'refresh']
+    assert tokens.unauthorized == 10
+    await rest.close()
@@ -1,9 +1,13 @@
+import asyncio
+
 import pytest
 import respx
 from httpx import Response
 
 from infrastructure.http_client import RESTClient
-from GraphQL.app.usecases import ReportService
+from app.usecases import ReportService
+from infrastructure.cache import ReportCache
+from interface.graphql.schema import schema
 
 
 @pytest.mark.asyncio
@@ -23,3 +27,88 @@ async def test_pedidos_por_cliente_basic():
         assert data[0]['id'] == 1
 
     await client.close()
+
+
+class _SlowCatalogRest:
+    """Pedidos al instante; el producto 2 tarda más que el deadline."""
+
+    def __init__(self):
+        self.liberar = asyncio.Event()
+
+    async def get(self, path, params=None):
+        if path == '/pedidos':
+            return [
+                {'id': 1, 'fecha': '2025-11-01', 'total': 10, 'estado': 'completado',
+                 'detalles': [{'productoId': 1, 'cantidad_solicitada': 1, 'subtotal': 10}]},
+                {'id': 2, 'fecha': '2025-11-02', 'total': 30, 'estado': 'completado',
+                 'detalles': [{'productoId': 2, 'cantidad_solicitada': 3, 'subtotal': 30}]},
+            ]
+        if path == '/productos/2':
+            await self.liberar.wait()
+        return {'id': int(path.rsplit('/', 1)[1]), 'nombre': f'Producto {path[-1]}'}
+
+
+@pytest.mark.asyncio
+async def test_reporte_ventas_returns_partial_names_within_deadline():
+    rest = _SlowCatalogRest()
+    cache = ReportCache(ttl=60)
+    query = '{ reporteVentas { totalVentas ventasPorProducto { productoId productoNombre } } }'
+    context = {
+        'rest': rest, 'report_cache': cache, 'cache_scope': 'u', 'partial': {},
+        'deadline': asyncio.get_running_loop().time() + 0.05,
+    }
+
+    result = await schema.execute(query, context_value=context)
+
+    assert result.errors is None
+    assert result.data['reporteVentas']['totalVentas'] == 40
+    nombres = {v['productoId']: v['productoNombre'] for v in result.data['reporteVentas']['ventasPorProducto']}
+    assert nombres == {1: 'Producto 1', 2: None}
+    assert result.extensions['partial'] == {'reporteVentas': [{'tipo': 'productos', 'ids': [2]}]}
+
+    # El resultado parcial no se guarda: el siguiente request (sin deadline) sale completo
+    rest.liberar.set()
+    result = await schema.execute(query, context_value={'rest': rest, 'report_cache': cache,
+                                                        'cache_scope': 'u', 'partial': {}})
+    nombres = {v['productoId']: v['productoNombre'] for v in result.data['reporteVentas']['ventasPorProducto']}
+    assert nombres == {1: 'Producto 1', 2: 'Producto 2'}
+    assert 'partial' not in (result.extensions or {})
+
+
+class _CountingRest:
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, path, params=None):
+        self.calls.append(path)
+        if path == '/pedidos':
+            return [{'id': 1, 'fecha': '2025-11-01', 'total': 10, 'estado': 'completado',
+                     'detalles': [{'productoId': 1, 'cantidad_solicitada': 2, 'subtotal': 10}]}]
+        if path == '/insumos':
+            return [{'id': 1, 'nombre': 'Sal', 'stock': 5, 'stock_minimo': 10}]
+        if path.startswith('/productos/'):
+            return {'id': 1, 'nombre': 'Chifle'}
+        raise AssertionError(path)
+
+
+@pytest.mark.asyncio
+async def test_only_selected_report_parts_are_fetched_and_enriched():
+    rest = _CountingRest()
+    context = {'rest': rest, 'report_cache': ReportCache()}
+
+    totales = await schema.execute('{ reporteVentas { totalVentas ventasPorProducto { cantidadVendida } } }',
+                                   context_value=context)
+    assert totales.data['reporteVentas'] == {'totalVentas': 10, 'ventasPorProducto': [{'cantidadVendida': 2}]}
+    assert rest.calls == ['/pedidos']   # sin productoNombre no se carga el catálogo
+
+    # Con fragmento: la selección más amplia se calcula y cachea aparte
+    nombres = await schema.execute(
+        '{ reporteVentas { ...V } } fragment V on ReporteVentas { productosMasVendidos { nombre } }',
+        context_value=context)
+    assert nombres.data['reporteVentas'] == {'productosMasVendidos': [{'nombre': 'Chifle'}]}
+    assert rest.calls == ['/pedidos', '/pedidos', '/productos/1']
+
+    rest.calls.clear()
+    inventario = await schema.execute('{ reporteInventario { insumosStockBajo { id } } }', context_value=context)
+    assert inventario.data['reporteInventario'] == {'insumosStockBajo': [{'id': 1}]}
+    assert rest.calls == ['/insumos']